@@ -5,24 +5,26 @@ from django.core.asgi import get_asgi_application
 
 from channels.routing import ProtocolTypeRouter, URLRouter
 
-# import your token middleware and websocket routing
-from chat.middleware import TokenAuthMiddleware         # ensure import path is correct
-import chat.routing                                   # must expose websocket_urlpatterns
-
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
 django.setup()
 
 # normal Django ASGI app for HTTP
 django_asgi_app = get_asgi_application()
 
+# import your token middleware and websocket routing (they load models, so after setup)
+from chat.middleware import TokenAuthMiddleware  # noqa: E402
+import chat.routing  # noqa: E402  must expose websocket_urlpatterns
+import realtimemonitoring.routing  # noqa: E402
+
 # Single ProtocolTypeRouter: HTTP + WebSocket
 application = ProtocolTypeRouter({
     "http": django_asgi_app,
-    # Wrap URLRouter with your TokenAuthMiddleware so `scope['user']` is set from ?token=...
-    # That middleware is synchronous in your repo so calling it directly is fine.
+    # Wrap URLRouter with your TokenAuthMiddleware so scope carries the socket's
+    # user_id / member_id from ?token=... (async; lookups are cached per token)
     "websocket": TokenAuthMiddleware(
         URLRouter(
             chat.routing.websocket_urlpatterns
+            + realtimemonitoring.routing.websocket_urlpatterns
         )
     ),
 })
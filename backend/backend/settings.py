@@ -97,8 +97,16 @@ ASGI_APPLICATION = "backend.asgi.application"   # adjust if your project name is
 
 CHANNEL_LAYERS = {
   "default": {
-    "BACKEND": "channels.layers.InMemoryChannelLayer"
-    # For production, use Redis:
+    # Shared by every ASGI worker on this host (chat.layers.SQLiteChannelLayer).
+    # Single-process dev can use "channels.layers.InMemoryChannelLayer".
+    "BACKEND": "chat.layers.SQLiteChannelLayer",
+    "CONFIG": {
+      "path": os.path.join(BASE_DIR, "channel_layer.sqlite3"),
+      "expiry": 60,            # seconds an undelivered message is kept
+      "group_expiry": 86400,
+      "capacity": 100,         # undelivered messages per channel
+    },
+    # For several hosts, use Redis:
     # "BACKEND": "channels_redis.core.RedisChannelLayer",
     # "CONFIG": {"hosts": [("127.0.0.1", 6379)]},
   }
@@ -138,6 +146,9 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # atomic() takes SQLite's write lock up front (select_for_update is a no-op here),
+        # so concurrent state transitions queue instead of failing with "database is locked"
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE', 'timeout': 20},
     }
 }
 
@@ -225,3 +236,72 @@ OPENAI_MAX_CANDIDATES = 200
 OPENAI_MAX_TOKENS = 800
 OPENAI_MODEL = getattr(globals(), "OPENAI_MODEL", "gpt-4o-mini")
 
+
+# AI auto-assign candidate pool (task_api.candidates)
+TASKAI_CANDIDATE_POOL_TTL = 300  # seconds before a built pool is reloaded
+TASKAI_CANDIDATE_POOL_CACHE = None  # cache alias (e.g. "default") to share pool versions across workers
+
+# auto-assign mode=optimal (task_api.optimizer)
+TASKAI_MEMBER_CAPACITY = 10  # max open tasks per member, current load included
+TASKAI_OPTIMAL_MAX_TASKS = 500
+
+# background auto-assign (task_api.jobs, `manage.py run_taskai_jobs`)
+TASKAI_AUTO_ASSIGN_ASYNC = True  # False runs auto-assign inline in the create request
+TASKAI_JOB_MAX_ATTEMPTS = 3
+TASKAI_JOB_RETRY_DELAY = 30  # seconds, doubled on each retry
+TASKAI_JOB_LOCK_TIMEOUT = 300  # seconds before a running job of a dead worker is requeued
+
+# LLM response cache (task_api.llm_cache)
+TASKAI_LLM_CACHE = "default"  # cache alias; None disables caching (in-flight coalescing still applies)
+TASKAI_LLM_CACHE_TTL = 600  # seconds
+TASKAI_LLM_COALESCE_TIMEOUT = 120  # seconds a coalesced caller waits for the in-flight call
+
+# assignment LLM client (task_api.assignment_llm)
+TASKAI_LLM_BACKEND = None  # "openai", "stub" (offline, scorer-backed); None = openai when OPENAI_API_KEY is set
+TASKAI_LLM_TIMEOUT = 20  # seconds per upstream call
+TASKAI_LLM_MAX_CONCURRENCY = 4  # calls in flight per process
+TASKAI_LLM_QUEUE_TIMEOUT = 2  # seconds to wait for a free slot before using the scorer instead
+TASKAI_LLM_RETRIES = 2
+TASKAI_LLM_RETRY_DELAY = 0.5  # seconds, doubled per retry, full jitter
+TASKAI_LLM_BREAKER_THRESHOLD = 5  # consecutive failed calls before the circuit opens
+TASKAI_LLM_BREAKER_COOLDOWN = 60  # seconds before a trial call is let through
+
+# POST /api/tasksai/bulk/ (task_api.bulk)
+TASKAI_BULK_CHUNK_SIZE = 500  # rows validated, created and assigned per transaction
+
+# chat message history (chat.pagination.MessageKeysetPagination)
+CHAT_MESSAGES_PAGE_SIZE = 50
+CHAT_MESSAGES_MAX_PAGE_SIZE = 200
+
+# chat broadcasts after commit (chat.broadcast.BroadcastDispatcher)
+CHAT_BROADCAST_QUEUE_SIZE = 1000  # pending sends before new ones are dropped
+CHAT_BROADCAST_BATCH_SIZE = 100   # queued sends handed to the channel layer at once
+
+# chat sockets (chat.consumers): send frames saved per batch
+CHAT_SOCKET_BATCH_SIZE = 50      # frames per transaction
+CHAT_SOCKET_BATCH_WINDOW = 0.02  # seconds a send waits for others to join its batch
+
+# websocket token auth (chat.middleware.TokenAuthMiddleware)
+CHAT_WS_TOKEN_CACHE_TTL = 60      # seconds a token -> (user, member) lookup is reused; bounds revocation lag in other workers
+CHAT_WS_TOKEN_CACHE_SIZE = 10000  # cached tokens per process
+
+# live work session state for /api/monitor/status|start|stop (realtimemonitoring.live)
+# With None each worker keeps its own copy: a session another worker stopped, or the
+# reaper closed, still shows as active there for up to MONITOR_LIVE_TTL seconds.
+# Set a shared cache whenever more than one worker serves these endpoints.
+MONITOR_LIVE_CACHE = None  # cache alias shared by all workers (e.g. a Redis/Memcached cache); None = per process
+MONITOR_LIVE_TTL = 300     # seconds an entry is trusted; bounds staleness when another worker changed the session
+
+# POST /api/monitor/heartbeat/ (realtimemonitoring.heartbeat)
+MONITOR_HEARTBEAT_MAX_SAMPLES = 500        # samples per request
+MONITOR_HEARTBEAT_BUFFER_SIZE = 50000      # samples held per process before new ones are dropped
+MONITOR_HEARTBEAT_FLUSH_SIZE = 1000        # flush early once this many are waiting
+MONITOR_HEARTBEAT_FLUSH_INTERVAL = 2       # seconds between flushes
+MONITOR_HEARTBEAT_TIMEOUT_MINUTES = 5      # running sessions silent this long are stopped at their last heartbeat
+MONITOR_HEARTBEAT_SWEEP_INTERVAL = 60      # seconds between checks for silent sessions
+
+# stale running sessions (realtimemonitoring.reaper, manage.py reap_stale_sessions)
+MONITOR_REAP_AFTER_MINUTES = 720  # no start or heartbeat for this long: closed at the last known activity
+
+# break policies (realtimemonitoring.breaks)
+MONITOR_BREAK_POLICY_TTL = 300  # seconds a policy's member list is reused by other workers after a change
@@ -0,0 +1,146 @@
+# chat/broadcast.py
+import asyncio
+import json
+import logging
+import queue
+import threading
+
+from asgiref.sync import async_to_sync
+from channels.layers import InMemoryChannelLayer, get_channel_layer
+from django.conf import settings
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+class BroadcastDispatcher:
+    """
+    Delivers chat broadcasts off the request thread.
+
+    publish() queues (group, event) pairs once the current transaction
+    commits. A daemon thread drains the queue in batches, drops pairs that
+    repeat within a batch (a DM to yourself names the same group twice), and
+    hands the batch to the channel layer in one call. When the queue is full,
+    new broadcasts are dropped and counted rather than blocking the request.
+
+    InMemoryChannelLayer only works on the server's own event loop, so with
+    it broadcasts are still sent inline after commit.
+
+    Counters, per (group, event) send: enqueued, coalesced, queue_dropped
+    (queue full), sent (handed to the layer) and failed; in the steady state
+    enqueued = coalesced + sent + failed + queue_depth. Per channel message,
+    for layers with group_send_many (chat.layers.SQLiteChannelLayer):
+    delivered (queued for a socket) and layer_dropped (socket at capacity).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._queue = None
+        self._thread = None
+        self.enqueued = 0
+        self.coalesced = 0
+        self.queue_dropped = 0
+        self.sent = 0
+        self.failed = 0
+        self.delivered = 0
+        self.layer_dropped = 0
+        self.batches = 0
+
+    def publish(self, sends):
+        """Queue [(group, event), ...] for delivery after commit (at once outside a transaction)."""
+        sends = list(sends)
+        if sends:
+            transaction.on_commit(lambda: self.enqueue(sends))
+
+    def enqueue(self, sends):
+        layer = get_channel_layer()
+        if layer is None:
+            return
+        if isinstance(layer, InMemoryChannelLayer):
+            self._deliver_inline(layer, sends)
+            return
+        try:
+            self._ensure_worker().put_nowait(sends)
+        except queue.Full:
+            self._count("queue_dropped", len(sends))
+            logger.warning("Chat broadcast queue full; dropped %d send(s)", len(sends))
+        else:
+            self._count("enqueued", len(sends))
+
+    def _deliver_inline(self, layer, sends):
+        for group, event in sends:
+            try:
+                async_to_sync(layer.group_send)(group, event)
+                self._count("sent")
+            except Exception:
+                self._count("failed")
+                logger.exception("Failed to broadcast to %s (non-fatal)", group)
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._queue = queue.Queue(maxsize=getattr(settings, "CHAT_BROADCAST_QUEUE_SIZE", 1000))
+                self._thread = threading.Thread(target=self._run, name="chat-broadcast", daemon=True)
+                self._thread.start()
+            return self._queue
+
+    def _run(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        layer = get_channel_layer()
+        batch_size = getattr(settings, "CHAT_BROADCAST_BATCH_SIZE", 100)
+        while True:
+            pending = [self._queue.get()]
+            while len(pending) < batch_size:
+                try:
+                    pending.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            sends = self._coalesce(send for sends in pending for send in sends)
+            try:
+                loop.run_until_complete(self._deliver(layer, sends))
+            except Exception:
+                self._count("failed", len(sends))
+                logger.exception("Failed to broadcast %d chat send(s) (non-fatal)", len(sends))
+
+    def _coalesce(self, sends):
+        unique = {}
+        total = 0
+        for group, event in sends:
+            total += 1
+            unique.setdefault((group, json.dumps(event, sort_keys=True, default=str)), (group, event))
+        self._count("coalesced", total - len(unique))
+        return list(unique.values())
+
+    async def _deliver(self, layer, sends):
+        self._count("batches")
+        if hasattr(layer, "group_send_many"):
+            queued, dropped = await layer.group_send_many(sends)
+            self._count("sent", len(sends))
+            # per channel: messages queued for sockets, and those skipped for sockets at capacity
+            self._count("delivered", queued)
+            self._count("layer_dropped", dropped)
+            return
+        results = await asyncio.gather(*(layer.group_send(g, e) for g, e in sends), return_exceptions=True)
+        failures = [r for r in results if isinstance(r, Exception)]
+        if failures:
+            logger.warning("Chat broadcast: %d of %d group send(s) failed: %s", len(failures), len(sends), failures[0])
+        self._count("failed", len(failures))
+        self._count("sent", len(sends) - len(failures))
+
+    def _count(self, name, n=1):
+        if n:
+            with self._lock:
+                setattr(self, name, getattr(self, name) + n)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enqueued": self.enqueued, "coalesced": self.coalesced, "queue_dropped": self.queue_dropped,
+                "sent": self.sent, "failed": self.failed,
+                "delivered": self.delivered, "layer_dropped": self.layer_dropped, "batches": self.batches,
+                "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            }
+
+
+broadcaster = BroadcastDispatcher()
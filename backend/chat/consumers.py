@@ -1,58 +1,271 @@
 # chat/consumers.py
+import asyncio
 import json
-from urllib.parse import parse_qs
+import logging
+import time
 
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from rest_framework.authtoken.models import Token
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import NotFound
 from projects.models import Member
 
+from .broadcast import broadcaster
+from .middleware import resolve_token, token_from_scope
+from .models import Channel, ChannelReadCursor, DirectMessage, DMConversation, Message
+from .pagination import MessageKeysetPagination
+
 User = get_user_model()
+logger = logging.getLogger(__name__)
 
-class DMConsumer(AsyncWebsocketConsumer):
-    """
-    WebSocket consumer for direct messages.
-    Expects token in query string, e.g. ws://.../ws/dm?token=<token>
-    On connect: validate token -> find user -> find Member record -> add to group "dm_<member_pk>".
-    On disconnect: remove from that group.
+MAX_CONTENT_LENGTH = 10000
+
+
+def _user_name(user):
+    if not user:
+        return ""
+    get_full = getattr(user, "get_full_name", None)
+    return (get_full() if callable(get_full) else "") or ""
+
+
+def dm_frame(dm, sender_member_pk=None):
+    """Socket payload for one direct message; same keys as the REST broadcast."""
+    if sender_member_pk is None:
+        sender_member_pk = getattr(getattr(dm.sender, "member_profile", None), "pk", None)
+    recipient = dm.recipient
+    return {
+        "id": dm.pk,
+        "channel_for_recipient": f"dm-{recipient.pk}",
+        "channel_for_sender": f"dm-{sender_member_pk}" if sender_member_pk is not None else None,
+        "channel": f"dm-{recipient.pk}",
+        "conversation_id": dm.conversation_id,
+        "sender_id": dm.sender_id,
+        "sender_username": getattr(dm.sender, "username", None),
+        "sender_member_id": sender_member_pk,
+        "recipient_member": {
+            "id": recipient.pk,
+            "username": getattr(recipient.user, "username", None),
+            "name": _user_name(recipient.user),
+        },
+        "content": dm.content,
+        "message_type": dm.message_type,
+        "file_url": dm.file.url if dm.file else None,
+        "created_at": dm.created_at.isoformat() if dm.created_at else None,
+        "read": dm.read,
+    }
+
+
+def channel_message_frame(message):
+    """Socket payload for one channel message; same keys as the REST broadcast."""
+    return {
+        "id": message.pk,
+        "channel": f"channel-{message.channel_id}",
+        "channel_id": message.channel_id,
+        "sender_id": message.sender_id,
+        "sender_username": getattr(message.sender, "username", None),
+        "content": message.content,
+        "message_type": message.message_type,
+        "file_url": message.file.url if message.file else None,
+        "created_at": message.created_at.isoformat() if message.created_at else None,
+    }
+
+
+class ChatSocketConsumer(AsyncWebsocketConsumer):
     """
+    Shared frame handling for chat sockets. Clients send JSON frames with an
+    "action": "send", "typing", "mark_read" or "history".
 
-    async def connect(self):
-        # parse token
-        qs = parse_qs(self.scope.get("query_string").decode())
-        token_vals = qs.get("token") or qs.get("authToken") or qs.get("access_token") or []
-        token = token_vals[0] if token_vals else None
+    - send: queued and persisted in batches (one transaction per batch, at
+      most CHAT_SOCKET_BATCH_SIZE frames or CHAT_SOCKET_BATCH_WINDOW seconds),
+      then acked with {"type": "ack", "client_id", "id", ...} carrying the
+      server id; the message itself is broadcast like a REST send.
+    - typing: relayed to the other side only, at most once a second per target.
+    - mark_read / history: answered on this socket.
 
-        self.member = None
-        if token:
-            try:
-                user = await database_sync_to_async(lambda: Token.objects.get(key=token).user)()
-                # Find a Member record for this user
-                member = await database_sync_to_async(lambda: Member.objects.filter(user=user).first())()
-                if member:
-                    self.member = member
-            except Exception:
-                self.member = None
+    Errors come back as {"type": "error", "client_id", "detail"}.
+    """
 
+    async def connect(self):
+        self.member = await self._authenticate()
         if not self.member:
             # reject the connection if no member found (optional: allow anonymous read-only)
             await self.close(code=4001)
             return
 
-        # group name based on member pk
-        self.group_name = f"dm_{self.member.pk}"
-        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        self.joined_groups = await self.groups_for_connection()
+        if self.joined_groups is None:
+            await self.close(code=4003)
+            return
+        for group in self.joined_groups:
+            await self.channel_layer.group_add(group, self.channel_name)
+
+        self._pending_sends = []
+        self._flush_task = None
+        self._last_typing = {}
         await self.accept()
 
     async def disconnect(self, close_code):
+        if getattr(self, "_pending_sends", None):
+            # the socket is gone: save what was queued, there is no one to ack
+            await self._flush_sends(ack=False)
+        for group in getattr(self, "joined_groups", None) or []:
+            try:
+                await self.channel_layer.group_discard(group, self.channel_name)
+            except Exception:
+                pass
+
+    async def _authenticate(self):
+        """
+        The socket's Member from the identity TokenAuthMiddleware put in scope
+        (resolved here through the same cache when routed without it). Built
+        from ids, not fetched: only pk, user_id and user.username are used.
+        """
+        if "member_id" in self.scope:
+            identity = (self.scope["user_id"], self.scope["member_id"], self.scope.get("username"))
+        else:
+            identity = await resolve_token(token_from_scope(self.scope))
+        if not identity or identity[1] is None:
+            return None
+        user_id, member_id, username = identity
+        return Member(pk=member_id, user=User(pk=user_id, username=username))
+
+    async def groups_for_connection(self):
+        """Groups this socket listens on, or None to refuse the connection."""
+        raise NotImplementedError
+
+    # ---------- incoming frames ----------
+
+    async def receive(self, text_data=None, bytes_data=None):
         try:
-            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+            frame = json.loads(text_data or "")
+        except ValueError:
+            await self.send_error(None, "Frames must be JSON objects.")
+            return
+        if not isinstance(frame, dict):
+            await self.send_error(None, "Frames must be JSON objects.")
+            return
+
+        if "action" not in frame:
+            # older clients send frames like {"subscribe_channel": <id>}; they were always ignored
+            return
+        handler = {
+            "send": self.frame_send,
+            "typing": self.frame_typing,
+            "mark_read": self.frame_mark_read,
+            "history": self.frame_history,
+        }.get(frame.get("action"))
+        if handler is None:
+            await self.send_error(frame.get("client_id"), f"Unknown action: {frame.get('action')!r}")
+            return
+        await handler(frame)
+
+    async def send_json(self, data):
+        await self.send(text_data=json.dumps(data, default=str))
+
+    async def send_error(self, client_id, detail):
+        await self.send_json({"type": "error", "client_id": client_id, "detail": detail})
+
+    async def frame_send(self, frame):
+        content = frame.get("content")
+        if not isinstance(content, str) or not content.strip():
+            await self.send_error(frame.get("client_id"), "content is required.")
+            return
+        if len(content) > MAX_CONTENT_LENGTH:
+            await self.send_error(frame.get("client_id"), f"content is longer than {MAX_CONTENT_LENGTH} characters.")
+            return
+
+        self._pending_sends.append(frame)
+        if len(self._pending_sends) >= getattr(settings, "CHAT_SOCKET_BATCH_SIZE", 50):
+            await self._flush_sends()
+        elif self._flush_task is None:
+            self._flush_task = asyncio.ensure_future(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(getattr(settings, "CHAT_SOCKET_BATCH_WINDOW", 0.02))
+        self._flush_task = None
+        await self._flush_sends()
+
+    async def _flush_sends(self, ack=True):
+        if self._flush_task is not None and self._flush_task is not asyncio.current_task():
+            self._flush_task.cancel()
+            self._flush_task = None
+        frames, self._pending_sends = self._pending_sends, []
+        if not frames:
+            return
+        try:
+            results = await database_sync_to_async(self.persist_sends)(frames)
         except Exception:
-            pass
+            logger.exception("Failed to save %d chat socket message(s)", len(frames))
+            results = ["Message could not be saved."] * len(frames)
+        if not ack:
+            return
+        for frame, result in zip(frames, results):
+            if isinstance(result, str):
+                await self.send_error(frame.get("client_id"), result)
+            else:
+                await self.send_json({"type": "ack", "action": "send", "client_id": frame.get("client_id"), **result})
+
+    def persist_sends(self, frames):
+        """Save a batch of send frames; one ack dict or error string per frame, in order."""
+        raise NotImplementedError
+
+    async def frame_typing(self, frame):
+        group = await self.typing_group(frame)
+        if group is None:
+            return
+        now = time.monotonic()
+        if now - self._last_typing.get(group, 0) < 1:
+            return
+        self._last_typing[group] = now
+        await self.channel_layer.group_send(group, {
+            "type": "chat.typing",
+            "typing": {
+                "member_id": self.member.pk,
+                "username": getattr(self.member.user, "username", None),
+                "target": frame.get("recipient_id") or frame.get("channel_id"),
+                "typing": bool(frame.get("typing", True)),
+            },
+        })
+
+    async def frame_mark_read(self, frame):
+        try:
+            result = await database_sync_to_async(self.mark_read)(frame)
+        except ValueError as exc:
+            await self.send_error(frame.get("client_id"), str(exc))
+            return
+        await self.send_json({"type": "ack", "action": "mark_read", "client_id": frame.get("client_id"), **result})
+
+    async def frame_history(self, frame):
+        try:
+            size = int(frame.get("limit") or getattr(settings, "CHAT_MESSAGES_PAGE_SIZE", 50))
+        except (TypeError, ValueError):
+            await self.send_error(frame.get("client_id"), "limit must be an integer.")
+            return
+        size = max(1, min(size, getattr(settings, "CHAT_MESSAGES_MAX_PAGE_SIZE", 200)))
+        try:
+            before = MessageKeysetPagination.decode_cursor(frame["before"]) if frame.get("before") else None
+            after = MessageKeysetPagination.decode_cursor(frame["after"]) if frame.get("after") else None
+            results, previous, next_ = await database_sync_to_async(self.history_page)(frame, size, before, after)
+        except (NotFound, ValueError) as exc:
+            await self.send_error(frame.get("client_id"), str(exc))
+            return
+        await self.send_json({
+            "type": "history", "client_id": frame.get("client_id"),
+            "results": results, "previous": previous, "next": next_,
+        })
+
+    def _page(self, queryset, size, before, after, to_frame):
+        page, has_older, has_newer = MessageKeysetPagination.page_for(queryset, size, before=before, after=after)
+        previous = MessageKeysetPagination.encode_cursor(page[0]) if page and has_older else None
+        next_ = MessageKeysetPagination.encode_cursor(page[-1]) if page and has_newer else None
+        return [to_frame(m) for m in page], previous, next_
+
+    # ---------- events from the channel layer ----------
 
-    # Handler for messages sent to group by server code (type: "chat.message")
     async def chat_message(self, event):
         """
         event should contain 'message' which is a JSON-serializable dict representing the message.
@@ -62,3 +275,144 @@ class DMConsumer(AsyncWebsocketConsumer):
         if message is None:
             return
         await self.send(text_data=json.dumps(message))
+
+    async def chat_typing(self, event):
+        typing = event.get("typing") or {}
+        if typing.get("member_id") == self.member.pk:
+            return
+        await self.send_json({"type": "typing", **typing})
+
+
+class DMConsumer(ChatSocketConsumer):
+    """
+    WebSocket consumer for direct messages.
+    Expects token in query string, e.g. ws://.../ws/dm?token=<token>
+    On connect: validate token -> find user -> find Member record -> add to group "dm_<member_pk>".
+    Frames name the other member with "recipient_id" (send, typing) or
+    "member_id" (mark_read, history).
+    """
+
+    async def groups_for_connection(self):
+        # group name based on member pk
+        self.group_name = f"dm_{self.member.pk}"
+        return [self.group_name]
+
+    def persist_sends(self, frames):
+        recipient_ids = set()
+        for frame in frames:
+            try:
+                recipient_ids.add(int(frame.get("recipient_id")))
+            except (TypeError, ValueError):
+                pass
+        recipients = Member.objects.select_related("user").in_bulk(recipient_ids)
+
+        results = [None] * len(frames)
+        created = []
+        with transaction.atomic():
+            conversations = {
+                rid: DMConversation.objects.between(self.member.pk, rid) for rid in recipients
+            }
+            for i, frame in enumerate(frames):
+                try:
+                    recipient = recipients.get(int(frame.get("recipient_id")))
+                except (TypeError, ValueError):
+                    recipient = None
+                if recipient is None:
+                    results[i] = "Recipient member not found."
+                    continue
+                created.append((i, DirectMessage(
+                    sender=self.member.user,
+                    recipient=recipient,
+                    conversation=conversations[recipient.pk],
+                    content=frame["content"],
+                    message_type=DirectMessage.MESSAGE_TEXT,
+                )))
+            DirectMessage.objects.bulk_create([dm for _, dm in created])
+
+            # bulk_create skips DirectMessage.save: move each conversation's last message here
+            latest = {}
+            for _, dm in created:
+                latest[dm.conversation_id] = dm
+            for conversation_id, dm in latest.items():
+                DMConversation.objects.filter(pk=conversation_id).update(last_message=dm, last_message_at=dm.created_at)
+
+            sends = []
+            for i, dm in created:
+                event = {"type": "chat.message", "message": dm_frame(dm, self.member.pk)}
+                sends.append((f"dm_{dm.recipient_id}", event))
+                sends.append((f"dm_{self.member.pk}", event))
+                results[i] = {"id": dm.pk, "conversation_id": dm.conversation_id, "created_at": dm.created_at.isoformat()}
+            broadcaster.publish(sends)
+        return results
+
+    async def typing_group(self, frame):
+        try:
+            return f"dm_{int(frame.get('recipient_id'))}"
+        except (TypeError, ValueError):
+            await self.send_error(frame.get("client_id"), "recipient_id is required.")
+            return None
+
+    def _other_member_id(self, frame):
+        try:
+            return int(frame.get("member_id") or frame.get("recipient_id"))
+        except (TypeError, ValueError):
+            raise ValueError("member_id is required.")
+
+    def mark_read(self, frame):
+        low, high = DMConversation.objects.canonical(self.member.pk, self._other_member_id(frame))
+        marked = DirectMessage.objects.filter(
+            conversation__low_member_id=low, conversation__high_member_id=high,
+            recipient=self.member, read=False,
+        ).update(read=True, read_at=timezone.now())
+        return {"marked": marked}
+
+    def history_page(self, frame, size, before, after):
+        low, high = DMConversation.objects.canonical(self.member.pk, self._other_member_id(frame))
+        qs = DirectMessage.objects.filter(
+            conversation__low_member_id=low, conversation__high_member_id=high,
+        ).select_related("sender__member_profile", "recipient__user")
+        return self._page(qs, size, before, after, dm_frame)
+
+
+class ChannelConsumer(ChatSocketConsumer):
+    """
+    WebSocket for one group channel: ws://.../ws/channels/<channel_id>/?token=<token>.
+    Only participants may connect; they join group "channel_<id>".
+    """
+
+    async def groups_for_connection(self):
+        self.chat_channel = await self._participant_channel(int(self.scope["url_route"]["kwargs"]["channel_id"]))
+        if self.chat_channel is None:
+            return None
+        return [f"channel_{self.chat_channel.pk}"]
+
+    @database_sync_to_async
+    def _participant_channel(self, channel_id):
+        return Channel.objects.filter(pk=channel_id, participants=self.member).first()
+
+    def persist_sends(self, frames):
+        with transaction.atomic():
+            messages = Message.objects.bulk_create([
+                Message(channel=self.chat_channel, sender=self.member.user, content=frame["content"])
+                for frame in frames
+            ])
+            # bulk_create skips Message.save: update the channel preview once for the batch
+            last = messages[-1]
+            Channel.objects.filter(pk=self.chat_channel.pk).update(
+                last_message=last.content[:200], last_message_at=last.created_at,
+            )
+            group = f"channel_{self.chat_channel.pk}"
+            broadcaster.publish([
+                (group, {"type": "chat.message", "message": channel_message_frame(m)}) for m in messages
+            ])
+        return [{"id": m.pk, "channel_id": m.channel_id, "created_at": m.created_at.isoformat()} for m in messages]
+
+    async def typing_group(self, frame):
+        return f"channel_{self.chat_channel.pk}"
+
+    def mark_read(self, frame):
+        return {"last_read_message_id": ChannelReadCursor.advance(self.chat_channel, self.member)}
+
+    def history_page(self, frame, size, before, after):
+        qs = Message.objects.filter(channel=self.chat_channel).select_related("sender")
+        return self._page(qs, size, before, after, channel_message_frame)
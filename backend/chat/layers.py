@@ -0,0 +1,319 @@
+# chat/layers.py
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from channels.exceptions import ChannelFull
+from channels.layers import BaseChannelLayer
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS layer_message (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    inbox TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    body TEXT NOT NULL,
+    expires REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS layer_message_inbox_idx ON layer_message (inbox, id);
+CREATE INDEX IF NOT EXISTS layer_message_channel_idx ON layer_message (channel);
+CREATE INDEX IF NOT EXISTS layer_message_expires_idx ON layer_message (expires);
+CREATE TABLE IF NOT EXISTS layer_group (
+    grp TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    joined REAL NOT NULL,
+    PRIMARY KEY (grp, channel)
+);
+CREATE INDEX IF NOT EXISTS layer_group_channel_idx ON layer_group (channel);
+"""
+
+
+class SQLiteChannelLayer(BaseChannelLayer):
+    """
+    Channel layer shared by every process on one host through a SQLite file
+    in WAL mode, so several ASGI workers reach each other's sockets without
+    running Redis. Use channels_redis when workers span several hosts.
+
+    - Each process has one poller that moves all messages for its own
+      channels ("specific.<process>!...") into local queues, a batch per query.
+    - group_send / group_send_many write every recipient in one transaction.
+    - Messages expire after `expiry` seconds; a channel whose messages expire
+      undelivered is dropped from its groups, as with the Redis layer.
+    - `capacity` / `channel_capacity` bound the undelivered messages per
+      channel: send() raises ChannelFull, group sends skip full channels,
+      and the poller drops messages for a local consumer that is that far behind.
+
+    Messages must be JSON-serializable.
+    """
+
+    extensions = ["groups", "flush"]
+
+    def __init__(
+        self,
+        path=None,
+        expiry=60,
+        group_expiry=86400,
+        capacity=100,
+        channel_capacity=None,
+        poll_interval=0.05,
+        batch_size=500,
+        **kwargs,
+    ):
+        super().__init__(expiry=expiry, capacity=capacity, **kwargs)
+        self.channel_capacity = self.compile_capacities(channel_capacity or {})
+        self.path = str(path or os.path.join(tempfile.gettempdir(), "channel_layer.sqlite3"))
+        self.group_expiry = group_expiry
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.client_prefix = uuid.uuid4().hex[:12]
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+        self._buffers = {}
+        self._poller = None
+        self._last_cleanup = 0.0
+
+    # ---------- SQLite plumbing (runs in worker threads) ----------
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._schema_lock:
+                if not self._schema_ready:
+                    conn.executescript(SCHEMA)
+                    self._schema_ready = True
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _write(self):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _send_sync(self, channel, body):
+        now = time.time()
+        with self._write() as conn:
+            pending = conn.execute(
+                "SELECT COUNT(*) FROM layer_message WHERE channel = ? AND expires >= ?", (channel, now)
+            ).fetchone()[0]
+            if pending >= self.get_capacity(channel):
+                raise ChannelFull(channel)
+            conn.execute(
+                "INSERT INTO layer_message (inbox, channel, body, expires) VALUES (?, ?, ?, ?)",
+                (self.non_local_name(channel), channel, body, now + self.expiry),
+            )
+
+    def _group_send_sync(self, items):
+        """Fan out (group, body) pairs in one transaction; returns (queued, dropped)."""
+        now = time.time()
+        queued = dropped = 0
+        with self._write() as conn:
+            pending = {}
+            rows = []
+            for group, body in items:
+                channels = [
+                    row[0] for row in conn.execute(
+                        "SELECT channel FROM layer_group WHERE grp = ? AND joined >= ?", (group, now - self.group_expiry)
+                    )
+                ]
+                for channel in channels:
+                    if channel not in pending:
+                        pending[channel] = conn.execute(
+                            "SELECT COUNT(*) FROM layer_message WHERE channel = ? AND expires >= ?", (channel, now)
+                        ).fetchone()[0]
+                    if pending[channel] >= self.get_capacity(channel):
+                        dropped += 1
+                        continue
+                    pending[channel] += 1
+                    rows.append((self.non_local_name(channel), channel, body, now + self.expiry))
+            conn.executemany(
+                "INSERT INTO layer_message (inbox, channel, body, expires) VALUES (?, ?, ?, ?)", rows
+            )
+            queued = len(rows)
+        return queued, dropped
+
+    def _pop_sync(self, inbox, limit):
+        """Remove and return up to `limit` live (channel, body) rows for an inbox, oldest first."""
+        conn = self._conn()
+        # cheap read first so an idle poller never takes the write lock
+        if conn.execute("SELECT 1 FROM layer_message WHERE inbox = ? LIMIT 1", (inbox,)).fetchone() is None:
+            return []
+        with self._write() as conn:
+            rows = conn.execute(
+                "SELECT id, channel, body, expires FROM layer_message WHERE inbox = ? ORDER BY id LIMIT ?",
+                (inbox, limit),
+            ).fetchall()
+            if rows:
+                conn.execute("DELETE FROM layer_message WHERE inbox = ? AND id <= ?", (inbox, rows[-1][0]))
+        now = time.time()
+        return [(channel, body) for _, channel, body, expires in rows if expires >= now]
+
+    def _discard_channels_sync(self, channels):
+        with self._write() as conn:
+            conn.executemany("DELETE FROM layer_group WHERE channel = ?", [(c,) for c in channels])
+
+    def _cleanup_sync(self):
+        now = time.time()
+        with self._write() as conn:
+            expired = [row[0] for row in conn.execute(
+                "SELECT DISTINCT channel FROM layer_message WHERE expires < ?", (now,)
+            )]
+            if expired:
+                conn.execute("DELETE FROM layer_message WHERE expires < ?", (now,))
+                conn.executemany("DELETE FROM layer_group WHERE channel = ?", [(c,) for c in expired])
+            conn.execute("DELETE FROM layer_group WHERE joined < ?", (now - self.group_expiry,))
+        if expired:
+            logger.info("Channel layer expired undelivered messages on %d channel(s)", len(expired))
+
+    def _group_add_sync(self, group, channel):
+        with self._write() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO layer_group (grp, channel, joined) VALUES (?, ?, ?)", (group, channel, time.time())
+            )
+
+    def _group_discard_sync(self, group, channel):
+        with self._write() as conn:
+            conn.execute("DELETE FROM layer_group WHERE grp = ? AND channel = ?", (group, channel))
+
+    def _flush_sync(self):
+        with self._write() as conn:
+            conn.execute("DELETE FROM layer_message")
+            conn.execute("DELETE FROM layer_group")
+
+    async def _maybe_cleanup(self):
+        if time.time() - self._last_cleanup < max(1.0, self.expiry / 2):
+            return
+        self._last_cleanup = time.time()
+        await asyncio.to_thread(self._cleanup_sync)
+
+    # ---------- Channel layer API ----------
+
+    async def send(self, channel, message):
+        assert isinstance(message, dict), "message is not a dict"
+        self.require_valid_channel_name(channel)
+        assert "__asgi_channel__" not in message
+        await asyncio.to_thread(self._send_sync, channel, json.dumps(message))
+        await self._maybe_cleanup()
+
+    async def receive(self, channel):
+        self.require_valid_channel_name(channel)
+        if "!" not in channel:
+            return await self._receive_shared(channel)
+
+        queue = self._buffers.get(channel)
+        if queue is None:
+            queue = self._buffers[channel] = asyncio.Queue()
+        self._ensure_poller()
+        try:
+            return await queue.get()
+        except asyncio.CancelledError:
+            # the consumer is going away; later messages for it are dropped by the poller
+            if queue.empty():
+                self._buffers.pop(channel, None)
+            raise
+
+    async def _receive_shared(self, channel):
+        """Receive on a non-process-specific channel; any process may take the message."""
+        delay = 0.005
+        while True:
+            rows = await asyncio.to_thread(self._pop_sync, channel, 1)
+            if rows:
+                return json.loads(rows[0][1])
+            await asyncio.sleep(delay)
+            delay = min(self.poll_interval, delay * 2)
+
+    async def new_channel(self, prefix="specific."):
+        return f"{prefix}{self.client_prefix}!{uuid.uuid4().hex}"
+
+    def _ensure_poller(self):
+        loop = asyncio.get_running_loop()
+        if self._poller is None or self._poller.done() or self._poller.get_loop() is not loop:
+            self._poller = loop.create_task(self._poll())
+
+    async def _poll(self):
+        delay = 0.005
+        while self._buffers:
+            delivered = overflow = 0
+            orphaned = set()
+            for inbox in {self.non_local_name(channel) for channel in self._buffers}:
+                rows = await asyncio.to_thread(self._pop_sync, inbox, self.batch_size)
+                delivered += len(rows)
+                for channel, body in rows:
+                    queue = self._buffers.get(channel)
+                    if queue is None:
+                        orphaned.add(channel)
+                    elif queue.qsize() >= self.get_capacity(channel):
+                        overflow += 1
+                    else:
+                        queue.put_nowait(json.loads(body))
+            if overflow:
+                logger.warning("Channel layer dropped %d message(s): local consumers not keeping up", overflow)
+            if orphaned:
+                await asyncio.to_thread(self._discard_channels_sync, orphaned)
+            await self._maybe_cleanup()
+            if delivered:
+                delay = 0.005
+                continue
+            await asyncio.sleep(delay)
+            delay = min(self.poll_interval, delay * 2)
+
+    # ---------- Groups extension ----------
+
+    async def group_add(self, group, channel):
+        self.require_valid_group_name(group)
+        self.require_valid_channel_name(channel)
+        await asyncio.to_thread(self._group_add_sync, group, channel)
+
+    async def group_discard(self, group, channel):
+        self.require_valid_channel_name(channel)
+        self.require_valid_group_name(group)
+        await asyncio.to_thread(self._group_discard_sync, group, channel)
+
+    async def group_send(self, group, message):
+        await self.group_send_many([(group, message)])
+
+    async def group_send_many(self, messages):
+        """
+        Send several (group, message) pairs in one transaction. Channels at
+        capacity are skipped, as group_send does. Returns (queued, dropped).
+        """
+        items = []
+        for group, message in messages:
+            assert isinstance(message, dict), "Message is not a dict"
+            self.require_valid_group_name(group)
+            items.append((group, json.dumps(message)))
+        if not items:
+            return 0, 0
+        queued, dropped = await asyncio.to_thread(self._group_send_sync, items)
+        if dropped:
+            logger.warning("Channel layer dropped %d group message(s): channels at capacity", dropped)
+        await self._maybe_cleanup()
+        return queued, dropped
+
+    # ---------- Flush extension ----------
+
+    async def flush(self):
+        await asyncio.to_thread(self._flush_sync)
+        self._buffers = {}
+
+    async def close(self):
+        if self._poller is not None:
+            self._poller.cancel()
+            self._poller = None
@@ -1,30 +1,157 @@
 # chat/middleware.py
+import asyncio
+import threading
+import time
 from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
 from rest_framework.authtoken.models import Token
 
 User = get_user_model()
 
+_MISSING = object()
+
+
+class TokenIdentityCache:
+    """
+    Process-local TTL cache of token key -> (user_id, member_id, username),
+    or None for a key that matched no token. Lets a reconnect storm after a
+    deploy authenticate from memory instead of hitting the auth tables once
+    per socket. Deleted tokens are dropped at once by chat.signals; other
+    workers see a revoked token for at most CHAT_WS_TOKEN_CACHE_TTL seconds.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def ttl(self):
+        return getattr(settings, "CHAT_WS_TOKEN_CACHE_TTL", 60)
+
+    @property
+    def max_entries(self):
+        return getattr(settings, "CHAT_WS_TOKEN_CACHE_SIZE", 10000)
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return _MISSING
+
+    def set(self, key, identity):
+        now = time.monotonic()
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._entries = {k: v for k, v in self._entries.items() if v[0] > now}
+                if len(self._entries) >= self.max_entries:
+                    self._entries.clear()
+            self._entries[key] = (now + self.ttl, identity)
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+token_cache = TokenIdentityCache()
+
+
+def token_from_scope(scope):
+    qs = parse_qs(scope.get("query_string", b"").decode())
+    values = qs.get("token") or qs.get("auth_token") or qs.get("authToken") or qs.get("access_token") or []
+    return values[0] if values else None
+
+
+@database_sync_to_async
+def _load_identity(key):
+    row = (
+        Token.objects.filter(key=key)
+        .values_list("user_id", "user__member_profile__id", "user__username")
+        .first()
+    )
+    return tuple(row) if row else None
+
+
+_inflight = {}
+
+
+async def resolve_token(key):
+    """
+    (user_id, member_id, username) for a token key, or None. Served from
+    token_cache; concurrent misses for one key share a single query.
+    """
+    if not key:
+        return None
+    identity = token_cache.get(key)
+    if identity is not _MISSING:
+        return identity
+
+    pending = _inflight.get(key)
+    if pending is not None:
+        return await asyncio.shield(pending)
+    pending = _inflight[key] = asyncio.get_running_loop().create_future()
+    try:
+        identity = await _load_identity(key)
+    except BaseException as exc:
+        pending.set_exception(exc)
+        # mark it retrieved so a lookup nobody else waited on is not logged as unhandled
+        pending.exception()
+        raise
+    else:
+        token_cache.set(key, identity)
+        pending.set_result(identity)
+        return identity
+    finally:
+        _inflight.pop(key, None)
+
+
+def cached_user(user_id, username):
+    """
+    The socket's User built from the cached identity, without a query: only
+    `id` and `username` are loaded. Reading any other field is a deferred load,
+    so do that from sync code (database_sync_to_async), never on the event loop.
+    """
+    return User.from_db(None, ["id", "username"], [user_id, username])
+
+
 class TokenAuthMiddleware:
     """
     Token auth middleware for Channels.
     Expects ?token=<token> in websocket URL (dev-friendly).
-    Sets scope['user'] to the token user or AnonymousUser.
+
+    Sets scope["user_id"], scope["member_id"] and scope["username"] (None when
+    the token is missing or unknown) and scope["user"] to cached_user() or
+    AnonymousUser. At most one query per token per CHAT_WS_TOKEN_CACHE_TTL,
+    and none at all on the event loop.
     """
+
     def __init__(self, inner):
         self.inner = inner
 
-    def __call__(self, scope):
-        query_string = scope.get("query_string", b"").decode()
-        qs = parse_qs(query_string)
-        token_list = qs.get("token") or qs.get("auth_token") or []
-        user = None
-        if token_list:
-            token_key = token_list[0]
-            try:
-                token = Token.objects.select_related("user").get(key=token_key)
-                user = token.user
-            except Token.DoesNotExist:
-                user = None
-        scope["user"] = user
-        return self.inner(scope)
+    async def __call__(self, scope, receive, send):
+        identity = await resolve_token(token_from_scope(scope))
+        user_id, member_id, username = identity or (None, None, None)
+        scope = dict(
+            scope,
+            user_id=user_id,
+            member_id=member_id,
+            username=username,
+            user=cached_user(user_id, username) if user_id is not None else AnonymousUser(),
+        )
+        return await self.inner(scope, receive, send)
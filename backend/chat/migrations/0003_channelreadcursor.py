@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-18 01:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0002_directmessage'),
+        ('projects', '0011_member_hourly_rate_project_hourly_rate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChannelReadCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_read_message_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('channel', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='read_cursors', to='chat.channel')),
+                ('member', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='channel_read_cursors', to='projects.member')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('channel', 'member'), name='chat_read_cursor_channel_member_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations
+from django.db.models import Max
+
+
+def backfill_read_cursors(apps, schema_editor):
+    """One cursor per (channel, member) at the newest message the member had in read_by."""
+    Message = apps.get_model("chat", "Message")
+    ChannelReadCursor = apps.get_model("chat", "ChannelReadCursor")
+
+    rows = (
+        Message.read_by.through.objects
+        .values("message__channel_id", "member_id")
+        .annotate(last_id=Max("message_id"))
+        .order_by()
+    )
+    ChannelReadCursor.objects.bulk_create(
+        [
+            ChannelReadCursor(channel_id=row["message__channel_id"], member_id=row["member_id"], last_read_message_id=row["last_id"])
+            for row in rows.iterator()
+        ],
+        batch_size=500,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0003_channelreadcursor'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_read_cursors, migrations.RunPython.noop),
+    ]
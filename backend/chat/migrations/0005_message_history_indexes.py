@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-18 01:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0004_backfill_channel_read_cursors'),
+        ('projects', '0011_member_hourly_rate_project_hourly_rate'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='directmessage',
+            index=models.Index(fields=['sender', 'recipient', 'created_at', 'id'], name='chat_dm_pair_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['channel', 'created_at', 'id'], name='chat_msg_channel_created_idx'),
+        ),
+    ]
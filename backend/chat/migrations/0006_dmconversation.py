@@ -0,0 +1,48 @@
+# Generated by Django 5.2.7 on 2026-10-18 01:07
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0005_message_history_indexes'),
+        ('projects', '0011_member_hourly_rate_project_hourly_rate'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DMConversation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_message_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('high_member', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='projects.member')),
+                ('last_message', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='chat.directmessage')),
+                ('low_member', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='projects.member')),
+            ],
+            options={
+                'ordering': ['-last_message_at', '-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='directmessage',
+            name='conversation',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='messages', to='chat.dmconversation'),
+        ),
+        migrations.AddIndex(
+            model_name='directmessage',
+            index=models.Index(fields=['conversation', 'created_at', 'id'], name='chat_dm_conv_created_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='dmconversation',
+            constraint=models.UniqueConstraint(fields=('low_member', 'high_member'), name='chat_dm_conversation_pair_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='dmconversation',
+            constraint=models.CheckConstraint(condition=models.Q(('low_member__lte', models.F('high_member'))), name='chat_dm_conversation_pair_ordered'),
+        ),
+    ]
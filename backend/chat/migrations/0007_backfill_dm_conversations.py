@@ -0,0 +1,52 @@
+from django.db import migrations
+
+
+def backfill_conversations(apps, schema_editor):
+    """Attach every direct message to the conversation of its (sender member, recipient) pair."""
+    DirectMessage = apps.get_model("chat", "DirectMessage")
+    DMConversation = apps.get_model("chat", "DMConversation")
+    Member = apps.get_model("projects", "Member")
+
+    member_by_user = dict(Member.objects.values_list("user_id", "pk"))
+    conversations = {
+        (c.low_member_id, c.high_member_id): c for c in DMConversation.objects.all()
+    }
+
+    batch = []
+    qs = DirectMessage.objects.filter(conversation__isnull=True).order_by("created_at", "pk").only(
+        "pk", "sender_id", "recipient_id", "created_at"
+    )
+    for dm in qs.iterator():
+        sender_member = member_by_user.get(dm.sender_id)
+        if sender_member is None:
+            continue
+        pair = (min(sender_member, dm.recipient_id), max(sender_member, dm.recipient_id))
+        conversation = conversations.get(pair)
+        if conversation is None:
+            conversation = DMConversation.objects.create(low_member_id=pair[0], high_member_id=pair[1])
+            conversations[pair] = conversation
+        dm.conversation_id = conversation.pk
+        conversation.last_message_id = dm.pk
+        conversation.last_message_at = dm.created_at
+        batch.append(dm)
+        if len(batch) >= 500:
+            DirectMessage.objects.bulk_update(batch, ["conversation"])
+            batch = []
+    if batch:
+        DirectMessage.objects.bulk_update(batch, ["conversation"])
+
+    DMConversation.objects.bulk_update(
+        list(conversations.values()), ["last_message", "last_message_at"], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0006_dmconversation'),
+        ('projects', '0011_member_hourly_rate_project_hourly_rate'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_conversations, migrations.RunPython.noop),
+    ]
@@ -3,6 +3,8 @@ from django.db import models
 # Create your models here.
 from django.db import models
 from django.conf import settings
+from django.db.models import Count, F, Max, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
 from django.utils import timezone
 
 from projects.models import Member
@@ -11,6 +13,58 @@ from projects.models import Member
 # from projects.models import Member   # adjust import if Member is in another app
 # we will reference Member by string to avoid circular imports below
 
+class DMConversationQuerySet(models.QuerySet):
+    def for_member(self, member):
+        return self.filter(Q(low_member=member) | Q(high_member=member))
+
+    def with_unread_count(self, member):
+        """Annotate `unread_count`: messages to `member` not yet read, one grouped query."""
+        return self.annotate(unread_count=Count(
+            "messages", filter=Q(messages__recipient=member, messages__read=False),
+        ))
+
+
+class DMConversationManager(models.Manager.from_queryset(DMConversationQuerySet)):
+    @staticmethod
+    def canonical(member_a_id, member_b_id):
+        return min(member_a_id, member_b_id), max(member_a_id, member_b_id)
+
+    def between(self, member_a_id, member_b_id):
+        """The conversation of two members, created on first use."""
+        low, high = self.canonical(member_a_id, member_b_id)
+        conversation, _ = self.get_or_create(low_member_id=low, high_member_id=high)
+        return conversation
+
+
+class DMConversation(models.Model):
+    """
+    One row per pair of members who have exchanged direct messages, stored
+    as (low_member, high_member) so either direction finds the same row.
+    """
+    low_member = models.ForeignKey(Member, on_delete=models.CASCADE, related_name="+")
+    high_member = models.ForeignKey(Member, on_delete=models.CASCADE, related_name="+")
+    last_message = models.ForeignKey(
+        "DirectMessage", on_delete=models.SET_NULL, null=True, blank=True, related_name="+",
+    )
+    last_message_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = DMConversationManager()
+
+    class Meta:
+        ordering = ["-last_message_at", "-created_at"]
+        constraints = [
+            models.UniqueConstraint(fields=["low_member", "high_member"], name="chat_dm_conversation_pair_uniq"),
+            models.CheckConstraint(condition=Q(low_member__lte=F("high_member")), name="chat_dm_conversation_pair_ordered"),
+        ]
+
+    def other_member_id(self, member_id):
+        return self.high_member_id if member_id == self.low_member_id else self.low_member_id
+
+    def __str__(self):
+        return f"DM conversation {self.low_member_id}-{self.high_member_id}"
+
+
 class DirectMessage(models.Model):
     MESSAGE_TEXT = "text"
     MESSAGE_IMAGE = "image"
@@ -32,6 +86,13 @@ class DirectMessage(models.Model):
         on_delete=models.CASCADE,
         related_name="received_direct_messages",
     )
+    conversation = models.ForeignKey(
+        DMConversation,
+        on_delete=models.CASCADE,
+        related_name="messages",
+        null=True,
+        blank=True,
+    )
 
     content = models.TextField(blank=True)
     message_type = models.CharField(max_length=10, choices=MESSAGE_CHOICES, default=MESSAGE_TEXT)
@@ -43,6 +104,29 @@ class DirectMessage(models.Model):
 
     class Meta:
         ordering = ("created_at",)
+        indexes = [
+            # one index serves both directions of a conversation and keyset paging
+            models.Index(fields=["sender", "recipient", "created_at", "id"], name="chat_dm_pair_created_idx"),
+            models.Index(fields=["conversation", "created_at", "id"], name="chat_dm_conv_created_idx"),
+        ]
+
+    # fields whose change can make this the conversation's last message
+    CONVERSATION_FIELDS = frozenset({"conversation", "content", "message_type", "file", "created_at"})
+
+    def save(self, *args, **kwargs):
+        if self.conversation_id is None and self.recipient_id is not None:
+            # senders without a Member keep conversation=None; creating one would make them an assign candidate
+            sender_member_id = Member.objects.filter(user_id=self.sender_id).values_list("pk", flat=True).first()
+            if sender_member_id is not None:
+                self.conversation = DMConversation.objects.between(sender_member_id, self.recipient_id)
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get("update_fields")
+        if self.conversation_id is None or (update_fields is not None and not self.CONVERSATION_FIELDS & set(update_fields)):
+            return
+        # keep the conversation's last message current for the inbox list
+        DMConversation.objects.filter(pk=self.conversation_id).filter(
+            Q(last_message_at__isnull=True) | Q(last_message_at__lte=self.created_at)
+        ).update(last_message=self, last_message_at=self.created_at)
 
     def mark_read(self):
         if not self.read:
@@ -53,6 +137,21 @@ class DirectMessage(models.Model):
     def __str__(self):
         return f"DM {self.pk} from {self.sender} to {self.recipient}"
 
+class ChannelQuerySet(models.QuerySet):
+    def with_unread_count(self, member):
+        """
+        Annotate `unread_count` for `member`: messages from others past the
+        member's read cursor. One grouped query for the whole list.
+        """
+        cursor = Subquery(
+            ChannelReadCursor.objects.filter(channel=OuterRef("pk"), member=member).values("last_read_message_id")[:1]
+        )
+        return self.annotate(unread_count=Count(
+            "messages",
+            filter=Q(messages__id__gt=Coalesce(cursor, Value(0))) & ~Q(messages__sender_id=member.user_id),
+        ))
+
+
 class Channel(models.Model):
     CHANNEL = "channel"
     DIRECT = "direct"
@@ -67,6 +166,8 @@ class Channel(models.Model):
     last_message_at = models.DateTimeField(null=True, blank=True)
     is_private = models.BooleanField(default=True)
 
+    objects = ChannelQuerySet.as_manager()
+
     class Meta:
         ordering = ["-last_message_at", "-created_at"]
 
@@ -97,6 +198,9 @@ class Message(models.Model):
 
     class Meta:
         ordering = ["created_at"]
+        indexes = [
+            models.Index(fields=["channel", "created_at", "id"], name="chat_msg_channel_created_idx"),
+        ]
 
     def __str__(self):
         return f"Message {self.pk} by {self.sender}"
@@ -111,3 +215,36 @@ class Message(models.Model):
         except Exception:
             # avoid raising in save
             pass
+
+
+class ChannelReadCursor(models.Model):
+    """
+    How far a member has read in a channel: every message with an id up to
+    last_read_message_id counts as read. Replaces per-message read_by rows for
+    unread counts; a mark-read is one UPDATE of this row.
+    """
+    channel = models.ForeignKey(Channel, related_name="read_cursors", on_delete=models.CASCADE)
+    member = models.ForeignKey("projects.Member", related_name="channel_read_cursors", on_delete=models.CASCADE)
+    # plain id rather than a FK so deleting a message does not reset the cursor
+    last_read_message_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["channel", "member"], name="chat_read_cursor_channel_member_uniq"),
+        ]
+
+    @classmethod
+    def advance(cls, channel, member):
+        """Mark everything in the channel read for `member`; returns the newest message id."""
+        last_id = channel.messages.aggregate(last_id=Max("id"))["last_id"] or 0
+        updated = cls.objects.filter(channel=channel, member=member).update(
+            last_read_message_id=Greatest(F("last_read_message_id"), Value(last_id)),
+            updated_at=timezone.now(),
+        )
+        if not updated:
+            cls.objects.get_or_create(channel=channel, member=member, defaults={"last_read_message_id": last_id})
+        return last_id
+
+    def __str__(self):
+        return f"{self.member} read {self.channel} up to {self.last_read_message_id}"
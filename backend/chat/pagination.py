@@ -0,0 +1,137 @@
+# chat/pagination.py
+import base64
+import binascii
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class MessageKeysetPagination(BasePagination):
+    """
+    Keyset pagination over (created_at, id) for message history.
+
+    - no cursor      -> the newest `page_size` messages
+    - ?before=<c>    -> the `page_size` messages just older than cursor c
+    - ?after=<c>     -> the `page_size` messages just newer than cursor c
+
+    Each page is in chronological order. `previous` links to older messages
+    and `next` to newer ones. Each page is one range scan on a
+    (..., created_at, id) index, however long the history is.
+    """
+    before_query_param = "before"
+    after_query_param = "after"
+    page_size_query_param = "page_size"
+
+    @property
+    def page_size(self):
+        return getattr(settings, "CHAT_MESSAGES_PAGE_SIZE", 50)
+
+    @property
+    def max_page_size(self):
+        return getattr(settings, "CHAT_MESSAGES_MAX_PAGE_SIZE", 200)
+
+    @staticmethod
+    def encode_cursor(message):
+        raw = f"{message.created_at.isoformat()}|{message.pk}"
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+    @staticmethod
+    def decode_cursor(cursor):
+        # socket frames can carry any JSON value here, not just the string we issued
+        if not isinstance(cursor, str):
+            raise NotFound("Invalid cursor")
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+            created_at, pk = raw.rsplit("|", 1)
+            created_at = parse_datetime(created_at)
+            pk = int(pk)
+        except (binascii.Error, UnicodeError, ValueError):
+            raise NotFound("Invalid cursor")
+        if created_at is None:
+            raise NotFound("Invalid cursor")
+        return created_at, pk
+
+    def get_page_size(self, request):
+        value = request.query_params.get(self.page_size_query_param)
+        if value is None:
+            return self.page_size
+        try:
+            size = int(value)
+        except ValueError:
+            raise ValidationError({self.page_size_query_param: "Must be an integer."})
+        return max(1, min(size, self.max_page_size))
+
+    @staticmethod
+    def page_for(queryset, size, before=None, after=None):
+        """
+        One keyset page: (messages in chronological order, has_older, has_newer).
+        `before` / `after` are decoded (created_at, id) cursors.
+        """
+        queryset = queryset.order_by()
+        if after:
+            created_at, pk = after
+            rows = list(
+                queryset.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk))
+                .order_by("created_at", "pk")[:size + 1]
+            )
+            return rows[:size], True, len(rows) > size
+        if before:
+            created_at, pk = before
+            queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+        rows = list(queryset.order_by("-created_at", "-pk")[:size + 1])
+        return rows[:size][::-1], len(rows) > size, bool(before)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        size = self.get_page_size(request)
+        before = request.query_params.get(self.before_query_param)
+        after = request.query_params.get(self.after_query_param)
+        if before and after:
+            raise ValidationError({"detail": "Pass either before or after, not both."})
+
+        page, self.has_older, self.has_newer = self.page_for(
+            queryset, size,
+            before=self.decode_cursor(before) if before else None,
+            after=self.decode_cursor(after) if after else None,
+        )
+        self.page = page
+        return page
+
+    def _link(self, param, message):
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.before_query_param)
+        url = remove_query_param(url, self.after_query_param)
+        return replace_query_param(url, param, self.encode_cursor(message))
+
+    def get_next_link(self):
+        if not self.page or not self.has_newer:
+            return None
+        return self._link(self.after_query_param, self.page[-1])
+
+    def get_previous_link(self):
+        if not self.page or not self.has_older:
+            return None
+        return self._link(self.before_query_param, self.page[0])
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
@@ -4,4 +4,5 @@ from . import consumers
 
 websocket_urlpatterns = [
     re_path(r"^ws/dm/?$", consumers.DMConsumer.as_asgi()),  # global DM ws endpoint: /ws/dm?token=...
+    re_path(r"^ws/channels/(?P<channel_id>\d+)/?$", consumers.ChannelConsumer.as_asgi()),  # /ws/channels/<id>/?token=...
 ]
@@ -2,7 +2,7 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from projects.models import Member
-from .models import DirectMessage, Message, Channel
+from .models import DirectMessage, DMConversation, Message, Channel
 
 User = get_user_model()
 
@@ -31,6 +31,7 @@ class DirectMessageSerializer(serializers.ModelSerializer):
             "sender_member_id",
             "recipient_id",
             "recipient_member",
+            "conversation",
             "content",
             "message_type",
             "file",
@@ -52,6 +53,7 @@ class DirectMessageSerializer(serializers.ModelSerializer):
             "read_at",
             "created_at",
             "recipient_member",
+            "conversation",
             "is_sender",
             "other_member_id",
         )
@@ -135,6 +137,38 @@ class DirectMessageSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+class DMConversationSerializer(serializers.ModelSerializer):
+    other_member = serializers.SerializerMethodField(read_only=True)
+    last_message = serializers.SerializerMethodField(read_only=True)
+    unread_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = DMConversation
+        fields = ("id", "other_member", "last_message", "last_message_at", "unread_count", "created_at")
+        read_only_fields = fields
+
+    def get_other_member(self, obj):
+        request = self.context.get("request", None)
+        my_member = getattr(request.user, "member_profile", None) if request else None
+        other = obj.high_member if my_member and my_member.pk == obj.low_member_id else obj.low_member
+        user = getattr(other, "user", None)
+        name = (getattr(user, "get_full_name", lambda: "")() or "") if user else ""
+        return {"id": other.pk, "username": getattr(user, "username", None), "name": name}
+
+    def get_last_message(self, obj):
+        dm = obj.last_message
+        if dm is None:
+            return None
+        return {
+            "id": dm.pk,
+            "sender_id": dm.sender_id,
+            "content": dm.content,
+            "message_type": dm.message_type,
+            "created_at": dm.created_at,
+            "read": dm.read,
+        }
+
+
 class MessageSerializer(serializers.ModelSerializer):
     sender_id = serializers.ReadOnlyField(source="sender.pk")
     sender_username = serializers.ReadOnlyField(source="sender.username")
@@ -184,6 +218,10 @@ class ChannelSerializer(serializers.ModelSerializer):
         return [{"id": m.pk, "username": getattr(m.user, "username", None), "name": (getattr(m.user, "get_full_name", lambda: "")() or "")} for m in obj.participants.all()]
 
     def get_unread_count(self, obj):
+        # list/retrieve querysets annotate this (Channel.objects.with_unread_count)
+        annotated = getattr(obj, "unread_count", None)
+        if annotated is not None:
+            return annotated
         request = self.context.get("request", None)
         if not request or request.user.is_anonymous:
             return 0
@@ -191,7 +229,7 @@ class ChannelSerializer(serializers.ModelSerializer):
             member = request.user.member_profile
         except Exception:
             return 0
-        return obj.messages.exclude(read_by=member).count()
+        return Channel.objects.filter(pk=obj.pk).with_unread_count(member).values_list("unread_count", flat=True).first() or 0
 
     def create(self, validated_data):
         participant_objs = validated_data.pop("participant_ids", [])
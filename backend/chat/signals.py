@@ -0,0 +1,12 @@
+# chat/signals.py
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .middleware import token_cache
+
+
+@receiver(post_delete, sender=Token)
+def forget_deleted_token(sender, instance, **kwargs):
+    # login rotates tokens: stop accepting the old key on sockets in this process
+    token_cache.invalidate(instance.key)
@@ -1,3 +1,135 @@
-from django.test import TestCase
+import asyncio
+import multiprocessing
+import os
+import shutil
+import tempfile
 
-# Create your tests here.
+from channels.exceptions import ChannelFull
+from django.test import SimpleTestCase
+
+from .layers import SQLiteChannelLayer
+
+TIMEOUT = 10
+
+
+# ---------- roles played by the second process ----------
+
+def _child(role, path, config, *args):
+    asyncio.run(role(SQLiteChannelLayer(path=path, **config), *args))
+
+
+async def _consume(layer, group, count, ready, results):
+    channel = await layer.new_channel()
+    await layer.group_add(group, channel)
+    ready.put(channel)
+    try:
+        for _ in range(count):
+            results.put(await asyncio.wait_for(layer.receive(channel), TIMEOUT))
+    finally:
+        await layer.close()
+
+
+async def _group_send_many(layer, messages, results):
+    results.put(await layer.group_send_many(messages))
+
+
+async def _send(layer, channel, messages, results):
+    for message in messages:
+        try:
+            await layer.send(channel, message)
+            results.put("sent")
+        except ChannelFull:
+            results.put("full")
+
+
+class SQLiteChannelLayerTwoProcessTests(SimpleTestCase):
+    """Two processes sharing one layer file, as two ASGI workers on one host do."""
+
+    def setUp(self):
+        self.ctx = multiprocessing.get_context("spawn")
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp, True)
+        self.path = os.path.join(tmp, "layer.sqlite3")
+
+    def layer(self, **config):
+        layer = SQLiteChannelLayer(path=self.path, **config)
+        self.addCleanup(lambda: asyncio.run(layer.close()))
+        return layer
+
+    def start(self, role, *args, **config):
+        proc = self.ctx.Process(target=_child, args=(role, self.path, config) + args, daemon=True)
+        proc.start()
+        self.addCleanup(proc.kill)
+        return proc
+
+    async def get(self, queue):
+        return await asyncio.to_thread(queue.get, True, TIMEOUT)
+
+    async def finish(self, proc):
+        await asyncio.to_thread(proc.join, TIMEOUT)
+        self.assertEqual(proc.exitcode, 0)
+
+    async def test_group_send_reaches_consumer_in_other_process(self):
+        ready, results = self.ctx.Queue(), self.ctx.Queue()
+        proc = self.start(_consume, "room", 1, ready, results)
+        await self.get(ready)
+
+        await self.layer().group_send("room", {"type": "chat.message", "text": "hi"})
+
+        self.assertEqual(await self.get(results), {"type": "chat.message", "text": "hi"})
+        await self.finish(proc)
+
+    async def test_group_send_many_is_delivered_in_order(self):
+        ready, results = self.ctx.Queue(), self.ctx.Queue()
+        proc = self.start(_consume, "room", 50, ready, results, batch_size=20)
+        await self.get(ready)
+
+        queued, dropped = await self.layer().group_send_many(
+            [("room", {"type": "chat.message", "n": n}) for n in range(50)]
+            + [("nobody", {"type": "chat.message", "n": -1})]
+        )
+
+        self.assertEqual((queued, dropped), (50, 0))
+        self.assertEqual([(await self.get(results))["n"] for _ in range(50)], list(range(50)))
+        await self.finish(proc)
+
+    async def test_expired_messages_are_not_delivered(self):
+        layer = self.layer(expiry=1)
+        channel = await layer.new_channel()
+        await layer.group_add("room", channel)
+
+        results = self.ctx.Queue()
+        await self.finish(self.start(_group_send_many, [("room", {"type": "old"})], results, expiry=1))
+        self.assertEqual(await self.get(results), (1, 0))
+        await asyncio.sleep(1.5)
+
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(layer.receive(channel), 0.5)
+
+        await self.finish(self.start(_group_send_many, [("room", {"type": "new"})], results, expiry=1))
+        self.assertEqual(await self.get(results), (1, 0))
+        self.assertEqual(await asyncio.wait_for(layer.receive(channel), TIMEOUT), {"type": "new"})
+
+    async def test_capacity_limits_across_processes(self):
+        layer = self.layer(capacity=3)
+        channel = await layer.new_channel()
+        await layer.group_add("room", channel)
+
+        # group sends skip the full channel
+        results = self.ctx.Queue()
+        await self.finish(self.start(
+            _group_send_many, [("room", {"type": "m", "n": n}) for n in range(5)], results, capacity=3,
+        ))
+        self.assertEqual(await self.get(results), (3, 2))
+
+        # a direct send to the full channel raises ChannelFull
+        await self.finish(self.start(_send, channel, [{"type": "m", "n": 99}], results, capacity=3))
+        self.assertEqual(await self.get(results), "full")
+
+        received = [await asyncio.wait_for(layer.receive(channel), TIMEOUT) for _ in range(3)]
+        self.assertEqual([m["n"] for m in received], [0, 1, 2])
+
+        # drained: the other process can send again
+        await self.finish(self.start(_send, channel, [{"type": "m", "n": 3}], results, capacity=3))
+        self.assertEqual(await self.get(results), "sent")
+        self.assertEqual(await asyncio.wait_for(layer.receive(channel), TIMEOUT), {"type": "m", "n": 3})
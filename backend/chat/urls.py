@@ -1,12 +1,13 @@
 from rest_framework.routers import DefaultRouter
 from django.urls import path, include
-from .views import ChannelViewSet, DirectMessageViewSet, MessageViewSet
+from .views import ChannelViewSet, DirectMessageViewSet, DMConversationViewSet, MessageViewSet
 from django.conf import settings
 from django.conf.urls.static import static
 router = DefaultRouter()
 router.register(r"channels", ChannelViewSet, basename="chat-channels")
 router.register(r"messages", MessageViewSet, basename="chat-messages")
 router.register(r"direct-messages", DirectMessageViewSet, basename="direct-messages")
+router.register(r"conversations", DMConversationViewSet, basename="dm-conversations")
 
 urlpatterns = [
     path("", include(router.urls)),
@@ -2,7 +2,7 @@ import logging
 
 from django.shortcuts import get_object_or_404
 from django.db import transaction
-from django.db.models import Q
+from django.utils import timezone
 
 from rest_framework import viewsets, status
 from rest_framework.response import Response
@@ -10,12 +10,10 @@ from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 
-# Channels
-from asgiref.sync import async_to_sync
-from channels.layers import get_channel_layer
-
-from .models import Channel, Message, DirectMessage
-from .serializers import ChannelSerializer, MessageSerializer, DirectMessageSerializer
+from .broadcast import broadcaster
+from .models import Channel, ChannelReadCursor, DMConversation, Message, DirectMessage
+from .pagination import MessageKeysetPagination
+from .serializers import ChannelSerializer, DMConversationSerializer, MessageSerializer, DirectMessageSerializer
 from projects.models import Member  # adjust import if your app layout differs
 
 logger = logging.getLogger(__name__)
@@ -28,39 +26,36 @@ class DirectMessageViewSet(viewsets.ModelViewSet):
     """
     API for direct messages (one-to-one between Members).
 
-    - GET ?member=<member_pk>  -> messages between request.user and Member(member_pk)
+    - GET ?member=<member_pk>  -> messages between request.user and Member(member_pk),
+      newest page first; older pages via ?before=<cursor> (see MessageKeysetPagination)
     - POST (multipart/form-data) -> create DM. Required: recipient_id (Member PK)
     """
     serializer_class = DirectMessageSerializer
     queryset = DirectMessage.objects.all().order_by("created_at")
     permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser, JSONParser]
+    pagination_class = MessageKeysetPagination
 
     def get_queryset(self):
         qs = super().get_queryset()
         member_id = self.request.query_params.get("member")
         if not member_id:
             return qs.none()
-
         try:
-            other_member = Member.objects.get(pk=member_id)
-        except Member.DoesNotExist:
+            other_member_id = int(member_id)
+        except (TypeError, ValueError):
             return qs.none()
 
-        user = self.request.user
         # find requester Member record
-        my_member = getattr(user, "member_profile", None) or Member.objects.filter(user=user).first()
+        my_member = getattr(self.request.user, "member_profile", None)
         if not my_member:
             return qs.none()
 
-        other_user = getattr(other_member, "user", None)
-        if other_user is None:
-            return qs.none()
-
+        # both directions live under one conversation row, found by its canonical pair
+        low, high = DMConversation.objects.canonical(my_member.pk, other_member_id)
         return qs.filter(
-            (Q(sender=user) & Q(recipient=other_member)) |
-            (Q(sender=other_user) & Q(recipient=my_member))
-        ).order_by("created_at")
+            conversation__low_member_id=low, conversation__high_member_id=high,
+        ).select_related("sender__member_profile", "recipient__user")
 
     def perform_create(self, serializer):
         """
@@ -110,6 +105,7 @@ class DirectMessageViewSet(viewsets.ModelViewSet):
                 "channel_for_recipient": f"dm-{recipient_pk}",
                 "channel_for_sender": (f"dm-{sender_member_pk}" if sender_member_pk is not None else None),
                 "channel": f"dm-{recipient_pk}",  # canonical channel key
+                "conversation_id": serializer.data.get("conversation"),
                 "sender_id": serializer.data.get("sender_id"),
                 "sender_username": serializer.data.get("sender_username"),
                 "sender_member_id": sender_member_pk,
@@ -120,19 +116,12 @@ class DirectMessageViewSet(viewsets.ModelViewSet):
                 "created_at": serializer.data.get("created_at"),
             }
 
-            channel_layer = get_channel_layer()
-            if channel_layer is not None:
-                recipient_group = f"dm_{recipient_pk}"
-                async_to_sync(channel_layer.group_send)(
-                    recipient_group,
-                    {"type": "chat.message", "message": payload},
-                )
-                if sender_member_pk:
-                    sender_group = f"dm_{sender_member_pk}"
-                    async_to_sync(channel_layer.group_send)(
-                        sender_group,
-                        {"type": "chat.message", "message": payload},
-                    )
+            # queued for the broadcast thread after commit; the response does not wait on the channel layer
+            event = {"type": "chat.message", "message": payload}
+            sends = [(f"dm_{recipient_pk}", event)]
+            if sender_member_pk:
+                sends.append((f"dm_{sender_member_pk}", event))
+            broadcaster.publish(sends)
         except Exception:
             # broadcasting must not break API response
             logger.exception("Failed to broadcast DM (non-fatal)")
@@ -153,6 +142,34 @@ class DirectMessageViewSet(viewsets.ModelViewSet):
         return Response({"marked": True})
 
 
+class DMConversationViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Direct message inbox: the requester's conversations, newest first, each
+    with its last message and unread count (one query for the whole list).
+    """
+    serializer_class = DMConversationSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        member = getattr(self.request.user, "member_profile", None)
+        if not member:
+            return DMConversation.objects.none()
+        return (
+            DMConversation.objects.for_member(member)
+            .with_unread_count(member)
+            .select_related("low_member__user", "high_member__user", "last_message")
+            .order_by("-last_message_at", "-created_at")
+        )
+
+    @action(detail=True, methods=["post"], permission_classes=[IsAuthenticated])
+    def mark_read(self, request, pk=None):
+        conversation = get_object_or_404(self.get_queryset(), pk=pk)
+        marked = conversation.messages.filter(recipient=request.user.member_profile, read=False).update(
+            read=True, read_at=timezone.now(),
+        )
+        return Response({"marked": marked})
+
+
 class ChannelViewSet(viewsets.ModelViewSet):
     """
     Group/channel endpoints for multi-participant channels.
@@ -166,9 +183,16 @@ class ChannelViewSet(viewsets.ModelViewSet):
         user = self.request.user
         try:
             member = user.member_profile
-            return Channel.objects.filter(participants=member).distinct()
         except Exception:
             return Channel.objects.none()
+        # participants=member matches one row per channel, so no distinct() is needed
+        return (
+            Channel.objects.filter(participants=member)
+            .with_unread_count(member)
+            .prefetch_related("participants__user")
+            # Meta.ordering is not applied to GROUP BY queries
+            .order_by("-last_message_at", "-created_at")
+        )
 
     def perform_create(self, serializer):
         """
@@ -189,13 +213,12 @@ class ChannelViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=["get"], permission_classes=[IsAuthenticated])
     def messages(self, request, pk=None):
         channel = get_object_or_404(self.get_queryset(), pk=pk)
-        qs = channel.messages.select_related("sender").all().order_by("created_at")
-        page = self.paginate_queryset(qs)
-        if page is not None:
-            ser = MessageSerializer(page, many=True, context={"request": request})
-            return self.get_paginated_response(ser.data)
-        ser = MessageSerializer(qs, many=True, context={"request": request})
-        return Response(ser.data)
+        qs = channel.messages.select_related("sender")
+        # keyset pages (?before= / ?after=) regardless of the viewset's own pagination
+        paginator = MessageKeysetPagination()
+        page = paginator.paginate_queryset(qs, request, view=self)
+        ser = MessageSerializer(page, many=True, context={"request": request})
+        return paginator.get_paginated_response(ser.data)
 
     @action(detail=True, methods=["post"], permission_classes=[IsAuthenticated])
     def mark_read(self, request, pk=None):
@@ -204,10 +227,9 @@ class ChannelViewSet(viewsets.ModelViewSet):
             member = request.user.member_profile
         except Exception:
             return Response({"detail": "Member profile not found"}, status=status.HTTP_400_BAD_REQUEST)
-        unread = channel.messages.exclude(read_by=member)
-        for m in unread:
-            m.read_by.add(member)
-        return Response({"marked": unread.count()})
+        # get_queryset already annotated unread_count: that is what this marks read
+        last_id = ChannelReadCursor.advance(channel, member)
+        return Response({"marked": channel.unread_count, "last_read_message_id": last_id})
 
 
 class MessageViewSet(viewsets.ModelViewSet):
@@ -254,22 +276,17 @@ class MessageViewSet(viewsets.ModelViewSet):
 
         # Broadcast to channel participants group (non-fatal)
         try:
-            channel_layer = get_channel_layer()
-            if channel_layer is not None:
-                payload = {
-                    "id": serializer.data.get("id"),
-                    "channel": f"channel-{channel.pk}",
-                    "sender_id": serializer.data.get("sender_id"),
-                    "sender_username": serializer.data.get("sender_username"),
-                    "content": serializer.data.get("content"),
-                    "message_type": serializer.data.get("message_type"),
-                    "file_url": serializer.data.get("file_url") or FALLBACK_TEST_FILE_URL,
-                    "created_at": serializer.data.get("created_at"),
-                }
-                async_to_sync(channel_layer.group_send)(
-                    f"channel_{channel.pk}",
-                    {"type": "chat.message", "message": payload},
-                )
+            payload = {
+                "id": serializer.data.get("id"),
+                "channel": f"channel-{channel.pk}",
+                "sender_id": serializer.data.get("sender_id"),
+                "sender_username": serializer.data.get("sender_username"),
+                "content": serializer.data.get("content"),
+                "message_type": serializer.data.get("message_type"),
+                "file_url": serializer.data.get("file_url") or FALLBACK_TEST_FILE_URL,
+                "created_at": serializer.data.get("created_at"),
+            }
+            broadcaster.publish([(f"channel_{channel.pk}", {"type": "chat.message", "message": payload})])
         except Exception:
             logger.exception("Failed to broadcast channel message (non-fatal)")
 
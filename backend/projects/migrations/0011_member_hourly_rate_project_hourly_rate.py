@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-18 00:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0010_invitation_accepted_by'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='member',
+            name='hourly_rate',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Default billing rate per tracked hour (used when the project has no rate).', max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='hourly_rate',
+            field=models.DecimalField(decimal_places=2, default=0, help_text="Billing rate per tracked hour; overrides the member's rate when set.", max_digits=10),
+        ),
+    ]
@@ -1,3 +1,5 @@
+from decimal import Decimal
+
 from django.db import models
 from django.core.exceptions import ValidationError
 from django.conf import settings
@@ -50,6 +52,13 @@ class Member(models.Model):
         help_text="Type of developer: web, mobile, or UI/UX designer."
     )
 
+    hourly_rate = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        default=0,
+        help_text="Default billing rate per tracked hour (used when the project has no rate)."
+    )
+
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
@@ -70,6 +79,12 @@ class Project(models.Model):
 
     time_estimate = models.IntegerField(blank=True, null=True)
     budget_estimate = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
+    hourly_rate = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        default=0,
+        help_text="Billing rate per tracked hour; overrides the member's rate when set."
+    )
     notes = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     created_by = models.ForeignKey(
@@ -79,6 +94,12 @@ class Project(models.Model):
     )
     members = models.ManyToManyField(Member, related_name="projects", blank=True)
 
+    def billing_rate_for(self, member):
+        """Hourly rate billed for `member`'s time on this project (0 if not billable)."""
+        if not self.billable:
+            return Decimal("0")
+        return self.hourly_rate or member.hourly_rate or Decimal("0")
+
     def clean(self):
         # if both dates exist, validate order; otherwise skip
         if self.start_date and self.end_date and self.end_date < self.start_date:
@@ -54,7 +54,7 @@ class MemberSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Member
-        fields = ("id", "user", "role", "username", "experience", "skills", "developer_type", "updated_at")
+        fields = ("id", "user", "role", "username", "experience", "skills", "developer_type", "hourly_rate", "updated_at")
         read_only_fields = ("id", "username", "updated_at")
 
 
@@ -111,6 +111,7 @@ class ProjectSerializer(serializers.ModelSerializer):
             "end_date",
             "time_estimate",
             "budget_estimate",
+            "hourly_rate",
             "notes",
             "created_at",
             "created_by",
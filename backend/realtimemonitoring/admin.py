@@ -4,7 +4,7 @@ from django.contrib import admin
 from django.utils import timezone
 import datetime
 
-from .models import WorkSession
+from .models import ActivitySample, DailyTrackedRollup, ReapedSession, TimeSegment, WorkSession
 
 @admin.register(WorkSession)
 class WorkSessionAdmin(admin.ModelAdmin):
@@ -28,3 +28,51 @@ class WorkSessionAdmin(admin.ModelAdmin):
         # live total including running time
         return str(datetime.timedelta(seconds=obj.total_seconds))
     total_display.short_description = "Total"
+
+
+@admin.register(TimeSegment)
+class TimeSegmentAdmin(admin.ModelAdmin):
+    list_display = ("member", "project", "kind", "started_at", "ended_at", "duration_display")
+    list_filter = ("kind", "project")
+    search_fields = ("member__user__username",)
+    ordering = ("-started_at",)
+    date_hierarchy = "started_at"
+
+    def duration_display(self, obj):
+        return str(datetime.timedelta(seconds=obj.seconds))
+    duration_display.short_description = "Duration"
+
+
+@admin.register(DailyTrackedRollup)
+class DailyTrackedRollupAdmin(admin.ModelAdmin):
+    list_display = ("member", "project", "date", "tracked_display", "break_display")
+    list_filter = ("project",)
+    search_fields = ("member__user__username",)
+    ordering = ("-date",)
+    date_hierarchy = "date"
+
+    def tracked_display(self, obj):
+        return str(datetime.timedelta(seconds=obj.seconds))
+    tracked_display.short_description = "Tracked"
+
+    def break_display(self, obj):
+        return str(datetime.timedelta(seconds=obj.break_seconds))
+    break_display.short_description = "Breaks"
+
+
+@admin.register(ActivitySample)
+class ActivitySampleAdmin(admin.ModelAdmin):
+    list_display = ("member", "project", "recorded_at", "keyboard", "mouse", "idle")
+    list_filter = ("idle", "project")
+    search_fields = ("member__user__username",)
+    ordering = ("-recorded_at",)
+    date_hierarchy = "recorded_at"
+
+
+@admin.register(ReapedSession)
+class ReapedSessionAdmin(admin.ModelAdmin):
+    list_display = ("member", "project", "reason", "started_at", "ended_at", "reaped_at")
+    list_filter = ("reason", "project")
+    search_fields = ("member__user__username",)
+    ordering = ("-reaped_at",)
+    date_hierarchy = "reaped_at"
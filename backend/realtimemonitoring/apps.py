@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class RealtimemonitoringConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'realtimemonitoring'
+
+    def ready(self):
+        # import signals so they register on app startup
+        import realtimemonitoring.signals  # noqa: F401
@@ -0,0 +1,154 @@
+# realtimemonitoring/breaks.py
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .live import LiveState
+from .models import BreakPolicy, BreakSession, WorkSession
+from .presence import STATUS_BREAK, publish_presence
+
+
+class TransitionError(Exception):
+    """A break transition that cannot happen; carries the HTTP status the views answer with."""
+
+    def __init__(self, detail, status_code=400):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+
+
+class PolicyMembershipCache:
+    """
+    Process-local TTL cache of policy id -> (name, apply_to_new, member ids),
+    so checking who may take a break costs no query. Policy saves, deletes and
+    member changes invalidate it (realtimemonitoring.signals); other workers
+    catch up within MONITOR_BREAK_POLICY_TTL seconds.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._policies = {}
+
+    @property
+    def ttl(self):
+        return getattr(settings, "MONITOR_BREAK_POLICY_TTL", 300)
+
+    def get(self, policy_id):
+        """(name, apply_to_new, frozenset of member ids), or None when the policy does not exist."""
+        entry = self._policies.get(policy_id)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        row = BreakPolicy.objects.filter(pk=policy_id).values_list("name", "apply_to_new").first()
+        if row is None:
+            return None
+        policy = (row[0], row[1], frozenset(
+            BreakPolicy.members.through.objects.filter(breakpolicy_id=policy_id).values_list("member_id", flat=True)
+        ))
+        with self._lock:
+            self._policies[policy_id] = (time.monotonic() + self.ttl, policy)
+        return policy
+
+    def check(self, policy_id, member_id):
+        """The policy's name when `member_id` may take it; TransitionError otherwise."""
+        try:
+            policy = self.get(int(policy_id))
+        except (TypeError, ValueError):
+            policy = None
+        if policy is None:
+            raise TransitionError("No BreakPolicy matches the given query.", 404)
+        name, apply_to_new, members = policy
+        if member_id not in members and not apply_to_new:
+            raise TransitionError("You are not allowed to take this break (policy mismatch).", 403)
+        return name
+
+    def invalidate(self, policy_id=None):
+        with self._lock:
+            if policy_id is None:
+                self._policies.clear()
+            else:
+                self._policies.pop(policy_id, None)
+
+
+policy_members = PolicyMembershipCache()
+
+
+def break_status(session, user_id, policy_name):
+    """Same keys as BreakSessionStatusSerializer, without loading member or policy."""
+    return {
+        "member": user_id,
+        "policy_name": policy_name or "",
+        "status": "active" if session.is_running else "paused",
+        "total_seconds": session.total_seconds,
+    }
+
+
+def _locked_break(member_id, create=True):
+    """The member's BreakSession row, locked for this transaction (created paused if missing)."""
+    session = BreakSession.objects.select_for_update().filter(member_id=member_id).first()
+    if session is None and create:
+        BreakSession.objects.get_or_create(member_id=member_id, defaults={"is_running": False, "accumulated": 0})
+        session = BreakSession.objects.select_for_update().get(member_id=member_id)
+    return session
+
+
+def take_break(user, member_id, project_id, policy_id):
+    """
+    Stop the member's work on `project_id` and start (or switch) their break,
+    as one transaction. The BreakSession row is locked first, so concurrent
+    transitions for the same member run one after the other and never leave
+    both timers running.
+
+    Returns (work status, break status); work status is None when the member
+    has no session on the project.
+    """
+    policy_name = policy_members.check(policy_id, member_id)
+    policy_id = int(policy_id)
+    with transaction.atomic():
+        brk = _locked_break(member_id)
+        work = WorkSession.objects.select_for_update().filter(member_id=member_id, project_id=project_id).first()
+        now = timezone.now()
+        changed = False
+        if work is not None and work.is_running:
+            work.stop(at=now)
+            changed = True
+        if not brk.is_running or brk.policy_id != policy_id:
+            brk.policy_id = policy_id
+            if not brk.is_running:
+                brk.start = now
+                brk.is_running = True
+            brk.save(update_fields=["policy", "start", "is_running"])
+            changed = True
+        if changed:
+            publish_presence("break", work, user, status=STATUS_BREAK)
+
+    work_status = LiveState.of(work).as_status() if work is not None else None
+    return work_status, break_status(brk, user.pk, policy_name)
+
+
+def resume_work(user, member_id, project_id):
+    """
+    Stop the member's break and start (or keep) their work on `project_id`,
+    as one transaction, with the same locking as take_break().
+    Returns (work status, break status).
+    """
+    with transaction.atomic():
+        brk = _locked_break(member_id, create=False)
+        if brk is None:
+            raise TransitionError("No active BreakSession found.", 404)
+        work = WorkSession.objects.select_for_update().filter(member_id=member_id, project_id=project_id).first()
+        if brk.is_running:
+            brk.stop()
+        if work is None:
+            work = WorkSession.objects.create(member_id=member_id, project_id=project_id)
+            started = True
+        else:
+            started = not work.is_running
+            work.restart()
+        if started:
+            publish_presence("start", work, user)
+
+    policy = policy_members.get(brk.policy_id) if brk.policy_id else None
+    return LiveState.of(work).as_status(), break_status(brk, user.pk, policy[0] if policy else "")
@@ -1,15 +1,53 @@
+# realtimemonitoring/consumers.py
+from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from django.utils import timezone
+
+from chat.middleware import resolve_token, token_from_scope
+
+from .presence import can_view_project, project_group, snapshot
+
 
 class MemberStatusConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Live presence for one project: ws://.../ws/monitor/projects/<project_id>/?token=<token>.
+
+    On connect: {"type": "snapshot", "project_id", "members": [...]} with the
+    same rows as GET /api/monitor/members-status/?project=<id> (plus "member_id",
+    "accumulated", "started_at" and status "break"). After that only deltas:
+    {"type": "presence", "event": "start" | "stop" | "break", ...row}, sent by
+    the start/stop and break start/stop views.
+    """
+
     async def connect(self):
-        self.member_id = self.scope["url_route"]["kwargs"]["member_id"]
-        self.group_name = f"member_{self.member_id}"
+        self.project_id = int(self.scope["url_route"]["kwargs"]["project_id"])
+        if "member_id" in self.scope:
+            user_id, member_id = self.scope["user_id"], self.scope["member_id"]
+        else:
+            user_id, member_id, _ = await resolve_token(token_from_scope(self.scope)) or (None, None, None)
+        if user_id is None:
+            await self.close(code=4001)
+            return
+        if not await database_sync_to_async(can_view_project)(user_id, member_id, self.project_id):
+            await self.close(code=4003)
+            return
+
+        # join before reading the snapshot so no delta falls between the two
+        self.group_name = project_group(self.project_id)
         await self.channel_layer.group_add(self.group_name, self.channel_name)
         await self.accept()
+        members = await database_sync_to_async(snapshot)(self.project_id)
+        await self.send_json({
+            "type": "snapshot",
+            "project_id": self.project_id,
+            "at": timezone.now().isoformat(),
+            "members": members,
+        })
 
     async def disconnect(self, code):
-        await self.channel_layer.group_discard(self.group_name, self.channel_name)
+        if getattr(self, "group_name", None):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
 
-    async def status_update(self, event):
-        # event: { type: "status.update", status: "online"/"offline", ... }
-        await self.send_json(event)
+    async def presence_update(self, event):
+        # event: {"type": "presence.update", "payload": {"type": "presence", "event": ..., ...}}
+        await self.send_json(event["payload"])
@@ -0,0 +1,180 @@
+# realtimemonitoring/heartbeat.py
+import atexit
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Case, DateTimeField, F, Q, Value, When
+from django.utils import timezone
+
+from .models import ActivitySample, WorkSession
+from .reaper import reaper
+
+logger = logging.getLogger(__name__)
+
+
+class HeartbeatBuffer:
+    """
+    Holds heartbeat samples in memory and writes them from a background thread:
+    one bulk_create of ActivitySample rows plus one UPDATE of
+    WorkSession.last_heartbeat_at per flush (every MONITOR_HEARTBEAT_FLUSH_INTERVAL
+    seconds, or sooner once MONITOR_HEARTBEAT_FLUSH_SIZE samples are waiting).
+    Requests only append to a list.
+
+    Beyond MONITOR_HEARTBEAT_BUFFER_SIZE pending samples, new ones are dropped
+    and counted. Samples still buffered when the process dies are lost; the
+    next heartbeats cover for them.
+
+    The same thread runs stop_silent_sessions() every
+    MONITOR_HEARTBEAT_SWEEP_INTERVAL seconds.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pending = []
+        self._thread = None
+        self.received = 0
+        self.written = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.failed = 0
+        self.stopped = 0
+
+    def add(self, samples):
+        """Queue unsaved ActivitySample objects; returns how many were accepted."""
+        limit = getattr(settings, "MONITOR_HEARTBEAT_BUFFER_SIZE", 50000)
+        with self._lock:
+            room = max(0, limit - len(self._pending))
+            accepted = samples[:room]
+            self._pending.extend(accepted)
+            self.received += len(accepted)
+            self.dropped += len(samples) - len(accepted)
+            waiting = len(self._pending)
+        if len(accepted) < len(samples):
+            logger.warning("Heartbeat buffer full; dropped %d sample(s)", len(samples) - len(accepted))
+        self._ensure_worker()
+        if waiting >= getattr(settings, "MONITOR_HEARTBEAT_FLUSH_SIZE", 1000):
+            self._wake.set()
+        return len(accepted)
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="monitor-heartbeat", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        last_sweep = time.monotonic()
+        while True:
+            self._wake.wait(getattr(settings, "MONITOR_HEARTBEAT_FLUSH_INTERVAL", 2))
+            self._wake.clear()
+            close_old_connections()
+            try:
+                self.flush()
+                if time.monotonic() - last_sweep >= getattr(settings, "MONITOR_HEARTBEAT_SWEEP_INTERVAL", 60):
+                    last_sweep = time.monotonic()
+                    self._count("stopped", stop_silent_sessions())
+            except Exception:
+                logger.exception("Heartbeat flush failed (non-fatal)")
+            finally:
+                close_old_connections()
+
+    def flush(self):
+        """Write everything buffered so far; returns the number of samples written."""
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return 0
+
+        latest = {}
+        for sample in batch:
+            key = (sample.member_id, sample.project_id)
+            if sample.project_id is not None and (key not in latest or latest[key] < sample.recorded_at):
+                latest[key] = sample.recorded_at
+
+        try:
+            with transaction.atomic():
+                ActivitySample.objects.bulk_create(batch, batch_size=500)
+                touch_sessions(latest)
+        except Exception:
+            self._count("failed", len(batch))
+            raise
+        self._count("written", len(batch))
+        self._count("flushes")
+        return len(batch)
+
+    def _count(self, name, n=1):
+        if n:
+            with self._lock:
+                setattr(self, name, getattr(self, name) + n)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "received": self.received, "written": self.written, "dropped": self.dropped,
+                "flushes": self.flushes, "failed": self.failed, "stopped": self.stopped,
+                "pending": len(self._pending),
+            }
+
+
+def touch_sessions(latest):
+    """
+    Move last_heartbeat_at forward for {(member_id, project_id): recorded_at}:
+    one query to find the sessions, one UPDATE per 500 of them.
+    """
+    if not latest:
+        return 0
+    members = {m for m, _ in latest}
+    projects = {p for _, p in latest}
+    heartbeats = {
+        pk: latest[(member_id, project_id)]
+        for pk, member_id, project_id in WorkSession.objects.filter(
+            member_id__in=members, project_id__in=projects,
+        ).values_list("pk", "member_id", "project_id")
+        if (member_id, project_id) in latest
+    }
+    items = list(heartbeats.items())
+    updated = 0
+    for i in range(0, len(items), 500):
+        chunk = items[i:i + 500]
+        updated += WorkSession.objects.filter(pk__in=[pk for pk, _ in chunk]).update(last_heartbeat_at=Case(
+            *[
+                # never move it backwards when batches arrive out of order, nor
+                # before the run's start (a sample buffered from the previous run)
+                When(
+                    Q(pk=pk, start__lte=at) & (Q(last_heartbeat_at__isnull=True) | Q(last_heartbeat_at__lt=at)),
+                    then=Value(at),
+                )
+                for pk, at in chunk
+            ],
+            default=F("last_heartbeat_at"),
+            output_field=DateTimeField(),
+        ))
+    return updated
+
+
+def stop_silent_sessions(now=None):
+    """
+    Stop running sessions whose client sent heartbeats but has been silent for
+    MONITOR_HEARTBEAT_TIMEOUT_MINUTES, ending the run at its last heartbeat
+    (a crashed client stops accruing time). Sessions that never sent a
+    heartbeat are left to the reaper's longer limit. Returns how many were stopped.
+    """
+    now = now or timezone.now()
+    cutoff = now - timedelta(minutes=getattr(settings, "MONITOR_HEARTBEAT_TIMEOUT_MINUTES", 5))
+    return len(reaper.reap(cutoff, heartbeat_only=True))
+
+
+heartbeats = HeartbeatBuffer()
+
+
+@atexit.register
+def _flush_on_exit():
+    try:
+        heartbeats.flush()
+    except Exception:
+        logger.exception("Heartbeat flush at exit failed")
@@ -0,0 +1,214 @@
+# realtimemonitoring/live.py
+import threading
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import Http404
+from django.utils import timezone
+
+from projects.models import Member, Project
+
+from .models import WorkSession
+
+
+class LiveState(namedtuple("LiveState", "session_id member_id project_id running start accumulated")):
+    """What the tracker endpoints need to know about one WorkSession."""
+
+    @classmethod
+    def of(cls, session):
+        return cls(session.pk, session.member_id, session.project_id, session.is_running, session.start, session.accumulated)
+
+    @property
+    def total_seconds(self):
+        if self.running:
+            return self.accumulated + int((timezone.now() - self.start).total_seconds())
+        return self.accumulated
+
+    @property
+    def status(self):
+        return "active" if self.running else "paused"
+
+    def as_status(self):
+        """Same keys as WorkSessionStatusSerializer."""
+        return {"member": self.member_id, "status": self.status, "total_seconds": self.total_seconds}
+
+
+class LiveSessionStore:
+    """
+    (member, project) -> LiveState for the desktop tracker's status calls, so
+    a steady-state status read needs no query. Start and stop never trust the
+    cached entry: each one re-reads the row under lock, decides from it and
+    books the ledger from the stored start, then refreshes the entry.
+
+    Entries live in a process-local dict, or in the Django cache named by
+    MONITOR_LIVE_CACHE so every worker sees one copy. WorkSession saves and
+    deletes write through (realtimemonitoring.signals), whatever code path
+    made them; code that changes sessions with queryset.update() must call
+    discard(). Entries expire after MONITOR_LIVE_TTL seconds, which bounds how
+    stale a process-local copy can get when another worker made the change.
+
+    The user -> member id and known project ids used by the same views are
+    cached alongside.
+    """
+
+    KEY = "monitor:live:{member_id}:{project_id}"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._states = {}
+        self._members = {}
+        self._projects = set()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def ttl(self):
+        return getattr(settings, "MONITOR_LIVE_TTL", 300)
+
+    def _shared_cache(self):
+        alias = getattr(settings, "MONITOR_LIVE_CACHE", None)
+        return caches[alias] if alias else None
+
+    @property
+    def shared(self):
+        """Whether every worker reads one copy; otherwise discard() only reaches this process."""
+        return self._shared_cache() is not None
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    # ---------- lookups the views need ----------
+
+    def member_id_for(self, user):
+        """The Member id of a user; Http404 when the user has none."""
+        member_id = self._members.get(user.pk)
+        if member_id is None:
+            member_id = Member.objects.filter(user_id=user.pk).values_list("pk", flat=True).first()
+            if member_id is None:
+                raise Http404("No Member matches the given query.")
+            with self._lock:
+                self._members[user.pk] = member_id
+        return member_id
+
+    def project_id(self, value):
+        """A validated, existing project id; Http404 otherwise."""
+        try:
+            project_id = int(value)
+        except (TypeError, ValueError):
+            raise Http404("No Project matches the given query.")
+        if project_id not in self._projects:
+            if not Project.objects.filter(pk=project_id).exists():
+                raise Http404("No Project matches the given query.")
+            with self._lock:
+                self._projects.add(project_id)
+        return project_id
+
+    # ---------- session state ----------
+
+    def get(self, member_id, project_id):
+        """The cached LiveState, or None on a miss."""
+        shared = self._shared_cache()
+        if shared is not None:
+            state = shared.get(self.KEY.format(member_id=member_id, project_id=project_id))
+        else:
+            entry = self._states.get((member_id, project_id))
+            state = entry[1] if entry is not None and entry[0] > time.monotonic() else None
+        self._count(state is not None)
+        return state
+
+    def put(self, session):
+        if session.project_id is None or session.pk is None:
+            return
+        state = LiveState.of(session)
+        shared = self._shared_cache()
+        if shared is not None:
+            shared.set(self.KEY.format(member_id=state.member_id, project_id=state.project_id), state, timeout=self.ttl)
+            return
+        with self._lock:
+            self._states[(state.member_id, state.project_id)] = (time.monotonic() + self.ttl, state)
+
+    def discard(self, member_id, project_id):
+        shared = self._shared_cache()
+        if shared is not None:
+            shared.delete(self.KEY.format(member_id=member_id, project_id=project_id))
+        with self._lock:
+            self._states.pop((member_id, project_id), None)
+
+    def forget_member(self, member_id):
+        with self._lock:
+            self._members = {u: m for u, m in self._members.items() if m != member_id}
+            for key in [k for k in self._states if k[0] == member_id]:
+                del self._states[key]
+
+    def forget_project(self, project_id):
+        with self._lock:
+            self._projects.discard(project_id)
+            for key in [k for k in self._states if k[1] == project_id]:
+                del self._states[key]
+
+    def state(self, member_id, project_id, create=True):
+        """
+        LiveState for the pair, loading (and with `create`, creating a paused
+        session) on a miss. None when there is no session and `create` is False.
+        """
+        state = self.get(member_id, project_id)
+        if state is not None:
+            return state
+        if create:
+            session, _ = WorkSession.objects.get_or_create(
+                member_id=member_id, project_id=project_id, defaults={"is_running": False},
+            )
+        else:
+            session = WorkSession.objects.filter(member_id=member_id, project_id=project_id).first()
+            if session is None:
+                return None
+        self.put(session)
+        return LiveState.of(session)
+
+    def _transition(self, member_id, project_id, running):
+        # decide from the locked row, not the cached entry: another worker may
+        # have changed the session within the TTL
+        with transaction.atomic():
+            session = WorkSession.objects.select_for_update().filter(member_id=member_id, project_id=project_id).first()
+            if session is None:
+                if not running:
+                    self.discard(member_id, project_id)
+                    return None, None
+                WorkSession.objects.get_or_create(member_id=member_id, project_id=project_id, defaults={"is_running": False})
+                session = WorkSession.objects.select_for_update().get(member_id=member_id, project_id=project_id)
+            changed = session.is_running != running
+            if changed:
+                if running:
+                    session.restart()
+                else:
+                    session.stop()
+        self.put(session)
+        return LiveState.of(session), session if changed else None
+
+    def start(self, member_id, project_id):
+        """Start or resume the pair's timer. Returns (LiveState, WorkSession or None when already running)."""
+        return self._transition(member_id, project_id, True)
+
+    def stop(self, member_id, project_id):
+        """
+        Pause the pair's timer. Returns (LiveState, WorkSession or None when
+        already paused), or (None, None) when the pair has no session.
+        """
+        return self._transition(member_id, project_id, False)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits, "misses": self.misses,
+                "states": len(self._states), "members": len(self._members), "projects": len(self._projects),
+            }
+
+
+live_sessions = LiveSessionStore()
@@ -0,0 +1,62 @@
+### File: realtimemonitoring/management/commands/reap_stale_sessions.py
+
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.utils import timezone
+
+from realtimemonitoring.live import live_sessions
+from realtimemonitoring.reaper import reaper
+
+
+class Command(BaseCommand):
+    help = (
+        "Close running work sessions with no activity (no start or heartbeat) for --after minutes, "
+        "at their last known activity time. Runs once, or keeps going with --loop."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--after', type=int, help='Minutes without activity before a session is stale '
+                                                      '(default MONITOR_REAP_AFTER_MINUTES)')
+        parser.add_argument('--batch', type=int, default=500, help='Sessions closed per transaction (default 500)')
+        parser.add_argument('--loop', action='store_true', help='Keep reaping until stopped')
+        parser.add_argument('--sleep', type=float, default=60.0, help='Seconds between passes with --loop (default 60)')
+        parser.add_argument('--dry-run', action='store_true', help='List what would be reaped without changing anything')
+
+    def handle(self, *args, **options):
+        after = options['after'] or getattr(settings, 'MONITOR_REAP_AFTER_MINUTES', 720)
+        if after <= 0 or options['batch'] <= 0:
+            raise CommandError('--after and --batch must be positive')
+        if not live_sessions.shared and not options['dry_run']:
+            self.stderr.write(self.style.WARNING(
+                f"MONITOR_LIVE_CACHE is not set: web workers keep reporting reaped sessions as active "
+                f"for up to MONITOR_LIVE_TTL ({live_sessions.ttl}s)."
+            ))
+
+        try:
+            while True:
+                close_old_connections()
+                cutoff = timezone.now() - timedelta(minutes=after)
+                rows = reaper.reap(cutoff, batch_size=options['batch'], dry_run=options['dry_run'])
+                for row in rows:
+                    self.stdout.write(
+                        f"{'would reap' if options['dry_run'] else 'reaped'} session {row.session_id} "
+                        f"(member {row.member_id}, project {row.project_id}, {row.reason}): "
+                        f"closed at {row.ended_at.isoformat()}, +{row.seconds}s"
+                    )
+                if options['dry_run']:
+                    self.stdout.write(self.style.SUCCESS(f"Would reap {len(rows)} session(s)"))
+                    return
+                if not options['loop']:
+                    break
+                time.sleep(options['sleep'])
+        except KeyboardInterrupt:
+            pass
+        stats = reaper.stats()
+        self.stdout.write(self.style.SUCCESS(
+            f"Reaped {stats['reaped']} session(s) in {stats['runs']} pass(es) "
+            f"({stats['silent']} silent, {stats['stale']} stale), {stats['seconds_credited']}s credited"
+        ))
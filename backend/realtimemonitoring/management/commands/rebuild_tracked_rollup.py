@@ -0,0 +1,46 @@
+### File: realtimemonitoring/management/commands/rebuild_tracked_rollup.py
+
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from realtimemonitoring.models import DailyTrackedRollup
+
+
+class Command(BaseCommand):
+    help = (
+        "Backfill or repair DailyTrackedRollup rows from the TimeSegment ledger for a date range "
+        "(YYYY-MM-DD, inclusive). Defaults to the last 30 days in server timezone."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='date_from', type=str, help='First date to rebuild (YYYY-MM-DD)')
+        parser.add_argument('--to', dest='date_to', type=str, help='Last date to rebuild (YYYY-MM-DD)')
+        parser.add_argument('--member', type=int, action='append', help='Only rebuild this Member id (repeatable)')
+        parser.add_argument('--project', type=int, action='append', help='Only rebuild this Project id (repeatable)')
+
+    def _parse(self, value, default):
+        if not value:
+            return default
+        try:
+            return datetime.fromisoformat(value).date()
+        except Exception:
+            raise CommandError('Invalid date format. Use YYYY-MM-DD')
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        date_to = self._parse(options.get('date_to'), today)
+        date_from = self._parse(options.get('date_from'), date_to - timezone.timedelta(days=29))
+        if date_from > date_to:
+            raise CommandError('--from must not be after --to')
+
+        written = DailyTrackedRollup.objects.rebuild(
+            date_from,
+            date_to,
+            member_ids=options.get('member'),
+            project_ids=options.get('project'),
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {written} rollup rows for {date_from} → {date_to}"
+        ))
@@ -0,0 +1,106 @@
+### File: realtimemonitoring/management/commands/stress_break_transitions.py
+
+import random
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection
+
+from projects.models import Member
+from realtimemonitoring.breaks import TransitionError, resume_work, take_break
+from realtimemonitoring.models import BreakSession, TimeSegment, WorkSession
+
+
+class Command(BaseCommand):
+    help = (
+        "Concurrency harness for take-break / resume: threads toggle the given members between work "
+        "and break as fast as they can, then the command checks that no member ever had work and a "
+        "break running at once and reports latency. It changes real sessions; use a copy of the data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--member', type=int, action='append', required=True, help='Member id to toggle (repeatable)')
+        parser.add_argument('--project', type=int, required=True, help='Project the members work on')
+        parser.add_argument('--policy', type=int, required=True, help='Break policy the members may take')
+        parser.add_argument('--threads', type=int, default=8, help='Concurrent clients (default 8)')
+        parser.add_argument('--iterations', type=int, default=50, help='Transitions per thread (default 50)')
+
+    def handle(self, *args, **options):
+        members = list(Member.objects.select_related('user').filter(pk__in=options['member']))
+        if len(members) != len(set(options['member'])):
+            raise CommandError('Unknown member id')
+        project_id, policy_id = options['project'], options['policy']
+        started_at = TimeSegment.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+
+        latencies = []
+        errors = []
+        lock = threading.Lock()
+
+        def client(seed):
+            rng = random.Random(seed)
+            try:
+                for _ in range(options['iterations']):
+                    member = rng.choice(members)
+                    t0 = time.perf_counter()
+                    try:
+                        if rng.random() < 0.5:
+                            take_break(member.user, member.pk, project_id, policy_id)
+                        else:
+                            resume_work(member.user, member.pk, project_id)
+                    except TransitionError:
+                        pass
+                    except Exception as exc:
+                        with lock:
+                            errors.append(repr(exc))
+                        continue
+                    with lock:
+                        latencies.append(time.perf_counter() - t0)
+            finally:
+                connection.close()
+
+        close_old_connections()
+        threads = [threading.Thread(target=client, args=(i,)) for i in range(options['threads'])]
+        wall = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        wall = time.perf_counter() - wall
+
+        problems = []
+        member_ids = [m.pk for m in members]
+        for member_id in member_ids:
+            working = WorkSession.objects.filter(member_id=member_id, project_id=project_id, is_running=True).exists()
+            on_break = BreakSession.objects.filter(member_id=member_id, is_running=True).exists()
+            if working and on_break:
+                problems.append(f"member {member_id}: work and break both running now")
+
+        # a work run overlapping a break run means both timers ran at once at some point
+        segments = TimeSegment.objects.filter(pk__gt=started_at, member_id__in=member_ids).order_by('started_at')
+        by_member = {}
+        for seg in segments:
+            by_member.setdefault(seg.member_id, []).append(seg)
+        for member_id, segs in by_member.items():
+            work = [s for s in segs if s.kind == TimeSegment.KIND_WORK and s.project_id == project_id]
+            breaks = [s for s in segs if s.kind == TimeSegment.KIND_BREAK]
+            for w in work:
+                for b in breaks:
+                    if w.started_at < b.ended_at and b.started_at < w.ended_at:
+                        problems.append(f"member {member_id}: work {w.started_at}–{w.ended_at} overlaps break {b.started_at}–{b.ended_at}")
+
+        latencies.sort()
+        if latencies:
+            p50 = latencies[len(latencies) // 2] * 1000
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000
+            self.stdout.write(
+                f"{len(latencies)} transition(s) in {wall:.2f}s with {options['threads']} thread(s): "
+                f"p50 {p50:.1f} ms, p95 {p95:.1f} ms"
+            )
+        for error in errors[:10]:
+            self.stdout.write(self.style.WARNING(f"error: {error}"))
+        for problem in problems[:20]:
+            self.stdout.write(self.style.ERROR(problem))
+        if problems or errors:
+            raise CommandError(f"{len(problems)} invariant violation(s), {len(errors)} error(s)")
+        self.stdout.write(self.style.SUCCESS("No double-running states"))
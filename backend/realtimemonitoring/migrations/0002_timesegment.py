@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-18 00:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0010_invitation_accepted_by'),
+        ('realtimemonitoring', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimeSegment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField()),
+                ('ended_at', models.DateTimeField()),
+                ('member', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='time_segments', to='projects.member')),
+                ('project', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='time_segments', to='projects.project')),
+            ],
+            options={
+                'ordering': ['started_at'],
+                'indexes': [models.Index(fields=['member', 'started_at'], name='timeseg_member_started_idx'), models.Index(fields=['project', 'started_at'], name='timeseg_project_started_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-18 00:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0010_invitation_accepted_by'),
+        ('realtimemonitoring', '0002_timesegment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='timesegment',
+            name='kind',
+            field=models.CharField(choices=[('work', 'Work'), ('break', 'Break')], default='work', max_length=10),
+        ),
+        migrations.CreateModel(
+            name='DailyTrackedRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('seconds', models.BigIntegerField(default=0)),
+                ('break_seconds', models.BigIntegerField(default=0)),
+                ('member', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='projects.member')),
+                ('project', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='projects.project')),
+            ],
+            options={
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['project', 'date'], name='rollup_project_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('member', 'project', 'date'), name='unique_member_project_date_rollup')],
+            },
+        ),
+    ]
@@ -0,0 +1,67 @@
+from datetime import datetime, time, timedelta
+
+from django.db import migrations
+from django.utils import timezone
+
+
+def _pieces(started_at, ended_at):
+    cursor = started_at
+    while cursor < ended_at:
+        next_day = timezone.localtime(cursor).date() + timedelta(days=1)
+        piece_end = min(timezone.make_aware(datetime.combine(next_day, time.min)), ended_at)
+        yield cursor, piece_end
+        cursor = piece_end
+
+
+def seed_ledger(apps, schema_editor):
+    """
+    Sessions only remember `accumulated`, not when that time was worked.
+    Book it as one run ending at the session's last `start` so that ledger
+    and rollup totals match what the sessions already report.
+    """
+    WorkSession = apps.get_model("realtimemonitoring", "WorkSession")
+    BreakSession = apps.get_model("realtimemonitoring", "BreakSession")
+    TimeSegment = apps.get_model("realtimemonitoring", "TimeSegment")
+    DailyTrackedRollup = apps.get_model("realtimemonitoring", "DailyTrackedRollup")
+
+    segments = []
+    rollups = {}
+
+    def book(member_id, project_id, kind, started_at, ended_at):
+        for start, end in _pieces(started_at, ended_at):
+            segments.append(TimeSegment(
+                member_id=member_id, project_id=project_id, kind=kind, started_at=start, ended_at=end,
+            ))
+            key = (member_id, project_id, timezone.localtime(start).date())
+            row = rollups.setdefault(key, DailyTrackedRollup(
+                member_id=member_id, project_id=project_id, date=key[2], seconds=0, break_seconds=0,
+            ))
+            secs = int((end - start).total_seconds())
+            if kind == "break":
+                row.break_seconds += secs
+            else:
+                row.seconds += secs
+
+    for sess in WorkSession.objects.filter(accumulated__gt=0).iterator():
+        book(sess.member_id, sess.project_id, "work", sess.start - timedelta(seconds=sess.accumulated), sess.start)
+    for sess in BreakSession.objects.filter(accumulated__gt=0, member__isnull=False).iterator():
+        book(sess.member_id, None, "break", sess.start - timedelta(seconds=sess.accumulated), sess.start)
+
+    TimeSegment.objects.bulk_create(segments, batch_size=500)
+    DailyTrackedRollup.objects.bulk_create(rollups.values(), batch_size=500)
+
+
+def unseed_ledger(apps, schema_editor):
+    apps.get_model("realtimemonitoring", "DailyTrackedRollup").objects.all().delete()
+    apps.get_model("realtimemonitoring", "TimeSegment").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('realtimemonitoring', '0003_dailytrackedrollup'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_ledger, unseed_ledger),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-18 01:21
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0011_member_hourly_rate_project_hourly_rate'),
+        ('realtimemonitoring', '0004_seed_ledger_from_sessions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='worksession',
+            name='last_heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='ActivitySample',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recorded_at', models.DateTimeField()),
+                ('received_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('keyboard', models.BooleanField(default=False)),
+                ('mouse', models.BooleanField(default=False)),
+                ('idle', models.BooleanField(default=False)),
+                ('member', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity_samples', to='projects.member')),
+                ('project', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='activity_samples', to='projects.project')),
+            ],
+            options={
+                'ordering': ['recorded_at'],
+                'indexes': [models.Index(fields=['member', 'recorded_at'], name='activity_member_recorded_idx'), models.Index(fields=['project', 'recorded_at'], name='activity_project_recorded_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.7 on 2026-10-18 01:24
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0011_member_hourly_rate_project_hourly_rate'),
+        ('realtimemonitoring', '0005_activitysample'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReapedSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reason', models.CharField(choices=[('silent', 'Client heartbeats stopped'), ('stale', 'No activity')], max_length=10)),
+                ('started_at', models.DateTimeField()),
+                ('ended_at', models.DateTimeField(help_text='Last known activity; the run was closed here.')),
+                ('last_heartbeat_at', models.DateTimeField(blank=True, null=True)),
+                ('reaped_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['-reaped_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='worksession',
+            index=models.Index(fields=['is_running', 'start'], name='worksession_running_start_idx'),
+        ),
+        migrations.AddField(
+            model_name='reapedsession',
+            name='member',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reaped_sessions', to='projects.member'),
+        ),
+        migrations.AddField(
+            model_name='reapedsession',
+            name='project',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='reaped_sessions', to='projects.project'),
+        ),
+        migrations.AddField(
+            model_name='reapedsession',
+            name='session',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reaps', to='realtimemonitoring.worksession'),
+        ),
+    ]
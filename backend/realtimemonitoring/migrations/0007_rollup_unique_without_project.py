@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-18 01:35
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def merge_duplicate_break_rows(apps, schema_editor):
+    """Fold project-less rows that raced into duplicates into one row per (member, date)."""
+    DailyTrackedRollup = apps.get_model("realtimemonitoring", "DailyTrackedRollup")
+    duplicates = (
+        DailyTrackedRollup.objects.filter(project__isnull=True)
+        .values("member_id", "date")
+        .annotate(n=Count("id"), keep=Min("id"))
+        .filter(n__gt=1)
+    )
+    for dup in duplicates:
+        rows = list(DailyTrackedRollup.objects.filter(project__isnull=True, member_id=dup["member_id"], date=dup["date"]))
+        keep = next(r for r in rows if r.pk == dup["keep"])
+        keep.seconds = sum(r.seconds for r in rows)
+        keep.break_seconds = sum(r.break_seconds for r in rows)
+        keep.save(update_fields=["seconds", "break_seconds"])
+        DailyTrackedRollup.objects.filter(pk__in=[r.pk for r in rows if r.pk != keep.pk]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0011_member_hourly_rate_project_hourly_rate'),
+        ('realtimemonitoring', '0006_reapedsession'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_break_rows, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='dailytrackedrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('project__isnull', True)), fields=('member', 'date'), name='unique_member_date_rollup_no_project'),
+        ),
+    ]
@@ -1,6 +1,10 @@
 # realtimemonitoring/models.py
 
-from django.db import models
+from datetime import datetime, time, timedelta
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import DurationField, ExpressionWrapper, F, Q, Sum, Value
+from django.db.models.functions import Greatest, Least, TruncDate, TruncWeek
 from django.utils import timezone
 
 from projects.models import Member, Project
@@ -20,6 +24,8 @@ class WorkSession(models.Model):
     start = models.DateTimeField(default=timezone.now)
     accumulated = models.BigIntegerField(default=0)
     is_running = models.BooleanField(default=True)
+    # newest client heartbeat for this session (realtimemonitoring.heartbeat); None for clients that send none
+    last_heartbeat_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         constraints = [
@@ -28,24 +34,37 @@ class WorkSession(models.Model):
                 name="unique_member_project"
             )
         ]
+        indexes = [
+            # running sessions by start: the stale session reaper's scan
+            models.Index(fields=["is_running", "start"], name="worksession_running_start_idx"),
+        ]
         # Optional: order by most recent start
         ordering = ["-start"]
 
-    def stop(self):
-        """Stop the timer and accumulate seconds since start."""
+    def stop(self, at=None):
+        """
+        Stop the timer, accumulate seconds since start and log the run to the ledger.
+        `at` ends the run earlier than now (e.g. at the last heartbeat), never before start.
+        """
         if self.is_running:
-            now = timezone.now()
+            now = max(at, self.start) if at is not None else timezone.now()
             elapsed = int((now - self.start).total_seconds())
             self.accumulated += elapsed
             self.is_running = False
-            self.save()
+            with transaction.atomic():
+                self.save(update_fields=["accumulated", "is_running"])
+                TimeSegment.objects.record(self.member_id, self.project_id, self.start, now)
 
     def restart(self):
-        """Restart the timer from accumulated time."""
+        """
+        Restart the timer from accumulated time (the new run is logged on the next stop).
+        The last heartbeat belonged to the previous run, so it is cleared.
+        """
         if not self.is_running:
             self.start = timezone.now()
             self.is_running = True
-            self.save()
+            self.last_heartbeat_at = None
+            self.save(update_fields=["start", "is_running", "last_heartbeat_at"])
 
     @property
     def total_seconds(self):
@@ -53,6 +72,332 @@ class WorkSession(models.Model):
             return self.accumulated + int((timezone.now() - self.start).total_seconds())
         return self.accumulated
 
+class ReapedSession(models.Model):
+    """
+    A running WorkSession that realtimemonitoring.reaper closed because it
+    showed no activity: when its run was ended and why, for audits and for
+    correcting time by hand.
+    """
+    REASON_SILENT = "silent"
+    REASON_STALE = "stale"
+    REASON_CHOICES = [
+        (REASON_SILENT, "Client heartbeats stopped"),
+        (REASON_STALE, "No activity"),
+    ]
+
+    session = models.ForeignKey(
+        WorkSession,
+        on_delete=models.CASCADE,
+        related_name="reaps"
+    )
+    member = models.ForeignKey(
+        Member,
+        on_delete=models.CASCADE,
+        related_name="reaped_sessions"
+    )
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        null=True,
+        related_name="reaped_sessions"
+    )
+    reason = models.CharField(max_length=10, choices=REASON_CHOICES)
+    started_at = models.DateTimeField()
+    ended_at = models.DateTimeField(help_text="Last known activity; the run was closed here.")
+    last_heartbeat_at = models.DateTimeField(null=True, blank=True)
+    reaped_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["-reaped_at"]
+
+    @property
+    def seconds(self):
+        return int((self.ended_at - self.started_at).total_seconds())
+
+    def __str__(self):
+        return f"{self.member_id}/{self.project_id} {self.reason}: {self.started_at:%Y-%m-%d %H:%M} → {self.ended_at:%H:%M}"
+
+
+class ActivitySample(models.Model):
+    """
+    One heartbeat from the desktop tracker: what the client saw at
+    `recorded_at`. Written in batches by realtimemonitoring.heartbeat and
+    never updated.
+    """
+    member = models.ForeignKey(
+        Member,
+        on_delete=models.CASCADE,
+        related_name="activity_samples"
+    )
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        null=True,
+        related_name="activity_samples"
+    )
+    recorded_at = models.DateTimeField()
+    received_at = models.DateTimeField(default=timezone.now)
+    keyboard = models.BooleanField(default=False)
+    mouse = models.BooleanField(default=False)
+    idle = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["member", "recorded_at"], name="activity_member_recorded_idx"),
+            models.Index(fields=["project", "recorded_at"], name="activity_project_recorded_idx"),
+        ]
+        ordering = ["recorded_at"]
+
+    def __str__(self):
+        return f"{self.member_id}/{self.project_id} @ {self.recorded_at:%Y-%m-%d %H:%M:%S}"
+
+
+def split_at_midnight(started_at, ended_at):
+    """
+    Yield (start, end) pieces of [started_at, ended_at) cut at local midnights,
+    so that every piece falls inside a single calendar day.
+    """
+    cursor = started_at
+    while cursor < ended_at:
+        next_day = timezone.localtime(cursor).date() + timedelta(days=1)
+        midnight = timezone.make_aware(datetime.combine(next_day, time.min))
+        piece_end = min(midnight, ended_at)
+        yield cursor, piece_end
+        cursor = piece_end
+
+
+class TimeSegmentQuerySet(models.QuerySet):
+    """
+    Range queries over the ledger. Segments never cross midnight, so a segment
+    overlapping [since, until) always starts after `since - 1 day`, which keeps
+    every lookup a bounded scan on the (member|project, started_at) indexes.
+    """
+
+    def overlapping(self, since, until):
+        return self.filter(
+            started_at__gte=since - TimeSegment.MAX_SPAN,
+            started_at__lt=until,
+            ended_at__gt=since,
+        )
+
+    @staticmethod
+    def clipped_duration(since, until):
+        """Expression for the part of each segment that lies inside [since, until)."""
+        return ExpressionWrapper(
+            Least(F("ended_at"), Value(until)) - Greatest(F("started_at"), Value(since)),
+            output_field=DurationField(),
+        )
+
+    def totals(self, since, until, group_by=("member", "project")):
+        """
+        Exact tracked time inside the window, grouped by `group_by`.
+        Rows carry a `duration` timedelta.
+        """
+        return (
+            self.overlapping(since, until)
+            .values(*group_by)
+            .annotate(duration=Sum(self.clipped_duration(since, until)))
+            .order_by()
+        )
+
+    def per_period(self, since, until, period="day", group_by=("member", "project")):
+        """
+        Exact tracked time inside the window per calendar day or week
+        (weeks start on Monday). Rows carry `period` (a date) and `duration`.
+        """
+        if period == "week":
+            bucket = TruncWeek("started_at", output_field=models.DateField())
+        else:
+            bucket = TruncDate("started_at")
+        return (
+            self.overlapping(since, until)
+            .annotate(period=bucket)
+            .values("period", *group_by)
+            .annotate(duration=Sum(self.clipped_duration(since, until)))
+            .order_by("period")
+        )
+
+
+class TimeSegmentManager(models.Manager.from_queryset(TimeSegmentQuerySet)):
+    def record(self, member_id, project_id, started_at, ended_at, kind="work"):
+        """
+        Append the run [started_at, ended_at), split into per-day segments,
+        and add it to the matching DailyTrackedRollup rows.
+        """
+        segments = [
+            TimeSegment(member_id=member_id, project_id=project_id, kind=kind, started_at=start, ended_at=end)
+            for start, end in split_at_midnight(started_at, ended_at)
+        ]
+        with transaction.atomic():
+            created = self.bulk_create(segments)
+            DailyTrackedRollup.objects.add_segments(created)
+        return created
+
+
+class TimeSegment(models.Model):
+    """
+    Append-only ledger of finished work and break runs. `WorkSession.stop()`
+    and `BreakSession.stop()` append one row per calendar day covered by the
+    run; rows are never updated, so any window can be summed exactly with a
+    range scan.
+    """
+    KIND_WORK = "work"
+    KIND_BREAK = "break"
+    KIND_CHOICES = [
+        (KIND_WORK, "Work"),
+        (KIND_BREAK, "Break"),
+    ]
+    MAX_SPAN = timedelta(days=1)
+
+    member = models.ForeignKey(
+        Member,
+        on_delete=models.CASCADE,
+        related_name="time_segments"
+    )
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        null=True,
+        related_name="time_segments"
+    )
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, default=KIND_WORK)
+    started_at = models.DateTimeField()
+    ended_at = models.DateTimeField()
+
+    objects = TimeSegmentManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["member", "started_at"], name="timeseg_member_started_idx"),
+            models.Index(fields=["project", "started_at"], name="timeseg_project_started_idx"),
+        ]
+        ordering = ["started_at"]
+
+    @property
+    def seconds(self):
+        return int((self.ended_at - self.started_at).total_seconds())
+
+    def __str__(self):
+        return f"{self.member_id}/{self.project_id} {self.kind}: {self.started_at:%Y-%m-%d %H:%M} → {self.ended_at:%H:%M}"
+
+
+class DailyTrackedRollupManager(models.Manager):
+    def add_segments(self, segments):
+        """
+        Incrementally add ledger segments to their (member, project, date) rows.
+        Work segments feed `seconds`, break segments feed `break_seconds`.
+        """
+        deltas = {}
+        for seg in segments:
+            key = (seg.member_id, seg.project_id, timezone.localtime(seg.started_at).date())
+            work, brk = deltas.get(key, (0, 0))
+            if seg.kind == TimeSegment.KIND_BREAK:
+                brk += seg.seconds
+            else:
+                work += seg.seconds
+            deltas[key] = (work, brk)
+
+        for (member_id, project_id, day), (work, brk) in deltas.items():
+            if self._bump(member_id, project_id, day, work, brk):
+                continue
+            try:
+                with transaction.atomic():
+                    self.create(
+                        member_id=member_id,
+                        project_id=project_id,
+                        date=day,
+                        seconds=work,
+                        break_seconds=brk,
+                    )
+            except IntegrityError:
+                # a concurrent stop created the row first: add to it instead
+                self._bump(member_id, project_id, day, work, brk)
+
+    def _bump(self, member_id, project_id, day, work, brk):
+        return self.filter(member_id=member_id, project_id=project_id, date=day).update(
+            seconds=F("seconds") + work,
+            break_seconds=F("break_seconds") + brk,
+        )
+
+    def rebuild(self, date_from, date_to, member_ids=None, project_ids=None):
+        """
+        Recompute every row dated [date_from, date_to] from the TimeSegment
+        ledger. Returns the number of rows written.
+        """
+        since = timezone.make_aware(datetime.combine(date_from, time.min))
+        until = timezone.make_aware(datetime.combine(date_to + timedelta(days=1), time.min))
+
+        segments = TimeSegment.objects.all()
+        stale = self.filter(date__gte=date_from, date__lte=date_to)
+        if member_ids is not None:
+            segments = segments.filter(member_id__in=member_ids)
+            stale = stale.filter(member_id__in=member_ids)
+        if project_ids is not None:
+            segments = segments.filter(project_id__in=project_ids)
+            stale = stale.filter(project_id__in=project_ids)
+
+        rows = {}
+        for row in segments.per_period(since, until, group_by=("member_id", "project_id", "kind")):
+            key = (row["member_id"], row["project_id"], row["period"])
+            obj = rows.setdefault(key, DailyTrackedRollup(
+                member_id=key[0], project_id=key[1], date=key[2], seconds=0, break_seconds=0,
+            ))
+            secs = int(row["duration"].total_seconds()) if row["duration"] else 0
+            if row["kind"] == TimeSegment.KIND_BREAK:
+                obj.break_seconds += secs
+            else:
+                obj.seconds += secs
+
+        with transaction.atomic():
+            stale.delete()
+            self.bulk_create(rows.values(), batch_size=500)
+        return len(rows)
+
+
+class DailyTrackedRollup(models.Model):
+    """
+    Per-day tracked totals for a (member, project) pair, derived from the
+    TimeSegment ledger. Reports read these rows instead of re-summing sessions.
+    Break time is booked on the member's project-less row.
+    """
+    member = models.ForeignKey(
+        Member,
+        on_delete=models.CASCADE,
+        related_name="daily_rollups"
+    )
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        null=True,
+        related_name="daily_rollups"
+    )
+    date = models.DateField()
+    seconds = models.BigIntegerField(default=0)
+    break_seconds = models.BigIntegerField(default=0)
+
+    objects = DailyTrackedRollupManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["member", "project", "date"],
+                name="unique_member_project_date_rollup"
+            ),
+            # NULLs are distinct in the constraint above, so the project-less (break) rows need their own
+            models.UniqueConstraint(
+                fields=["member", "date"],
+                condition=Q(project__isnull=True),
+                name="unique_member_date_rollup_no_project"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["project", "date"], name="rollup_project_date_idx"),
+        ]
+        ordering = ["-date"]
+
+    def __str__(self):
+        return f"{self.member_id}/{self.project_id} {self.date}: {self.seconds}s (+{self.break_seconds}s break)"
+
 class BreakPolicy(models.Model):
     """
     A named “break policy” (Tea Break, Meal Break, etc.), 
@@ -118,7 +463,7 @@ class BreakSession(models.Model):
 
     def stop(self):
         """
-        Stop the break timer, accumulate seconds since `start`.
+        Stop the break timer, accumulate seconds since `start` and log the run to the ledger.
         """
         if self.is_running:
             now = timezone.now()
@@ -126,7 +471,11 @@ class BreakSession(models.Model):
             elapsed = int((now - self.start).total_seconds())
             self.accumulated += elapsed
             self.is_running = False
-            self.save()
+            with transaction.atomic():
+                self.save(update_fields=["accumulated", "is_running"])
+                TimeSegment.objects.record(
+                    self.member_id, None, self.start, now, kind=TimeSegment.KIND_BREAK
+                )
 
     def restart(self):
         """
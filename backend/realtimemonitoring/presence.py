@@ -0,0 +1,80 @@
+# realtimemonitoring/presence.py
+from django.contrib.auth import get_user_model
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from chat.broadcast import broadcaster
+from projects.models import Project
+
+from .models import BreakSession, WorkSession
+
+User = get_user_model()
+
+STATUS_ACTIVE = "active"
+STATUS_PAUSED = "paused"
+STATUS_BREAK = "break"
+
+
+def project_group(project_id):
+    return f"presence_project_{project_id}"
+
+
+def presence_row(session, user, status=None):
+    """
+    One member's state in a project: the MembersStatusView row plus what a
+    client needs to keep the clock ticking by itself (`accumulated` seconds and
+    `started_at` while running).
+    """
+    if status is None:
+        status = STATUS_ACTIVE if session.is_running else STATUS_PAUSED
+    return {
+        "id": user.id,
+        "member_id": session.member_id,
+        "name": user.get_full_name() or user.username,
+        "status": status,
+        "total_seconds": session.total_seconds,
+        "accumulated": session.accumulated,
+        "started_at": session.start.isoformat() if session.is_running else None,
+        "project_id": session.project_id,
+    }
+
+
+def publish_presence(event, session, user, status=None):
+    """
+    Push one delta ("start", "stop", "break") to the project's presence
+    sockets once the current transaction commits.
+    """
+    if session is None or session.project_id is None:
+        return
+    broadcaster.publish([(project_group(session.project_id), {
+        "type": "presence.update",
+        "payload": {
+            "type": "presence",
+            "event": event,
+            "at": timezone.now().isoformat(),
+            **presence_row(session, user, status),
+        },
+    })])
+
+
+def snapshot(project_id):
+    """Every member's current row for a project, in one query."""
+    sessions = (
+        WorkSession.objects.filter(project_id=project_id)
+        .select_related("member__user")
+        .annotate(on_break=Exists(BreakSession.objects.filter(member=OuterRef("member"), is_running=True)))
+        .order_by()
+    )
+    rows = []
+    for sess in sessions:
+        status = STATUS_BREAK if sess.on_break and not sess.is_running else None
+        rows.append(presence_row(sess, sess.member.user, status))
+    return rows
+
+
+def can_view_project(user_id, member_id, project_id):
+    """Project members, its creator and staff may watch its presence feed (one query)."""
+    is_staff = User.objects.filter(pk=user_id, is_staff=True)
+    return Project.objects.filter(pk=project_id).filter(
+        Q(members__id=member_id) | Q(created_by_id=user_id) | Exists(is_staff)
+    ).exists()
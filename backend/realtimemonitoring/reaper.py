@@ -0,0 +1,160 @@
+# realtimemonitoring/reaper.py
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.utils import timezone
+
+from .live import live_sessions
+from .models import DailyTrackedRollup, ReapedSession, TimeSegment, WorkSession, split_at_midnight
+from .presence import publish_presence
+
+logger = logging.getLogger(__name__)
+
+
+def stale_sessions(cutoff, heartbeat_only=False):
+    """
+    Running sessions with no activity since `cutoff`: started before it and
+    with no heartbeat after it. A range scan on (is_running, start).
+    With `heartbeat_only`, only sessions whose client has sent heartbeats
+    during the current run (a heartbeat older than `start` is a previous run's).
+    """
+    qs = WorkSession.objects.filter(is_running=True, start__lt=cutoff).filter(
+        Q(last_heartbeat_at__isnull=True) | Q(last_heartbeat_at__lt=cutoff)
+    )
+    if heartbeat_only:
+        qs = qs.filter(last_heartbeat_at__gte=F("start"))
+    return qs.order_by()
+
+
+def heartbeat_of_run(session):
+    """The session's last heartbeat if it was sent during the current run, else None."""
+    if session.last_heartbeat_at is not None and session.last_heartbeat_at >= session.start:
+        return session.last_heartbeat_at
+    return None
+
+
+class SessionReaper:
+    """
+    Closes running WorkSessions that show no activity, in bulk, at their last
+    known activity time: the last heartbeat, or the start for clients that
+    send none (the run then adds nothing). Per batch that is one locked read,
+    one UPDATE, one ledger bulk_create with its rollup update and one
+    ReapedSession bulk_create recording what was closed and why.
+
+    - MONITOR_REAP_AFTER_MINUTES: no activity for this long makes a session stale
+    - MONITOR_HEARTBEAT_TIMEOUT_MINUTES: the shorter limit for clients that
+      send heartbeats and then go silent (the heartbeat thread's sweep)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.reaped = 0
+        self.silent = 0
+        self.stale = 0
+        self.seconds_credited = 0
+        self.last_run_at = None
+        self._warned_unshared = False
+
+    def reap(self, cutoff=None, heartbeat_only=False, batch_size=500, dry_run=False):
+        """
+        Close every session stale_sessions(cutoff, heartbeat_only) returns.
+        Returns the ReapedSession rows (unsaved with dry_run).
+        """
+        now = timezone.now()
+        if cutoff is None:
+            cutoff = now - timedelta(minutes=getattr(settings, "MONITOR_REAP_AFTER_MINUTES", 720))
+        ids = list(stale_sessions(cutoff, heartbeat_only).values_list("pk", flat=True))
+        reaped = []
+        for i in range(0, len(ids), batch_size):
+            reaped += self._reap_batch(ids[i:i + batch_size], cutoff, heartbeat_only, now, dry_run)
+
+        with self._lock:
+            self.runs += 1
+            self.last_run_at = now
+            if not dry_run:
+                self.reaped += len(reaped)
+                for row in reaped:
+                    setattr(self, row.reason, getattr(self, row.reason) + 1)
+                    self.seconds_credited += row.seconds
+        if reaped and not dry_run:
+            logger.info("Reaped %d work session(s) with no activity since %s", len(reaped), cutoff.isoformat())
+            self._warn_if_unshared()
+        return reaped
+
+    def _warn_if_unshared(self):
+        # reaping uses queryset.update(), so only this process's live cache entries are dropped
+        if live_sessions.shared or self._warned_unshared:
+            return
+        self._warned_unshared = True
+        logger.warning(
+            "MONITOR_LIVE_CACHE is not set: other workers keep reporting reaped sessions as active "
+            "for up to MONITOR_LIVE_TTL (%ss). Point it at a cache all workers share.",
+            live_sessions.ttl,
+        )
+
+    def _reap_batch(self, ids, cutoff, heartbeat_only, now, dry_run):
+        with transaction.atomic():
+            # re-read under lock: a session started, stopped or heard from since the scan is skipped
+            sessions = list(
+                stale_sessions(cutoff, heartbeat_only).filter(pk__in=ids)
+                .select_for_update(of=("self",))
+                .select_related("member__user")
+            )
+            if not sessions:
+                return []
+
+            rows = []
+            for session in sessions:
+                heartbeat = heartbeat_of_run(session)
+                rows.append(ReapedSession(
+                    session=session,
+                    member_id=session.member_id,
+                    project_id=session.project_id,
+                    reason=ReapedSession.REASON_SILENT if heartbeat else ReapedSession.REASON_STALE,
+                    started_at=session.start,
+                    ended_at=heartbeat or session.start,
+                    last_heartbeat_at=heartbeat,
+                    reaped_at=now,
+                ))
+            if dry_run:
+                return rows
+
+            WorkSession.objects.filter(pk__in=[s.pk for s in sessions]).update(
+                is_running=False,
+                accumulated=F("accumulated") + Case(
+                    *[When(pk=row.session_id, then=Value(row.seconds)) for row in rows],
+                    default=Value(0),
+                    output_field=IntegerField(),
+                ),
+            )
+            segments = TimeSegment.objects.bulk_create([
+                TimeSegment(member_id=row.member_id, project_id=row.project_id, started_at=start, ended_at=end)
+                for row in rows
+                for start, end in split_at_midnight(row.started_at, row.ended_at)
+            ])
+            DailyTrackedRollup.objects.add_segments(segments)
+            ReapedSession.objects.bulk_create(rows)
+
+            for session, row in zip(sessions, rows):
+                session.is_running = False
+                session.accumulated += row.seconds
+                # queryset.update() skips the write-through signal
+                live_sessions.discard(session.member_id, session.project_id)
+                publish_presence("stop", session, session.member.user)
+        return rows
+
+    def stats(self):
+        with self._lock:
+            return {
+                "runs": self.runs, "reaped": self.reaped, "silent": self.silent, "stale": self.stale,
+                "seconds_credited": self.seconds_credited,
+                "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            }
+
+
+reaper = SessionReaper()
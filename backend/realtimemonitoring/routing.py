@@ -0,0 +1,7 @@
+# realtimemonitoring/routing.py
+from django.urls import re_path
+from . import consumers
+
+websocket_urlpatterns = [
+    re_path(r"^ws/monitor/projects/(?P<project_id>\d+)/?$", consumers.MemberStatusConsumer.as_asgi()),  # /ws/monitor/projects/<id>/?token=...
+]
@@ -78,3 +78,17 @@ class BreakSessionStatusSerializer(serializers.ModelSerializer):
 
     def get_status(self, obj):
         return "active" if obj.is_running else "paused"
+
+
+class HeartbeatSampleSerializer(serializers.Serializer):
+    """
+    One heartbeat from the desktop tracker:
+      - timestamp: when the client took the sample (future times are clamped to now)
+      - project: the project being tracked, or null
+      - keyboard / mouse / idle: activity flags for the sample period
+    """
+    timestamp = serializers.DateTimeField()
+    project = serializers.IntegerField(required=False, allow_null=True, default=None)
+    keyboard = serializers.BooleanField(default=False)
+    mouse = serializers.BooleanField(default=False)
+    idle = serializers.BooleanField(default=False)
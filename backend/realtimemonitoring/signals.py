@@ -0,0 +1,41 @@
+# realtimemonitoring/signals.py
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from projects.models import Member, Project
+
+from .breaks import policy_members
+from .live import live_sessions
+from .models import BreakPolicy, WorkSession
+
+
+@receiver(post_save, sender=WorkSession)
+def write_through_work_session(sender, instance, **kwargs):
+    live_sessions.put(instance)
+
+
+@receiver(post_delete, sender=WorkSession)
+def discard_work_session(sender, instance, **kwargs):
+    live_sessions.discard(instance.member_id, instance.project_id)
+
+
+@receiver(post_delete, sender=Member)
+def forget_member(sender, instance, **kwargs):
+    live_sessions.forget_member(instance.pk)
+
+
+@receiver(post_delete, sender=Project)
+def forget_project(sender, instance, **kwargs):
+    live_sessions.forget_project(instance.pk)
+
+
+@receiver(post_save, sender=BreakPolicy)
+@receiver(post_delete, sender=BreakPolicy)
+def forget_break_policy(sender, instance, **kwargs):
+    policy_members.invalidate(instance.pk)
+
+
+@receiver(m2m_changed, sender=BreakPolicy.members.through)
+def forget_break_policy_members(sender, instance, reverse, **kwargs):
+    # reverse: member.break_policies changed, so any policy may be affected
+    policy_members.invalidate(None if reverse else instance.pk)
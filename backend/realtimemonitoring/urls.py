@@ -1,12 +1,13 @@
 1# realtimemonitoring/urls.py
 
 from django.urls import path
-from .views import  MembersStatusView, MonitorStatusView, MonitorStartView, MonitorStopView,BreakPolicyListCreateView, BreakPolicyRetrieveUpdateDestroyView,BreakStatusView, BreakStartView, BreakStopView
+from .views import  HeartbeatView, MembersStatusView, MonitorStatusView, MonitorStartView, MonitorStopView,BreakPolicyListCreateView, BreakPolicyRetrieveUpdateDestroyView,BreakStatusView, BreakStartView, BreakStopView
 
 urlpatterns = [
      path("status/", MonitorStatusView.as_view(), name="monitor-status"),
     path("start/", MonitorStartView.as_view(), name="monitor-start"),
     path("stop/", MonitorStopView.as_view(), name="monitor-stop"),
+    path("heartbeat/", HeartbeatView.as_view(), name="monitor-heartbeat"),
       path("members-status/", MembersStatusView.as_view(), name="members-status"),
 
        path("break/policies/",           BreakPolicyListCreateView.as_view(),          name="breakpolicy-list-create"),
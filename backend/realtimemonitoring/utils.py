@@ -0,0 +1,73 @@
+# realtimemonitoring/utils.py
+
+from collections import defaultdict
+
+from django.db.models import DurationField, ExpressionWrapper, F, Sum, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import TimeSegment, WorkSession, split_at_midnight
+
+
+def _period_key(moment, period):
+    day = timezone.localtime(moment).date()
+    if period == "week":
+        return day - timezone.timedelta(days=day.weekday())
+    return day
+
+
+def tracked_seconds(since, until=None, period=None, member_ids=None, project_ids=None, now=None):
+    """
+    Exact tracked seconds inside [since, until), keyed by (member_id, project_id)
+    or, when `period` is "day"/"week", by (member_id, project_id, period_start).
+
+    Finished runs come from the TimeSegment ledger (one grouped range query);
+    runs that are still going are read from running WorkSessions, clipped to
+    the window in the database (or split per day in Python when bucketing).
+    """
+    now = now or timezone.now()
+    until = min(until or now, now)
+    result = defaultdict(int)
+    if until <= since:
+        return result
+
+    segments = TimeSegment.objects.filter(kind=TimeSegment.KIND_WORK)
+    running = WorkSession.objects.filter(is_running=True, start__lt=until)
+    if member_ids is not None:
+        segments = segments.filter(member_id__in=member_ids)
+        running = running.filter(member_id__in=member_ids)
+    if project_ids is not None:
+        segments = segments.filter(project_id__in=project_ids)
+        running = running.filter(project_id__in=project_ids)
+
+    if period:
+        rows = segments.per_period(since, until, period=period, group_by=("member_id", "project_id"))
+    else:
+        rows = segments.totals(since, until, group_by=("member_id", "project_id"))
+
+    for row in rows:
+        key = (row["member_id"], row["project_id"])
+        if period:
+            key += (row["period"],)
+        duration = row["duration"]
+        result[key] += int(duration.total_seconds()) if duration else 0
+
+    if not period:
+        # one grouped aggregate of (until - max(start, since)) over the running rows
+        live_rows = running.values("member_id", "project_id").annotate(
+            live=Sum(ExpressionWrapper(
+                Value(until) - Greatest(F("start"), Value(since)),
+                output_field=DurationField(),
+            ))
+        ).order_by()
+        for row in live_rows:
+            live = row["live"]
+            result[(row["member_id"], row["project_id"])] += int(live.total_seconds()) if live else 0
+        return result
+
+    for member_id, project_id, start in running.values_list("member_id", "project_id", "start"):
+        for piece_start, piece_end in split_at_midnight(max(start, since), until):
+            key = (member_id, project_id, _period_key(piece_start, period))
+            result[key] += int((piece_end - piece_start).total_seconds())
+
+    return result
@@ -287,6 +287,8 @@ class BreakStopView(APIView):
             status=status.HTTP_200_OK
         )
 # realtimemonitoring/views.py
+from django.conf import settings
+from django.http import Http404
 from django.utils import timezone
 from rest_framework import permissions, status, generics
 from rest_framework.response import Response
@@ -294,11 +296,16 @@ from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
 from datetime import date
 
-from .models import BreakPolicy, BreakSession, WorkSession
+from .breaks import TransitionError, resume_work, take_break
+from .heartbeat import heartbeats
+from .live import live_sessions
+from .models import ActivitySample, BreakPolicy, BreakSession, WorkSession
+from .presence import publish_presence
 from .serializers import (
     WorkSessionStatusSerializer,
     BreakPolicySerializer,
     BreakSessionStatusSerializer,
+    HeartbeatSampleSerializer,
 )
 from projects.models import Member, Project
 
@@ -309,25 +316,16 @@ class MonitorStatusView(APIView):
     """
     GET /api/monitor/status/?project=<id>
     Returns the user's current WorkSession for a given project (creating one if needed).
+    Served from the live session store: no queries once the pair has been seen.
     """
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        project_id = request.query_params.get('project')
-        project = get_object_or_404(Project, pk=project_id)
-        member = get_object_or_404(Member, user=request.user)
-
-        # Safely get or create the work session
-        session, created = WorkSession.objects.get_or_create(
-            member=member,
-            project=project,
-        )
-        if created:
-            session.is_running = False
-            session.save()
+        project_id = live_sessions.project_id(request.query_params.get('project'))
+        member_id = live_sessions.member_id_for(request.user)
 
-        data = WorkSessionStatusSerializer(session).data
-        return Response(data, status=status.HTTP_200_OK)
+        state = live_sessions.state(member_id, project_id)
+        return Response(state.as_status(), status=status.HTTP_200_OK)
 
 
 class MonitorStartView(APIView):
@@ -338,15 +336,13 @@ class MonitorStartView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request):
-        project_id = request.data.get('project') or request.query_params.get('project')
-        project = get_object_or_404(Project, pk=project_id)
-        member = get_object_or_404(Member, user=request.user)
+        project_id = live_sessions.project_id(request.data.get('project') or request.query_params.get('project'))
+        member_id = live_sessions.member_id_for(request.user)
 
-        session, _ = WorkSession.objects.get_or_create(member=member, project=project)
-        session.restart()
-
-        data = WorkSessionStatusSerializer(session).data
-        return Response(data, status=status.HTTP_200_OK)
+        state, started = live_sessions.start(member_id, project_id)
+        if started is not None:
+            publish_presence("start", started, request.user)
+        return Response(state.as_status(), status=status.HTTP_200_OK)
 
 
 class MonitorStopView(APIView):
@@ -357,19 +353,74 @@ class MonitorStopView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request):
-        project_id = request.data.get('project') or request.query_params.get('project')
-        project = get_object_or_404(Project, pk=project_id)
-        member = get_object_or_404(Member, user=request.user)
+        project_id = live_sessions.project_id(request.data.get('project') or request.query_params.get('project'))
+        member_id = live_sessions.member_id_for(request.user)
 
-        session = WorkSession.objects.filter(member=member, project=project).order_by('-start').first()
-        if not session:
+        state, stopped = live_sessions.stop(member_id, project_id)
+        if state is None:
             return Response({"detail": "No active work session found."}, status=status.HTTP_404_NOT_FOUND)
+        if stopped is not None:
+            publish_presence("stop", stopped, request.user)
+        return Response(state.as_status(), status=status.HTTP_200_OK)
 
-        if session.is_running:
-            session.stop()
 
-        data = WorkSessionStatusSerializer(session).data
-        return Response(data, status=status.HTTP_200_OK)
+class HeartbeatView(APIView):
+    """
+    POST /api/monitor/heartbeat/
+    Body: {"samples": [{"timestamp": <iso>, "project": <id|null>, "keyboard": <bool>, "mouse": <bool>, "idle": <bool>}, ...]}
+    (a single sample object is accepted too)
+
+    Samples are buffered and written in batches (realtimemonitoring.heartbeat),
+    so this answers 202 without touching the database in steady state.
+    Samples for unknown projects are dropped and counted in "dropped".
+    A running session whose heartbeats stop is stopped at its last heartbeat.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        payload = request.data.get("samples", request.data) if isinstance(request.data, dict) else request.data
+        if isinstance(payload, dict):
+            payload = [payload]
+        if not isinstance(payload, list) or not payload:
+            return Response({"detail": "samples is required."}, status=status.HTTP_400_BAD_REQUEST)
+        max_samples = getattr(settings, "MONITOR_HEARTBEAT_MAX_SAMPLES", 500)
+        if len(payload) > max_samples:
+            return Response({"detail": f"At most {max_samples} samples per request."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = HeartbeatSampleSerializer(data=payload, many=True)
+        serializer.is_valid(raise_exception=True)
+
+        member_id = live_sessions.member_id_for(request.user)
+        now = timezone.now()
+        # samples for a project that no longer exists are dropped, not the whole batch:
+        # a client re-sending its buffer would otherwise get 404 forever
+        known = {}
+        for project_id in {row["project"] for row in serializer.validated_data if row["project"] is not None}:
+            try:
+                known[project_id] = live_sessions.project_id(project_id)
+            except Http404:
+                pass
+        samples = []
+        unknown = 0
+        for row in serializer.validated_data:
+            project_id = row["project"]
+            if project_id is not None and project_id not in known:
+                unknown += 1
+                continue
+            samples.append(ActivitySample(
+                member_id=member_id,
+                project_id=project_id,
+                recorded_at=min(row["timestamp"], now),
+                received_at=now,
+                keyboard=row["keyboard"],
+                mouse=row["mouse"],
+                idle=row["idle"],
+            ))
+
+        accepted = heartbeats.add(samples) if samples else 0
+        return Response({"accepted": accepted, "dropped": len(samples) - accepted + unknown},
+                        status=status.HTTP_202_ACCEPTED)
 
 
 class MembersStatusView(APIView):
@@ -458,7 +509,9 @@ class BreakStartView(APIView):
     POST /api/monitor/break/start/
     Body: { "policy_id": <int>, "project": <int> }
 
-    → Take Break: stops the WorkSession for that project, then starts a BreakSession with chosen policy.
+    → Take Break: stops the WorkSession for that project, then starts a BreakSession with chosen policy,
+    in one transaction (realtimemonitoring.breaks). Answers with the break status, plus both statuses
+    under "work_session" / "break_session".
     """
     permission_classes = [permissions.IsAuthenticated]
 
@@ -471,26 +524,18 @@ class BreakStartView(APIView):
         if not project_id:
             return Response({"detail": "project is required."}, status=status.HTTP_400_BAD_REQUEST)
 
-        member = get_object_or_404(Member, user=request.user)
-        project = get_object_or_404(Project, pk=project_id)
-        policy = get_object_or_404(BreakPolicy, id=policy_id)
-
-        # Optional: restrict who can take which policy
-        if not policy.members.filter(id=member.id).exists() and not policy.apply_to_new:
-            return Response({"detail": "You are not allowed to take this break (policy mismatch)."},
-                            status=status.HTTP_403_FORBIDDEN)
-
-        # Safely stop only the relevant WorkSession
-        work_session = WorkSession.objects.filter(member=member, project=project).order_by('-start').first()
-        if work_session and work_session.is_running:
-            work_session.stop()
-
-        # Start or resume BreakSession
-        break_session, _ = BreakSession.objects.get_or_create(member=member)
-        break_session.policy = policy
-        break_session.restart()
+        member_id = live_sessions.member_id_for(request.user)
+        project_id = live_sessions.project_id(project_id)
+        try:
+            work_status, break_status = take_break(request.user, member_id, project_id, policy_id)
+        except TransitionError as exc:
+            return Response({"detail": exc.detail}, status=exc.status_code)
 
-        return Response(BreakSessionStatusSerializer(break_session).data, status=status.HTTP_200_OK)
+        return Response({
+            **break_status,
+            "work_session": work_status,
+            "break_session": break_status,
+        }, status=status.HTTP_200_OK)
 
 
 class BreakStopView(APIView):
@@ -498,7 +543,8 @@ class BreakStopView(APIView):
     POST /api/monitor/break/stop/
     Body: { "project": <int> }
 
-    → Stop Break: stops the BreakSession, then restarts (or creates) WorkSession for that project.
+    → Stop Break: stops the BreakSession, then restarts (or creates) WorkSession for that project,
+    in one transaction (realtimemonitoring.breaks).
     """
     permission_classes = [permissions.IsAuthenticated]
 
@@ -507,21 +553,14 @@ class BreakStopView(APIView):
         if not project_id:
             return Response({"detail": "project is required."}, status=status.HTTP_400_BAD_REQUEST)
 
-        member = get_object_or_404(Member, user=request.user)
-        project = get_object_or_404(Project, pk=project_id)
-
-        break_session = BreakSession.objects.filter(member=member).first()
-        if not break_session:
-            return Response({"detail": "No active BreakSession found."}, status=status.HTTP_404_NOT_FOUND)
-
-        if break_session.is_running:
-            break_session.stop()
-
-        # Resume work for this project
-        session, _ = WorkSession.objects.get_or_create(member=member, project=project)
-        session.restart()
+        member_id = live_sessions.member_id_for(request.user)
+        project_id = live_sessions.project_id(project_id)
+        try:
+            work_status, break_status = resume_work(request.user, member_id, project_id)
+        except TransitionError as exc:
+            return Response({"detail": exc.detail}, status=exc.status_code)
 
         return Response({
-            "work_session": WorkSessionStatusSerializer(session).data,
-            "break_session": BreakSessionStatusSerializer(break_session).data
+            "work_session": work_status,
+            "break_session": break_status,
         }, status=status.HTTP_200_OK)
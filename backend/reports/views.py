@@ -1,10 +1,11 @@
 # Replace your existing TrackedHoursReportView with this implementation
 from django.db.models import Sum, Q
+from django.utils.dateparse import parse_date
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import permissions, status
 from projects.models import Project, Member
-from realtimemonitoring.models import WorkSession
+from realtimemonitoring.models import DailyTrackedRollup
 import logging
 
 logger = logging.getLogger(__name__)
@@ -17,6 +18,7 @@ class TrackedHoursReportView(APIView):
       - If Project.created_by is a User FK -> use created_by == request.user to detect owners
       - If Project.created_by is a Member FK -> use created_by__user == request.user to detect owners
       - Returns grouped project objects with `members` list (member_id, member_name, total_seconds)
+      - Totals are read from DailyTrackedRollup (all days, or only `date` when given)
       - If ?debug=1 is passed, returns an extra `__debug` field with diagnostics
     """
     permission_classes = [permissions.IsAuthenticated]
@@ -100,22 +102,23 @@ class TrackedHoursReportView(APIView):
         owner_ids = list(owner_projects.values_list("id", flat=True))
         non_owner_ids = list(non_owner_projects.values_list("id", flat=True))
 
-        # Prepare a date filter for WorkSession if provided (adjust field name if needed)
+        # Restrict the rollup rows to a single day if requested
         ws_filter_kwargs = {}
         if qs_date:
-            # adjust to your WorkSession model: e.g., started_at__date or created_at__date
-            # If WorkSession has a 'date' field (string), you can use 'date' directly as below:
-            ws_filter_kwargs["started_at__date"] = qs_date  # most common pattern
-            # If your WorkSession uses a plain 'date' field, replace with ws_filter_kwargs['date'] = qs_date
+            report_date = parse_date(qs_date)
+            if report_date is None:
+                return Response({"detail": "invalid date param"}, status=status.HTTP_400_BAD_REQUEST)
+            ws_filter_kwargs["date"] = report_date
 
         response_map = {}
 
         # OWNER projects: totals + per-member aggregates
         if owner_ids:
             owner_totals = (
-                WorkSession.objects.filter(project_id__in=owner_ids, **ws_filter_kwargs)
+                DailyTrackedRollup.objects.filter(project_id__in=owner_ids, **ws_filter_kwargs)
                 .values("project_id", "project__name")
-                .annotate(total_seconds=Sum("accumulated"))
+                .annotate(total_seconds=Sum("seconds"))
+                .order_by()
             )
             for item in owner_totals:
                 pid = item["project_id"]
@@ -127,9 +130,10 @@ class TrackedHoursReportView(APIView):
                 }
 
             per_member = (
-                WorkSession.objects.filter(project_id__in=owner_ids, **ws_filter_kwargs)
+                DailyTrackedRollup.objects.filter(project_id__in=owner_ids, **ws_filter_kwargs)
                 .values("project_id", "member")
-                .annotate(total_seconds=Sum("accumulated"))
+                .annotate(total_seconds=Sum("seconds"))
+                .order_by()
             )
 
             # Bulk fetch Member objects referenced by per_member
@@ -186,8 +190,8 @@ class TrackedHoursReportView(APIView):
 
         # NON-OWNER projects: show only current_member totals
         if current_member and non_owner_ids:
-            personal_qs = WorkSession.objects.filter(member=current_member, project_id__in=non_owner_ids, **ws_filter_kwargs)
-            personal_agg = personal_qs.values("project_id", "project__name").annotate(total_seconds=Sum("accumulated"))
+            personal_qs = DailyTrackedRollup.objects.filter(member=current_member, project_id__in=non_owner_ids, **ws_filter_kwargs)
+            personal_agg = personal_qs.values("project_id", "project__name").annotate(total_seconds=Sum("seconds")).order_by()
             for item in personal_agg:
                 pid = item["project_id"]
                 if pid in response_map:
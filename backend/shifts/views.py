@@ -1,9 +1,9 @@
 # shifts/views.py
 
-from datetime import datetime
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
 
 from django.utils import timezone
-from django.db.models import Q
 from rest_framework import generics, permissions, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.exceptions import PermissionDenied, NotFound
@@ -18,7 +18,7 @@ from .serializers import (
     AttendanceSerializer,
 )
 from projects.models import Member
-from realtimemonitoring.models import WorkSession
+from realtimemonitoring.utils import tracked_seconds
 from .utils import create_or_update_attendance_for
 
 
@@ -119,32 +119,27 @@ class TrackedShiftsView(APIView):
             .prefetch_related("members__user")
         )
 
-        now = timezone.now()
         output = []
 
         for shift in shifts:
             # get all members of this shift
             members = shift.members.all()
-            member_usernames = list(members.values_list("user__username", flat=True))
+            member_usernames = [m.user.username for m in members]
 
-            # filter sessions for that date + those members
-            qs = WorkSession.objects.filter(start__date=target_date, member__in=members)
-
-            # restrict to shift time window on the session start time
-            if shift.start_time < shift.end_time:
-                qs = qs.filter(start__time__gte=shift.start_time, start__time__lt=shift.end_time)
-            else:
+            # shift window on that date, in the shift's own timezone
+            try:
+                tz = ZoneInfo(shift.timezone) if shift.timezone else timezone.get_default_timezone()
+            except Exception:
+                tz = timezone.get_default_timezone()
+            window_start = datetime.combine(target_date, shift.start_time).replace(tzinfo=tz)
+            window_end = datetime.combine(target_date, shift.end_time).replace(tzinfo=tz)
+            if shift.end_time <= shift.start_time:
                 # overnight shift
-                qs = qs.filter(Q(start__time__gte=shift.start_time) | Q(start__time__lt=shift.end_time))
-
-            # now sum durations in Python
-            total_secs = 0
-            for sess in qs:
-                secs = sess.accumulated or 0
-                if sess.is_running:
-                    delta = now - sess.start
-                    secs += int(delta.total_seconds())
-                total_secs += secs
+                window_end += timedelta(days=1)
+
+            # exact time tracked inside the window, from the TimeSegment ledger
+            totals = tracked_seconds(window_start, window_end, member_ids=[m.id for m in members])
+            total_secs = sum(totals.values())
 
             hours = total_secs // 3600
             mins = (total_secs % 3600) // 60
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import TaskAI
+from .models import AutoAssignJob, TaskAI
 
 
 
@@ -8,4 +8,11 @@ from .models import TaskAI
 class TaskAIAdmin(admin.ModelAdmin):
     list_display = ("id", "title", "project", "priority", "deadline", "hours", "created_by", "created_at")
     list_filter = ("priority", "project", "project_type")
-    search_fields = ("title", "web_desc", "mobile_desc", "figma_desc")
\ No newline at end of file
+    search_fields = ("title", "web_desc", "mobile_desc", "figma_desc")
+
+
+@admin.register(AutoAssignJob)
+class AutoAssignJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "task", "status", "attempts", "run_after", "locked_by", "updated_at")
+    list_filter = ("status",)
+    raw_id_fields = ("task",)
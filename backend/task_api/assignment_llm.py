@@ -0,0 +1,231 @@
+# task_api/assignment_llm.py
+import json
+import logging
+import random
+import threading
+import time
+
+from django.conf import settings
+
+from .scoring import ScoringEngine
+
+logger = logging.getLogger(__name__)
+
+# Try to import openai; if unavailable we'll fall back to deterministic behavior
+try:
+    import openai  # pip install openai
+    OPENAI_AVAILABLE = True
+except Exception:
+    openai = None
+    OPENAI_AVAILABLE = False
+
+
+class LLMUnavailable(Exception):
+    """No call was made: no backend configured, circuit open, or no free concurrency slot."""
+
+
+class LLMError(Exception):
+    """Every attempt of a call failed."""
+
+
+class OpenAIBackend:
+    name = "openai"
+
+    def is_configured(self):
+        return OPENAI_AVAILABLE and bool(getattr(settings, "OPENAI_API_KEY", None))
+
+    def complete(self, messages, model, max_tokens, timeout):
+        api_key = getattr(settings, "OPENAI_API_KEY", None)
+        if hasattr(openai, "OpenAI"):
+            # openai>=1.0; retries are ours, not the SDK's
+            client = openai.OpenAI(api_key=api_key, timeout=timeout, max_retries=0)
+            resp = client.chat.completions.create(model=model, messages=messages, temperature=0.0, max_tokens=max_tokens)
+            return resp.choices[0].message.content
+        openai.api_key = api_key
+        resp = openai.ChatCompletion.create(
+            model=model, messages=messages, temperature=0.0, max_tokens=max_tokens, request_timeout=timeout,
+        )
+        return resp["choices"][0]["message"]["content"]
+
+
+class StubBackend:
+    """
+    Offline backend for tests and local runs. Reads the JSON payload on the last
+    line of the prompt and answers in the same shape as the model would, picking
+    candidates with the deterministic scorer.
+    """
+    name = "stub"
+
+    def is_configured(self):
+        return True
+
+    def complete(self, messages, model, max_tokens, timeout):
+        payload = json.loads(messages[-1]["content"].rpartition("\n")[2])
+        candidates = payload.get("candidates") or []
+        if "tasks" in payload:
+            return json.dumps(self._pick(payload["tasks"], candidates))
+        picks = self._pick([payload.get("task") or {}], candidates)
+        return json.dumps({k: v for k, v in picks[0].items() if k != "taskId"})
+
+    def _pick(self, tasks, candidates):
+        scores = ScoringEngine(candidates).score(tasks)
+        assigned = {}
+        out = []
+        for i, task in enumerate(tasks):
+            shortlist = scores.shortlist(i, {j: n * 8 for j, n in assigned.items()}, window=0)
+            if not shortlist:
+                out.append({"taskId": task.get("taskId"), "memberId": None, "memberName": None, "confidence": 0, "reason": "stub: no candidates"})
+                continue
+            j, adjusted = min(shortlist, key=lambda item: (-scores.overlap(i, item[0]), item[0]))
+            assigned[j] = assigned.get(j, 0) + 1
+            cand = candidates[j]
+            out.append({"taskId": task.get("taskId"), "memberId": cand.get("id"), "memberName": cand.get("name"), "confidence": adjusted, "reason": f"stub: {scores.reason(i, j)}"})
+        return out
+
+
+BACKENDS = {"openai": OpenAIBackend, "stub": StubBackend}
+
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive failures; after `cooldown` seconds one
+    trial call is let through (half-open) and its outcome closes or re-opens it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            cooldown = getattr(settings, "TASKAI_LLM_BREAKER_COOLDOWN", 60)
+            if time.monotonic() - self.opened_at < cooldown or self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.failures >= getattr(settings, "TASKAI_LLM_BREAKER_THRESHOLD", 5):
+                if self.opened_at is None:
+                    logger.warning("Assignment LLM circuit opened after %d failures", self.failures)
+                self.opened_at = time.monotonic()
+
+    @property
+    def is_open(self):
+        """True while calls are refused (open and still cooling down)."""
+        opened_at = self.opened_at
+        cooldown = getattr(settings, "TASKAI_LLM_BREAKER_COOLDOWN", 60)
+        return opened_at is not None and time.monotonic() - opened_at < cooldown
+
+
+class AssignmentLLMClient:
+    """
+    The one way task_api talks to a language model: backend chosen by
+    TASKAI_LLM_BACKEND ("openai", "stub"; unset means openai when configured),
+    per-call timeout, at most TASKAI_LLM_MAX_CONCURRENCY calls in flight per
+    process (others wait TASKAI_LLM_QUEUE_TIMEOUT for a slot), retries with exponential backoff and full jitter, and a circuit
+    breaker. Callers use the deterministic scorer whenever `available` is False
+    or a call raises.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._semaphore = None
+        self._semaphore_size = None
+        self.breaker = CircuitBreaker()
+        self.calls = 0
+        self.failures = 0
+        self.rejected = 0
+
+    @property
+    def backend(self):
+        name = getattr(settings, "TASKAI_LLM_BACKEND", None)
+        if name:
+            return BACKENDS[name]()
+        backend = OpenAIBackend()
+        return backend if backend.is_configured() else None
+
+    @property
+    def backend_name(self):
+        backend = self.backend
+        return backend.name if backend else None
+
+    @property
+    def available(self):
+        backend = self.backend
+        return backend is not None and backend.is_configured() and not self.breaker.is_open
+
+    def _slots(self):
+        size = getattr(settings, "TASKAI_LLM_MAX_CONCURRENCY", 4)
+        with self._lock:
+            if self._semaphore is None or self._semaphore_size != size:
+                self._semaphore = threading.BoundedSemaphore(size)
+                self._semaphore_size = size
+            return self._semaphore
+
+    def complete(self, messages, model, max_tokens):
+        """Message content of one chat completion, or LLMUnavailable / LLMError."""
+        backend = self.backend
+        if backend is None or not backend.is_configured():
+            raise LLMUnavailable("no LLM backend configured")
+        if self.breaker.is_open:
+            self._count("rejected")
+            raise LLMUnavailable("circuit open")
+
+        slots = self._slots()
+        if not slots.acquire(timeout=getattr(settings, "TASKAI_LLM_QUEUE_TIMEOUT", 2)):
+            self._count("rejected")
+            raise LLMUnavailable("all LLM slots busy")
+        try:
+            # checked again holding a slot: claims the single half-open trial, if that is where we are
+            if not self.breaker.allow():
+                self._count("rejected")
+                raise LLMUnavailable("circuit open")
+            return self._call_with_retries(backend, messages, model, max_tokens, getattr(settings, "TASKAI_LLM_TIMEOUT", 20))
+        finally:
+            slots.release()
+
+    def _call_with_retries(self, backend, messages, model, max_tokens, timeout):
+        retries = getattr(settings, "TASKAI_LLM_RETRIES", 2)
+        base_delay = getattr(settings, "TASKAI_LLM_RETRY_DELAY", 0.5)
+        for attempt in range(retries + 1):
+            self._count("calls")
+            try:
+                content = backend.complete(messages, model, max_tokens, timeout)
+            except Exception as exc:
+                self._count("failures")
+                logger.warning("LLM call failed (attempt %d/%d): %s", attempt + 1, retries + 1, exc)
+                if attempt == retries:
+                    self.breaker.record_failure()
+                    raise LLMError(str(exc)) from exc
+                time.sleep(random.uniform(0, base_delay * 2 ** attempt))
+            else:
+                self.breaker.record_success()
+                return content
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "backend": self.backend_name, "calls": self.calls, "failures": self.failures,
+                "rejected": self.rejected, "circuit_open": self.breaker.is_open,
+            }
+
+
+llm_client = AssignmentLLMClient()
@@ -0,0 +1,206 @@
+# task_api/bulk.py
+import csv
+import json
+import logging
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from .candidates import candidate_pool
+from .models import TaskAI
+from .optimizer import optimal_assignment
+from .serializers import TaskAISerializer
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+LIST_FIELDS = ("tags", "required_skills")
+
+
+def _lines(stream):
+    for line in iter(stream.readline, b""):
+        yield line.decode("utf-8-sig") if isinstance(line, bytes) else line
+
+
+def iter_rows(stream, content_type):
+    """
+    Yield (row number, dict or parse error string) from an NDJSON or, for
+    text/csv, a CSV body (header row; list columns comma separated).
+    """
+    if "csv" in (content_type or ""):
+        for n, row in enumerate(csv.DictReader(_lines(stream)), start=1):
+            data = {k.strip(): v for k, v in row.items() if k and v not in (None, "")}
+            for key in LIST_FIELDS:
+                if key in data:
+                    data[key] = [s.strip() for s in data[key].split(",") if s.strip()]
+            if "extra" in data:
+                try:
+                    data["extra"] = json.loads(data["extra"])
+                except ValueError:
+                    yield n, "extra: invalid JSON"
+                    continue
+            yield n, data
+        return
+
+    n = 0
+    for line in _lines(stream):
+        if not line.strip():
+            continue
+        n += 1
+        try:
+            data = json.loads(line)
+        except ValueError as exc:
+            yield n, f"invalid JSON: {exc}"
+            continue
+        yield n, data if isinstance(data, dict) else "each line must be a JSON object"
+
+
+def chunked(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def import_rows(rows, user, infer_dev_type, chunk_size=500):
+    """
+    Validate, create and auto-assign tasks chunk by chunk, yielding one result
+    dict per row as each chunk is committed, then a summary.
+
+    Per chunk: one serializer instance validates every row, projects and
+    assignees are loaded with in_bulk, unassigned tasks get one batch
+    assignment (task_api.optimizer) before a single bulk_create, and
+    notifications are bulk-created. bulk_create sends no post_save, so the
+    assignment notifications and candidate load updates are done here.
+    """
+    Project = apps.get_model("projects", "Project")
+    Notification = apps.get_model("timesheet", "Notification")
+    creator = user if getattr(user, "is_authenticated", False) else None
+    validator = TaskAISerializer(context={"request": None})
+    totals = {"rows": 0, "created": 0, "assigned": 0, "failed": 0}
+
+    for chunk in chunked(rows, chunk_size):
+        results = {}
+        valid = []
+        for n, data in chunk:
+            if isinstance(data, str):
+                results[n] = {"row": n, "status": "error", "errors": {"non_field_errors": [data]}}
+                continue
+            data = dict(data)
+            required_skills = data.pop("required_skills", None)
+            try:
+                validated = validator.run_validation(data)
+            except serializers.ValidationError as exc:
+                results[n] = {"row": n, "status": "error", "errors": exc.detail}
+                continue
+            if required_skills:
+                validated["extra"] = {**(validated.get("extra") or {}), "required_skills": required_skills}
+            valid.append((n, validated))
+
+        projects = Project.objects.in_bulk({v["selectedProjectId"] for _, v in valid if v.get("selectedProjectId")})
+        assignees = User.objects.in_bulk(
+            {v["assignee_id"] for _, v in valid if v.get("assignee_id") is not None} if creator is not None else ()
+        )
+
+        tasks = []
+        now = timezone.now()
+        for n, validated in valid:
+            project_id = validated.pop("selectedProjectId", None)
+            assignee_id = validated.pop("assignee_id", None)
+            if project_id and project_id not in projects:
+                results[n] = {"row": n, "status": "error", "errors": {"selectedProjectId": ["Invalid project id"]}}
+                continue
+            if assignee_id is not None and creator is None:
+                # same rule as TaskAISerializer.create: only signed-in callers assign by hand
+                results[n] = {"row": n, "status": "error", "errors": {"assignee_id": ["Authentication required to assign."]}}
+                continue
+            if assignee_id is not None and assignee_id not in assignees:
+                results[n] = {"row": n, "status": "error", "errors": {"assignee_id": ["Assignee user not found."]}}
+                continue
+            task = TaskAI(created_by=creator, project=projects.get(project_id), **validated)
+            if assignee_id is not None:
+                task.assignee = assignees[assignee_id]
+                task.assigned_by = creator
+                task.assigned_at = now
+            tasks.append((n, task))
+
+        _assign_batch([t for _, t in tasks if t.assignee_id is None], infer_dev_type, now)
+
+        with transaction.atomic():
+            TaskAI.objects.bulk_create([t for _, t in tasks], batch_size=chunk_size)
+            Notification.objects.bulk_create([
+                Notification(
+                    recipient_id=t.assignee_id,
+                    task_id=t.pk,
+                    verb=(f"You have been assigned to task: {t.title or t.pk}" if t.ai_suggested
+                          else f"You have been assigned a new task via AI: {t.title}"),
+                )
+                for _, t in tasks if t.assignee_id is not None
+            ], batch_size=chunk_size)
+
+        for _, t in tasks:
+            if t.assignee_id is not None:
+                candidate_pool.note_assignment(None, t.assignee_id)
+
+        for n, t in tasks:
+            results[n] = {
+                "row": n, "status": "created", "id": t.pk, "assignee": t.assignee_id,
+                "ai_suggested": t.ai_suggested, "ai_confidence": t.ai_confidence,
+            }
+            totals["created"] += 1
+            totals["assigned"] += t.assignee_id is not None
+
+        for n, _ in chunk:
+            totals["rows"] += 1
+            totals["failed"] += results[n]["status"] == "error"
+            yield results[n]
+
+    yield {"summary": totals}
+
+
+def _assign_batch(tasks, infer_dev_type, now):
+    """Fill AI assignment fields on unsaved tasks with one optimal_assignment over the batch."""
+    if not tasks:
+        return
+    pool = candidate_pool.get(limit=getattr(settings, "OPENAI_MAX_CANDIDATES", 200))
+    for task in tasks:
+        task.ai_suggested = True
+        task.ai_status = TaskAI.AI_STATUS_DONE
+    if not pool.candidates:
+        for task in tasks:
+            task.ai_reason = "No candidates available on server."
+        return
+
+    payloads = [{
+        "required_skills": (task.extra or {}).get("required_skills") or [],
+        "required_developer_type": infer_dev_type({"developer_type": task.project_type, "tags": task.tags or []}),
+    } for task in tasks]
+    scores = pool.engine.score(payloads)
+    picks = optimal_assignment(scores, capacity=getattr(settings, "TASKAI_MEMBER_CAPACITY", 10))
+
+    for i, (task, (j, value, k)) in enumerate(zip(tasks, picks)):
+        if j is None:
+            task.ai_reason = "No member has capacity left."
+            continue
+        cand = pool.candidates[j]
+        chosen = {
+            "memberId": cand.get("id"), "memberName": cand.get("name") or cand.get("username"),
+            "confidence": int(max(0, min(100, value))), "reason": f"{scores.reason(i, j)}; batch:+{k}", "meta": dict(cand),
+        }
+        task.ai_confidence = chosen["confidence"]
+        task.ai_reason = chosen["reason"]
+        task.ai_meta = {"chosen": chosen, "mode": "bulk"}
+        task.ai_suggested_member_id = cand.get("id")
+        task.assignee_id = cand.get("user_id")
+        task.assigned_by = task.created_by
+        task.assigned_at = now
+        task.assignment_locked = True
@@ -0,0 +1,217 @@
+# task_api/candidates.py
+import hashlib
+import json
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, F, Q
+
+from projects.models import Member
+from .models import TaskAI
+from .scoring import ScoringEngine, tokenize_skills
+
+logger = logging.getLogger(__name__)
+
+
+def _display_name(user):
+    if user is None:
+        return ""
+    return user.get_full_name() or user.username
+
+
+def load_candidates(limit=200):
+    """
+    Return up to `limit` compact candidate dicts, most experienced first:
+      { id (Member pk), user_id, name, username, email, skills, experience,
+        developer_type, role, raw, current_load }
+
+    Runs a single query: Member + user via select_related, open task load via
+    a filtered Count over the user's assigned TaskAI rows.
+    """
+    qs = (
+        Member.objects.filter(user__is_active=True)
+        .select_related("user")
+        .annotate(
+            current_load=Count(
+                "user__assigned_taskai",
+                filter=~Q(user__assigned_taskai__status=TaskAI.STATUS_DONE),
+            )
+        )
+        .order_by(F("experience").desc(nulls_last=True), "id")[:limit]
+    )
+
+    candidates = []
+    for m in qs:
+        user = m.user
+        candidates.append({
+            "id": m.pk,
+            "user_id": m.user_id,
+            "name": _display_name(user),
+            "username": user.username,
+            "email": user.email,
+            "skills": m.skills or "",
+            "experience": m.experience or 0,
+            "role": m.role or "",
+            "developer_type": m.developer_type,
+            "raw": {"member_pk": m.pk, "source": "projects.Member"},
+            "current_load": m.current_load,
+        })
+
+    logger.debug("Loaded %d assignment candidates", len(candidates))
+    return candidates
+
+
+def candidates_fingerprint(candidates):
+    """
+    Content hash of what the LLM prompts see of each candidate. Current load
+    is left out, so in-place load patches do not change it.
+    """
+    body = json.dumps(
+        [[c.get("id"), c.get("user_id"), c.get("name"), c.get("skills"), c.get("experience"), c.get("developer_type")]
+         for c in candidates],
+        separators=(",", ":"), default=str,
+    )
+    return hashlib.sha1(body.encode("utf-8")).hexdigest()
+
+
+class CandidatePool:
+    """
+    A built candidate list plus its pre-tokenized skill sets (keyed by candidate id)
+    and, on first use, a ScoringEngine over them.
+    Treat `candidates` as read-only: the same list is shared by every caller
+    until the pool is invalidated or expires.
+    """
+
+    def __init__(self, candidates, version, built_at):
+        self.candidates = candidates
+        self.version = version
+        self.built_at = built_at
+        self.skill_sets = {c["id"]: tokenize_skills(c.get("skills")) for c in candidates}
+        self._by_user = {c["user_id"]: c for c in candidates if c.get("user_id") is not None}
+        self._engine = None
+        self._fingerprint = None
+
+    @property
+    def fingerprint(self):
+        if self._fingerprint is None:
+            self._fingerprint = candidates_fingerprint(self.candidates)
+        return self._fingerprint
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            self._engine = ScoringEngine(self.candidates, self.skill_sets)
+        return self._engine
+
+    def __len__(self):
+        return len(self.candidates)
+
+    def adjust_load(self, user_id, delta):
+        cand = self._by_user.get(user_id)
+        if cand is not None:
+            cand["current_load"] = max(0, int(cand.get("current_load") or 0) + delta)
+
+
+class CandidatePoolCache:
+    """
+    Process-local candidate pool with a TTL.
+
+    When TASKAI_CANDIDATE_POOL_CACHE names a Django cache alias, the pool
+    version lives in that cache so an invalidation in one worker is seen by
+    all of them, and freshly built candidate lists are shared through it too.
+    """
+
+    VERSION_KEY = "task_api:candidate_pool:version"
+    POOL_KEY = "task_api:candidate_pool:{version}:{limit}"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pools = {}
+        self._local_version = 0
+
+    @property
+    def ttl(self):
+        return getattr(settings, "TASKAI_CANDIDATE_POOL_TTL", 300)
+
+    def _shared_cache(self):
+        alias = getattr(settings, "TASKAI_CANDIDATE_POOL_CACHE", None)
+        return caches[alias] if alias else None
+
+    def _current_version(self):
+        shared = self._shared_cache()
+        if shared is None:
+            return self._local_version
+        version = shared.get(self.VERSION_KEY)
+        if version is None:
+            shared.add(self.VERSION_KEY, 1, timeout=None)
+            version = shared.get(self.VERSION_KEY) or 1
+        return version
+
+    def get(self, limit=200):
+        """Return a CandidatePool, rebuilding it only when stale or invalidated."""
+        version = self._current_version()
+        now = time.monotonic()
+        pool = self._pools.get(limit)
+        if pool is not None and pool.version == version and now - pool.built_at < self.ttl:
+            return pool
+
+        with self._lock:
+            pool = self._pools.get(limit)
+            if pool is not None and pool.version == version and now - pool.built_at < self.ttl:
+                return pool
+
+            shared = self._shared_cache()
+            key = self.POOL_KEY.format(version=version, limit=limit)
+            candidates = shared.get(key) if shared is not None else None
+            if candidates is None:
+                candidates = load_candidates(limit=limit)
+                if shared is not None:
+                    shared.set(key, candidates, timeout=self.ttl)
+
+            pool = CandidatePool(candidates, version, time.monotonic())
+            self._pools[limit] = pool
+            logger.debug("Candidate pool rebuilt (version=%s, size=%d)", version, len(pool))
+            return pool
+
+    def invalidate(self):
+        """Drop every built pool here and, if shared, in the other workers."""
+        with self._lock:
+            self._pools.clear()
+            self._local_version += 1
+        shared = self._shared_cache()
+        if shared is not None:
+            try:
+                shared.incr(self.VERSION_KEY)
+            except ValueError:
+                shared.set(self.VERSION_KEY, 1, timeout=None)
+
+    def note_assignment(self, old_user_id, new_user_id):
+        """
+        An open task moved from `old_user_id` to `new_user_id` (either may be None).
+        Local pools are patched in place instead of rebuilt, so a burst of
+        assignments keeps using the same pool; other workers are invalidated.
+        """
+        if old_user_id == new_user_id:
+            return
+        shared = self._shared_cache()
+        with self._lock:
+            for pool in self._pools.values():
+                if old_user_id is not None:
+                    pool.adjust_load(old_user_id, -1)
+                if new_user_id is not None:
+                    pool.adjust_load(new_user_id, 1)
+        if shared is not None:
+            try:
+                version = shared.incr(self.VERSION_KEY)
+            except ValueError:
+                version = 1
+                shared.set(self.VERSION_KEY, version, timeout=None)
+            with self._lock:
+                for pool in self._pools.values():
+                    pool.version = version
+
+
+candidate_pool = CandidatePoolCache()
@@ -0,0 +1,110 @@
+# task_api/jobs.py
+import logging
+import os
+import socket
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import AutoAssignJob, TaskAI
+
+logger = logging.getLogger(__name__)
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue_auto_assign(task):
+    """Queue background auto-assignment for `task` and mark it ai_status=pending."""
+    with transaction.atomic():
+        job = AutoAssignJob.objects.create(task=task)
+        TaskAI.objects.filter(pk=task.pk).update(ai_status=TaskAI.AI_STATUS_PENDING)
+    task.ai_status = TaskAI.AI_STATUS_PENDING
+    logger.debug("Queued %s", job)
+    return job
+
+
+def requeue_stale(now=None):
+    """Put back jobs whose worker stopped without finishing them (lock older than the timeout)."""
+    now = now or timezone.now()
+    timeout = timedelta(seconds=getattr(settings, "TASKAI_JOB_LOCK_TIMEOUT", 300))
+    return AutoAssignJob.objects.filter(
+        status=AutoAssignJob.STATUS_RUNNING, locked_at__lt=now - timeout,
+    ).update(status=AutoAssignJob.STATUS_QUEUED, locked_by="", locked_at=None, run_after=now)
+
+
+def claim_jobs(worker_id, limit=10, now=None):
+    """
+    Claim up to `limit` due jobs for `worker_id`. Each row is taken with an
+    UPDATE ... WHERE status='queued', so a job lost to another worker is skipped.
+    """
+    now = now or timezone.now()
+    due = AutoAssignJob.objects.filter(
+        status=AutoAssignJob.STATUS_QUEUED, run_after__lte=now,
+    ).values_list("pk", flat=True)[: limit * 2]
+
+    claimed = []
+    for pk in due:
+        won = AutoAssignJob.objects.filter(pk=pk, status=AutoAssignJob.STATUS_QUEUED).update(
+            status=AutoAssignJob.STATUS_RUNNING, locked_by=worker_id, locked_at=now, attempts=F("attempts") + 1,
+        )
+        if won:
+            claimed.append(pk)
+            if len(claimed) >= limit:
+                break
+    return list(AutoAssignJob.objects.filter(pk__in=claimed).select_related("task"))
+
+
+def run_job(job):
+    """Run one claimed job; on error retry with backoff until TASKAI_JOB_MAX_ATTEMPTS."""
+    # the assignment logic lives on the viewset; it does not touch request state
+    from .views import TaskAIViewSet
+
+    try:
+        # reload: the task may have been edited or assigned by hand since it was queued
+        task = TaskAI.objects.filter(pk=job.task_id).first()
+        if task is not None and task.assignee_id is None:
+            TaskAIViewSet()._auto_assign_task_instance(task, unassigned_only=True)
+        else:
+            logger.debug("Auto-assign job %s: task already assigned or gone, skipping", job.pk)
+    except Exception as exc:
+        logger.exception("Auto-assign job %s failed (attempt %s)", job.pk, job.attempts)
+        _fail(job, exc)
+        return False
+
+    now = timezone.now()
+    AutoAssignJob.objects.filter(pk=job.pk).update(status=AutoAssignJob.STATUS_DONE, locked_at=None, updated_at=now)
+    TaskAI.objects.filter(pk=job.task_id).update(ai_status=TaskAI.AI_STATUS_DONE)
+    return True
+
+
+def _fail(job, exc):
+    now = timezone.now()
+    error = f"{type(exc).__name__}: {exc}"
+    if job.attempts < getattr(settings, "TASKAI_JOB_MAX_ATTEMPTS", 3):
+        delay = getattr(settings, "TASKAI_JOB_RETRY_DELAY", 30) * 2 ** (job.attempts - 1)
+        AutoAssignJob.objects.filter(pk=job.pk).update(
+            status=AutoAssignJob.STATUS_QUEUED, locked_by="", locked_at=None,
+            run_after=now + timedelta(seconds=delay), last_error=error, updated_at=now,
+        )
+        return
+    AutoAssignJob.objects.filter(pk=job.pk).update(
+        status=AutoAssignJob.STATUS_FAILED, locked_at=None, last_error=error, updated_at=now,
+    )
+    TaskAI.objects.filter(pk=job.task_id).update(ai_status=TaskAI.AI_STATUS_FAILED)
+
+
+def run_pending(worker_id=None, limit=10):
+    """Requeue stale jobs, then claim and run one batch. Returns (ran, failed)."""
+    worker_id = worker_id or default_worker_id()
+    requeue_stale()
+    ran = failed = 0
+    for job in claim_jobs(worker_id, limit=limit):
+        ran += 1
+        if not run_job(job):
+            failed += 1
+    return ran, failed
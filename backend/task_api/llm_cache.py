@@ -0,0 +1,121 @@
+# task_api/llm_cache.py
+import hashlib
+import json
+import logging
+import threading
+from concurrent.futures import Future
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+# list values that are sets in meaning: order and case do not change the answer
+UNORDERED_KEYS = {"tags", "required_skills", "skills"}
+
+
+def normalize_payload(value, key=None):
+    """Canonical form of a prompt payload: stripped strings, unordered lists sorted."""
+    if isinstance(value, dict):
+        return {str(k): normalize_payload(v, k) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        items = [normalize_payload(v) for v in value]
+        if key in UNORDERED_KEYS and all(isinstance(v, str) for v in items):
+            return sorted({v.lower() for v in items if v})
+        return items
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def make_key(model, payload, pool_version, **extra):
+    """Content address for one LLM call: hash of model, normalized payload, pool version and `extra`."""
+    body = json.dumps(
+        {"model": model, "payload": normalize_payload(payload), "pool": pool_version, "extra": extra},
+        sort_keys=True, separators=(",", ":"), default=str,
+    )
+    return "task_api:llm:" + hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    TTL cache of raw LLM responses in a Django cache (TASKAI_LLM_CACHE), with
+    in-flight coalescing: while one thread is calling upstream for a key, other
+    threads asking for the same key wait for that result instead of calling too.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    @property
+    def ttl(self):
+        return getattr(settings, "TASKAI_LLM_CACHE_TTL", 600)
+
+    def _cache(self):
+        alias = getattr(settings, "TASKAI_LLM_CACHE", "default")
+        return caches[alias] if alias else None
+
+    def get_or_call(self, key, call, cacheable=None):
+        """
+        Cached response for `key`, else the result of `call()`. The result is
+        stored only when `cacheable(result)` is true (default: not None).
+        Exceptions from `call` reach every coalesced waiter and are not cached.
+        """
+        cache = self._cache()
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                self._count("hits")
+                return cached
+
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self.coalesced += 1
+        if not owner:
+            return future.result(timeout=getattr(settings, "TASKAI_LLM_COALESCE_TIMEOUT", 120))
+
+        try:
+            # another thread may have stored the value between our miss and taking ownership
+            value = cache.get(key) if cache is not None else None
+            if value is not None:
+                self._count("hits")
+            else:
+                self._count("misses")
+                value = call()
+                if cache is not None and (cacheable(value) if cacheable else value is not None):
+                    cache.set(key, value, timeout=self.ttl)
+        except Exception as exc:
+            self._count("errors")
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "coalesced": self.coalesced, "errors": self.errors}
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = self.misses = self.coalesced = self.errors = 0
+
+
+llm_cache = LLMResponseCache()
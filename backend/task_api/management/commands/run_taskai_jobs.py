@@ -0,0 +1,33 @@
+### File: task_api/management/commands/run_taskai_jobs.py
+
+import time
+
+from django.core.management.base import BaseCommand
+from task_api.jobs import default_worker_id, run_pending
+
+class Command(BaseCommand):
+    help = "Run queued TaskAI auto-assign jobs. Polls the job table until stopped, or drains it once with --once."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Run due jobs until none are left, then exit')
+        parser.add_argument('--batch', type=int, default=10, help='Jobs claimed per poll (default 10)')
+        parser.add_argument('--sleep', type=float, default=2.0, help='Seconds to wait when the queue is empty (default 2)')
+        parser.add_argument('--worker-id', type=str, help='Name recorded on claimed jobs (default host:pid)')
+
+    def handle(self, *args, **options):
+        worker_id = options.get('worker_id') or default_worker_id()
+        total = failed_total = 0
+        try:
+            while True:
+                ran, failed = run_pending(worker_id, limit=options['batch'])
+                total += ran
+                failed_total += failed
+                if ran:
+                    self.stdout.write(f"{worker_id}: ran {ran} job(s), {failed} failed")
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f"Ran {total} auto-assign job(s), {failed_total} failed"))
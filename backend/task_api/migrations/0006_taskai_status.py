@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-18 00:43
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0011_member_hourly_rate_project_hourly_rate'),
+        ('task_api', '0005_taskreview'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taskai',
+            name='status',
+            field=models.CharField(choices=[('backlog', 'Backlog'), ('todo', 'To Do'), ('inprogress', 'In Progress'), ('review', 'Code Review'), ('testing', 'Testing'), ('done', 'Done')], default='backlog', max_length=12),
+        ),
+        migrations.AddIndex(
+            model_name='taskai',
+            index=models.Index(fields=['assignee', 'status'], name='taskai_assignee_status_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-18 00:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0011_member_hourly_rate_project_hourly_rate'),
+        ('task_api', '0007_autoassignjob_taskai_ai_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taskai',
+            name='ai_suggested_member',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ai_suggested_taskai', to='projects.member'),
+        ),
+    ]
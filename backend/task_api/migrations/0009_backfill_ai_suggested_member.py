@@ -0,0 +1,65 @@
+from django.db import migrations
+
+
+def _chosen_member(meta, member_pks, member_by_user):
+    """
+    Member the AI picked, from the ai_meta shapes written so far: candidates
+    from projects.Member carry raw.member_pk, older auth.User candidates carry
+    raw.user_pk / user_id (their memberId was a User pk).
+    """
+    if not isinstance(meta, dict):
+        return None
+    chosen = meta.get("chosen") or meta.get("selection") or {}
+    if not isinstance(chosen, dict):
+        return None
+    cand = chosen.get("meta") or {}
+    if not isinstance(cand, dict):
+        cand = {}
+    raw = cand.get("raw") if isinstance(cand.get("raw"), dict) else {}
+
+    if raw.get("member_pk") in member_pks:
+        return raw["member_pk"]
+    for user_pk in (raw.get("user_pk"), cand.get("user_id")):
+        if user_pk in member_by_user:
+            return member_by_user[user_pk]
+    if raw.get("source") != "auth.User":
+        for mid in (chosen.get("memberId"), chosen.get("member_id"), meta.get("member_pk"), meta.get("chosen_member_pk")):
+            try:
+                mid = int(mid)
+            except (TypeError, ValueError):
+                continue
+            if mid in member_pks:
+                return mid
+    return None
+
+
+def backfill_suggested_member(apps, schema_editor):
+    TaskAI = apps.get_model("task_api", "TaskAI")
+    Member = apps.get_model("projects", "Member")
+
+    member_by_user = dict(Member.objects.values_list("user_id", "pk"))
+    member_pks = set(member_by_user.values())
+
+    batch = []
+    qs = TaskAI.objects.filter(ai_suggested=True, ai_suggested_member__isnull=True).only("pk", "ai_meta")
+    for task in qs.iterator():
+        member_pk = _chosen_member(task.ai_meta, member_pks, member_by_user)
+        if member_pk is not None:
+            task.ai_suggested_member_id = member_pk
+            batch.append(task)
+        if len(batch) >= 500:
+            TaskAI.objects.bulk_update(batch, ["ai_suggested_member"])
+            batch = []
+    if batch:
+        TaskAI.objects.bulk_update(batch, ["ai_suggested_member"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_api', '0008_taskai_ai_suggested_member'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_suggested_member, migrations.RunPython.noop),
+    ]
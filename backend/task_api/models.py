@@ -22,6 +22,30 @@ class TaskAI(models.Model):
         (PROJECT_TYPE_BOTH, "Both"),
     ]
 
+    STATUS_BACKLOG = "backlog"
+    STATUS_TODO = "todo"
+    STATUS_IN_PROGRESS = "inprogress"
+    STATUS_REVIEW = "review"
+    STATUS_TESTING = "testing"
+    STATUS_DONE = "done"
+    STATUS_CHOICES = [
+        (STATUS_BACKLOG, "Backlog"),
+        (STATUS_TODO, "To Do"),
+        (STATUS_IN_PROGRESS, "In Progress"),
+        (STATUS_REVIEW, "Code Review"),
+        (STATUS_TESTING, "Testing"),
+        (STATUS_DONE, "Done"),
+    ]
+
+    AI_STATUS_PENDING = "pending"
+    AI_STATUS_DONE = "done"
+    AI_STATUS_FAILED = "failed"
+    AI_STATUS_CHOICES = [
+        (AI_STATUS_PENDING, "Pending"),
+        (AI_STATUS_DONE, "Done"),
+        (AI_STATUS_FAILED, "Failed"),
+    ]
+
     PRIORITY_HIGH = "High"
     PRIORITY_MEDIUM = "Medium"
     PRIORITY_LOW = "Low"
@@ -47,6 +71,7 @@ class TaskAI(models.Model):
     figma_desc = models.TextField(blank=True, null=True)
 
     priority = models.CharField(max_length=10, choices=PRIORITY_CHOICES, default=PRIORITY_MEDIUM)
+    status = models.CharField(max_length=12, choices=STATUS_CHOICES, default=STATUS_BACKLOG)
     deadline = models.DateField(null=True, blank=True)
     hours = models.PositiveIntegerField(default=0)
     tags = models.JSONField(default=list, blank=True)
@@ -90,6 +115,21 @@ class TaskAI(models.Model):
     )
     ai_reason = models.TextField(blank=True, null=True)
     ai_meta = models.JSONField(default=dict, blank=True)
+    # member the AI picked (kept even when no User could be resolved); backs /api/tasksai/my/
+    ai_suggested_member = models.ForeignKey(
+        "projects.Member",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="ai_suggested_taskai"
+    )
+    ai_status = models.CharField(
+        max_length=8,
+        choices=AI_STATUS_CHOICES,
+        null=True,
+        blank=True,
+        help_text="Background auto-assign state (empty when the task was never queued)."
+    )
 
     # Explicit assignment lock: prevents casual reassignment when True.
     assignment_locked = models.BooleanField(
@@ -100,6 +140,10 @@ class TaskAI(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # open-task load per assignee (candidate loader)
+            models.Index(fields=["assignee", "status"], name="taskai_assignee_status_idx"),
+        ]
         verbose_name = "Task AI"
         verbose_name_plural = "Tasks AI"
 
@@ -119,6 +163,41 @@ class TaskAI(models.Model):
         if save:
             self.save(update_fields=["assignment_locked"])
 
+class AutoAssignJob(models.Model):
+    """
+    A queued background auto-assignment for one TaskAI (see task_api.jobs).
+    Workers claim rows with a conditional UPDATE, so several can poll the same table.
+    """
+    STATUS_QUEUED = "queued"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, "Queued"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_DONE, "Done"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    task = models.ForeignKey(TaskAI, on_delete=models.CASCADE, related_name="auto_assign_jobs")
+    status = models.CharField(max_length=8, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True, default="")
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["run_after", "id"]
+        indexes = [
+            models.Index(fields=["status", "run_after"], name="autoassignjob_status_run_idx"),
+        ]
+
+    def __str__(self):
+        return f"AutoAssignJob#{self.pk} task={self.task_id} ({self.status})"
+
 # models.py (append)
 
 from django.db import models
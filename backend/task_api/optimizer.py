@@ -0,0 +1,209 @@
+# task_api/optimizer.py
+import logging
+import random
+
+from .scoring import LOAD_CAP, LOAD_POINTS, NUMPY_AVAILABLE, load_penalty
+
+logger = logging.getLogger(__name__)
+
+if NUMPY_AVAILABLE:
+    import numpy as np
+
+# scipy is optional; without it the bundled Hungarian solver below is used
+try:
+    from scipy.optimize import linear_sum_assignment  # pip install scipy
+    SCIPY_AVAILABLE = True
+except Exception:
+    linear_sum_assignment = None
+    SCIPY_AVAILABLE = False
+
+RUN_PENALTY = 8  # same per-task diversity penalty as the greedy chooser
+
+
+def _hungarian_lists(cost):
+    """Shortest augmenting path Hungarian method for n <= m; returns the column of each row."""
+    n, m = len(cost), len(cost[0])
+    inf = float("inf")
+    u = [0.0] + [min(row) for row in cost]
+    v = [0.0] * (m + 1)
+    p = [0] * (m + 1)
+    way = [0] * (m + 1)
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = [inf] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            row = cost[i0 - 1]
+            delta, j1 = inf, 0
+            for j in range(1, m + 1):
+                if not used[j]:
+                    cur = row[j - 1] - u[i0] - v[j]
+                    if cur < minv[j]:
+                        minv[j] = cur
+                        way[j] = j0
+                    if minv[j] < delta:
+                        delta, j1 = minv[j], j
+            for j in range(m + 1):
+                if used[j]:
+                    u[p[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+    result = [0] * n
+    for j in range(1, m + 1):
+        if p[j]:
+            result[p[j] - 1] = j - 1
+    return result
+
+
+def _hungarian_numpy(cost):
+    """Same algorithm as _hungarian_lists with the column scan done by numpy."""
+    n, m = cost.shape
+    u = np.zeros(n + 1)
+    u[1:] = cost.min(axis=1)  # row reduction: a feasible start that saves most augmenting steps
+    v = np.zeros(m + 1)
+    p = np.zeros(m + 1, dtype=np.int64)
+    way = np.zeros(m + 1, dtype=np.int64)
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            free = ~used[1:]
+            cur = cost[i0 - 1] - u[i0] - v[1:]
+            better = free & (cur < minv[1:])
+            minv[1:][better] = cur[better]
+            way[1:][better] = j0
+            masked = np.where(free, minv[1:], np.inf)
+            j1 = int(np.argmin(masked)) + 1
+            delta = masked[j1 - 1]
+            u[p[used]] += delta
+            v[used] -= delta
+            minv[~used] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+    result = [0] * n
+    for j in np.flatnonzero(p[1:]):
+        result[p[j + 1] - 1] = int(j)
+    return result
+
+
+def _useful_columns(cost):
+    """
+    Columns that can appear in an optimal assignment. If a row has n (= row
+    count) columns cheaper than column j, one of them is always free to swap
+    in, so j is only worth keeping when it is within some row's n cheapest.
+    """
+    n, m = len(cost), len(cost[0])
+    if m <= n:
+        return list(range(m))
+    if NUMPY_AVAILABLE:
+        cost = np.asarray(cost)
+        nth = np.partition(cost, n - 1, axis=1)[:, n - 1]
+        return [int(j) for j in np.flatnonzero((cost <= nth[:, None]).any(axis=0))]
+    keep = [False] * m
+    for row in cost:
+        nth = sorted(row)[n - 1]
+        for j, c in enumerate(row):
+            if c <= nth:
+                keep[j] = True
+    return [j for j in range(m) if keep[j]]
+
+
+def solve_min_cost(cost):
+    """Column for each row of an n x m cost matrix (n <= m) minimizing the total cost."""
+    if SCIPY_AVAILABLE:
+        rows, cols = linear_sum_assignment(np.asarray(cost))
+        result = [0] * len(rows)
+        for r, c in zip(rows, cols):
+            result[int(r)] = int(c)
+        return result
+    columns = _useful_columns(cost)
+    if NUMPY_AVAILABLE:
+        picked = _hungarian_numpy(np.asarray(cost, dtype=np.float64)[:, columns])
+    else:
+        picked = _hungarian_lists([[row[j] for j in columns] for row in cost])
+    return [columns[c] for c in picked]
+
+
+def optimal_assignment(scores, capacity, seed=None):
+    """
+    Assign every task of a BatchScores batch at once, maximizing the total score.
+
+    Each candidate gets `capacity - current_load` slots (at most one per task).
+    The k-th slot of a candidate is worth the base score minus the load penalty
+    at `current_load + k` and a RUN_PENALTY per task already given in this
+    batch, so work spreads out instead of piling onto the top scorer. Ties are
+    broken by a small jitter from `seed`, so the same seed gives the same result.
+
+    Returns one (candidate index or None, value, k) tuple per task; None means
+    no candidate had capacity left.
+    """
+    n = len(scores.task_skills)
+    n_cands = len(scores.engine)
+    slots = []
+    for j, load in enumerate(scores.loads):
+        for k in range(min(max(0, capacity - load), n)):
+            slots.append((j, k))
+
+    if not slots:
+        return [(None, 0, 0)] * n
+
+    # jitter stays below 1 / (2n) per task so it can never outweigh a whole point over the batch
+    rng = random.Random(seed)
+    scale = 1.0 / (2 * (n + 1))
+    jitter = [[rng.random() * scale for _ in range(n_cands)] for _ in range(n)]
+
+    def value(i, j, k):
+        return int(scores.base[i][j]) - load_penalty(scores.loads[j] + k) - RUN_PENALTY * k
+
+    if NUMPY_AVAILABLE:
+        slot_j = np.array([j for j, _ in slots], dtype=np.int64)
+        slot_k = np.array([k for _, k in slots], dtype=np.int64)
+        loads = np.asarray(scores.loads, dtype=np.int64)
+        slot_values = (
+            np.asarray(scores.base, dtype=np.int64).reshape(n, n_cands)[:, slot_j]
+            - np.minimum(LOAD_CAP, (loads[slot_j] + slot_k) * LOAD_POINTS)[None, :]
+            - RUN_PENALTY * slot_k[None, :]
+        )
+        cost = -slot_values + np.asarray(jitter).reshape(n, n_cands)[:, slot_j]
+    else:
+        cost = [[-value(i, j, k) + jitter[i][j] for j, k in slots] for i in range(n)]
+
+    if len(slots) >= n:
+        columns = solve_min_cost(cost)
+    else:
+        # fewer slots than tasks: every slot gets filled, so solve slots x tasks
+        # and leave the tasks no slot picked unassigned
+        transposed = cost.T if NUMPY_AVAILABLE else [list(col) for col in zip(*cost)]
+        columns = [len(slots)] * n
+        for col, i in enumerate(solve_min_cost(transposed)):
+            columns[i] = col
+
+    result = []
+    for i, col in enumerate(columns):
+        if col >= len(slots):
+            result.append((None, 0, 0))
+            continue
+        j, k = slots[col]
+        result.append((j, value(i, j, k), k))
+    logger.debug("Optimal assignment: %d tasks over %d slots", n, len(slots))
+    return result
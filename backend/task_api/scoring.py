@@ -0,0 +1,267 @@
+# task_api/scoring.py
+import logging
+
+logger = logging.getLogger(__name__)
+
+# numpy is optional; without it scores are computed from integer skill bitmaps
+try:
+    import numpy as np  # pip install numpy
+    NUMPY_AVAILABLE = True
+except Exception:
+    np = None
+    NUMPY_AVAILABLE = False
+
+SKILL_POINTS = 15
+SKILL_CAP = 60
+EXPERIENCE_CAP = 20.0
+EXPERIENCE_POINTS = 25.0
+DEV_TYPE_POINTS = 15
+LOAD_POINTS = 5
+LOAD_CAP = 20
+
+
+def tokenize_skills(value):
+    """Lower-cased skill tokens from a comma string or a list."""
+    if not value:
+        return frozenset()
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return frozenset(str(i).lower().strip() for i in value if i)
+    return frozenset(s.strip().lower() for s in str(value).split(",") if s.strip())
+
+
+def task_skill_tokens(task_payload):
+    """Required skill tokens of a task, duplicates kept (each one counts towards overlap)."""
+    x = task_payload.get("required_skills") or task_payload.get("skills") or task_payload.get("tags") or []
+    if not x:
+        return []
+    if isinstance(x, list):
+        return [str(i).lower().strip() for i in x if i]
+    return [s.strip().lower() for s in str(x).split(",") if s.strip()]
+
+
+def _dev_key(value):
+    value = str(value or "")
+    return value.lower() if value.strip() else None
+
+
+def _experience(cand):
+    try:
+        return float(cand.get("experience") or 0)
+    except Exception:
+        return 0.0
+
+
+def _load(cand):
+    try:
+        return int(cand.get("current_load") or 0)
+    except Exception:
+        return 0
+
+
+def _experience_bonus(exp):
+    return 5 if exp >= 8 else (3 if exp >= 5 else 0)
+
+
+def load_penalty(load):
+    return min(LOAD_CAP, load * LOAD_POINTS)
+
+
+def base_score(overlap, has_skills, exp, dev_match):
+    """
+    Score of one candidate for one task (0-100, before the load penalty):
+    skill overlap, capped experience, developer-type match and a seniority
+    bonus. A candidate with no overlap is pushed down unless the dev type
+    matches and they have 5+ years.
+    """
+    skill_score = min(SKILL_CAP, overlap * SKILL_POINTS)
+    experience_score = (max(0.0, min(EXPERIENCE_CAP, exp)) / EXPERIENCE_CAP) * EXPERIENCE_POINTS
+    dev_score = DEV_TYPE_POINTS if dev_match else 0
+    if has_skills and overlap == 0:
+        if dev_match and exp >= 5:
+            experience_score = max(experience_score, 18.0)
+        else:
+            experience_score = max(0.0, experience_score - 10.0)
+    return int(round(max(0, min(100, skill_score + experience_score + dev_score + _experience_bonus(exp)))))
+
+
+class ScoringEngine:
+    """
+    Scores batches of tasks against a fixed candidate list.
+
+    The skill vocabulary and the candidate x skill matrix (a numpy 0/1 matrix,
+    or one integer bitmap per candidate without numpy) are built once; a batch
+    of tasks is then scored against every candidate in one pass. Current load
+    is read from the candidate dicts on each call, since the candidate pool
+    patches it in place between assignments.
+    """
+
+    def __init__(self, candidates, skill_sets=None):
+        self.candidates = candidates
+        if skill_sets is None:
+            skill_sets = {}
+        cand_skills = [
+            skill_sets.get(c.get("id")) if c.get("id") in skill_sets
+            else tokenize_skills(c.get("skills") or c.get("skill") or "")
+            for c in candidates
+        ]
+
+        self.vocabulary = {}
+        for skills in cand_skills:
+            for s in skills:
+                self.vocabulary.setdefault(s, len(self.vocabulary))
+
+        self.experience = [_experience(c) for c in candidates]
+        dev_keys = [_dev_key(c.get("developer_type") or c.get("dev_type")) for c in candidates]
+        self._dev_codes = {}
+        for key in dev_keys:
+            if key is not None:
+                self._dev_codes.setdefault(key, len(self._dev_codes) + 1)
+        dev = [self._dev_codes.get(key, 0) for key in dev_keys]
+        self.index_of = {str(c.get("id")): j for j, c in enumerate(candidates) if c.get("id") is not None}
+
+        if NUMPY_AVAILABLE:
+            matrix = np.zeros((len(candidates), len(self.vocabulary)), dtype=np.float32)
+            for j, skills in enumerate(cand_skills):
+                if skills:
+                    matrix[j, [self.vocabulary[s] for s in skills]] = 1.0
+            self._matrix_t = np.ascontiguousarray(matrix.T)
+            self._exp = np.asarray(self.experience, dtype=np.float64)
+            self._dev = np.asarray(dev, dtype=np.int64)
+        else:
+            self._bitmaps = [sum(1 << self.vocabulary[s] for s in skills) for skills in cand_skills]
+            self._dev = dev
+
+    def __len__(self):
+        return len(self.candidates)
+
+    def _task_dev_code(self, task_payload):
+        key = _dev_key(task_payload.get("required_developer_type") or task_payload.get("developer_type"))
+        # -1 never equals a candidate code, including "no dev type" (0)
+        return self._dev_codes.get(key, -1) if key is not None else -1
+
+    def score(self, tasks):
+        """Score `tasks` (task payload dicts) against every candidate; returns BatchScores."""
+        task_skills = [task_skill_tokens(t) for t in tasks]
+        task_dev = [self._task_dev_code(t) for t in tasks]
+        loads = [_load(c) for c in self.candidates]
+        if NUMPY_AVAILABLE:
+            base, overlaps = self._score_numpy(task_skills, task_dev)
+            totals = np.maximum(0, base - np.minimum(LOAD_CAP, np.asarray(loads, dtype=np.int64) * LOAD_POINTS)[None, :])
+        else:
+            base, overlaps = self._score_bitmaps(task_skills, task_dev)
+            totals = [[max(0, b - load_penalty(load)) for b, load in zip(row, loads)] for row in base]
+        return BatchScores(self, task_skills, task_dev, loads, base, totals, overlaps)
+
+    def _score_numpy(self, task_skills, task_dev):
+        n, c = len(task_skills), len(self.candidates)
+        counts = np.zeros((n, len(self.vocabulary)), dtype=np.float32)
+        for i, skills in enumerate(task_skills):
+            for s in skills:
+                idx = self.vocabulary.get(s)
+                if idx is not None:
+                    counts[i, idx] += 1.0
+        overlaps = (counts @ self._matrix_t).astype(np.int64) if c else np.zeros((n, 0), dtype=np.int64)
+
+        has_skills = np.array([bool(s) for s in task_skills], dtype=bool)[:, None]
+        dev_match = np.asarray(task_dev, dtype=np.int64)[:, None] == self._dev[None, :]
+        exp = self._exp[None, :]
+
+        skill_score = np.minimum(SKILL_CAP, overlaps * SKILL_POINTS).astype(np.float64)
+        experience_score = np.broadcast_to(
+            (np.clip(exp, 0.0, EXPERIENCE_CAP) / EXPERIENCE_CAP) * EXPERIENCE_POINTS, (n, c)
+        )
+        no_overlap = has_skills & (overlaps == 0)
+        special = no_overlap & dev_match & (exp >= 5)
+        experience_score = np.where(
+            special,
+            np.maximum(experience_score, 18.0),
+            np.where(no_overlap, np.maximum(0.0, experience_score - 10.0), experience_score),
+        )
+        dev_score = np.where(dev_match, DEV_TYPE_POINTS, 0)
+        exp_bonus = np.where(exp >= 8, 5, np.where(exp >= 5, 3, 0))
+
+        # same addition order as base_score so float rounding matches exactly
+        base = np.rint(np.clip(skill_score + experience_score + dev_score + exp_bonus, 0, 100)).astype(np.int64)
+        return base, overlaps
+
+    def _score_bitmaps(self, task_skills, task_dev):
+        base, overlaps = [], []
+        for skills, dev_code in zip(task_skills, task_dev):
+            weights = {}
+            for s in skills:
+                idx = self.vocabulary.get(s)
+                if idx is not None:
+                    weights[1 << idx] = weights.get(1 << idx, 0) + 1
+            has_skills = bool(skills)
+            row_base, row_overlaps = [], []
+            for bits, exp, dev in zip(self._bitmaps, self.experience, self._dev):
+                overlap = sum(w for bit, w in weights.items() if bits & bit) if bits else 0
+                row_overlaps.append(overlap)
+                row_base.append(base_score(overlap, has_skills, exp, dev == dev_code))
+            base.append(row_base)
+            overlaps.append(row_overlaps)
+        return base, overlaps
+
+
+class BatchScores:
+    """
+    Scores of one batch: `totals[i][j]` (after the load penalty), `base[i][j]`
+    (before it) and `overlaps[i][j]` for task i, candidate j.
+    """
+
+    def __init__(self, engine, task_skills, task_dev, loads, base, totals, overlaps):
+        self.engine = engine
+        self.task_skills = task_skills
+        self.task_dev = task_dev
+        self.loads = loads
+        self.base = base
+        self.totals = totals
+        self.overlaps = overlaps
+
+    def overlap(self, i, j):
+        return int(self.overlaps[i][j])
+
+    def total(self, i, j):
+        return int(self.totals[i][j])
+
+    def shortlist(self, i, penalties=None, window=3):
+        """
+        (candidate index, adjusted score) pairs within `window` points of the
+        best adjusted score for task i. `penalties` maps candidate index to
+        points taken off before comparing (e.g. for earlier picks in a run).
+        """
+        if not len(self.engine):
+            return []
+        if NUMPY_AVAILABLE:
+            adjusted = self.totals[i].copy()
+            for j, p in (penalties or {}).items():
+                adjusted[j] = max(0, adjusted[j] - p)
+            top = adjusted.max()
+            idx = np.flatnonzero(top - adjusted <= window)
+            return [(int(j), int(adjusted[j])) for j in idx]
+        adjusted = list(self.totals[i])
+        for j, p in (penalties or {}).items():
+            adjusted[j] = max(0, adjusted[j] - p)
+        top = max(adjusted)
+        return [(j, a) for j, a in enumerate(adjusted) if top - a <= window]
+
+    def ranked(self, i, limit=None):
+        """Candidate indexes for task i, best score first (ties: larger overlap first)."""
+        order = sorted(range(len(self.engine)), key=lambda j: (-self.total(i, j), -self.overlap(i, j)))
+        return order[:limit] if limit is not None else order
+
+    def reason(self, i, j):
+        overlap = self.overlap(i, j)
+        skills = self.task_skills[i]
+        exp = self.engine.experience[j]
+        load = self.loads[j]
+        dev_match = self.engine._dev[j] == self.task_dev[i]
+        parts = [
+            f"skills {overlap}/{max(1, len(skills))}",
+            f"exp {exp}yr",
+            f"devType:{'yes' if dev_match else 'no'}",
+            f"load:{load}(-{load_penalty(load)})",
+        ]
+        if skills and overlap == 0 and dev_match and exp >= 5:
+            parts.append("special: devType+exp fallback")
+        return "; ".join(parts)
@@ -27,6 +27,8 @@ class TaskAISerializer(serializers.ModelSerializer):
     ai_confidence = serializers.IntegerField(read_only=True, allow_null=True)
     ai_reason = serializers.CharField(read_only=True, allow_null=True)
     ai_meta = serializers.JSONField(read_only=True)
+    ai_status = serializers.CharField(read_only=True, allow_null=True)
+    ai_suggested_member = serializers.PrimaryKeyRelatedField(read_only=True)
 
     # explicit lock field (read-only)
     assignment_locked = serializers.BooleanField(read_only=True)
@@ -49,6 +51,7 @@ class TaskAISerializer(serializers.ModelSerializer):
             "mobile_desc",
             "figma_desc",
             "priority",
+            "status",
             "deadline",
             "hours",
             "tags",
@@ -59,7 +62,7 @@ class TaskAISerializer(serializers.ModelSerializer):
             # assignment fields
             "assignee_id", "assignee", "assigned_by", "assigned_at",
             # ai metadata
-            "ai_suggested", "ai_confidence", "ai_reason", "ai_meta",
+            "ai_suggested", "ai_confidence", "ai_reason", "ai_meta", "ai_status", "ai_suggested_member",
             # explicit lock field
             "assignment_locked",
             # friendly assignee display
@@ -76,6 +79,8 @@ class TaskAISerializer(serializers.ModelSerializer):
             "ai_confidence",
             "ai_reason",
             "ai_meta",
+            "ai_status",
+            "ai_suggested_member",
             "assignment_locked",
             "assignee_name",
             "assignee_full_name",
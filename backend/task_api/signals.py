@@ -1,33 +1,77 @@
 # signals.py
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import post_init, post_save, post_delete, m2m_changed
 from django.dispatch import receiver
-from .models import TaskReview, Member
+from projects.models import Member, Project
+from .candidates import candidate_pool
+from .models import TaskAI, TaskReview
 from django.db.models import Avg, Count
 
+# Review aggregates on the assignee's Member; the only place they are maintained
+# (create_review, admin edits and deletes all land here).
+REVIEW_AGGREGATE_FIELDS = [
+    f.name for f in Member._meta.concrete_fields if f.name in ("avg_rating", "review_count", "last_reviewed_at")
+]
+
+
 @receiver([post_save, post_delete], sender=TaskReview)
 def update_member_review_aggregates(sender, instance, **kwargs):
-    task = instance.task
-    reviewed_member = None
-    if getattr(task, "assignee", None):
-        try:
-            reviewed_member = Member.objects.get(user=task.assignee)
-        except Member.DoesNotExist:
-            reviewed_member = None
-
+    if not REVIEW_AGGREGATE_FIELDS:
+        # Member carries no aggregate columns in this schema: nothing to maintain
+        return
+    assignee_id = TaskAI.objects.filter(pk=instance.task_id).values_list("assignee_id", flat=True).first()
+    if assignee_id is None:
+        return
+    reviewed_member = Member.objects.filter(user_id=assignee_id).first()
     if not reviewed_member:
         return
 
-    agg = TaskReview.objects.filter(task__assignee=reviewed_member.user, rating__isnull=False).aggregate(avg=Avg("rating"), cnt=Count("id"))
-    avg_rating = agg["avg"] or 0.0
-    cnt = agg["cnt"] or 0
+    reviews = TaskReview.objects.filter(task__assignee_id=assignee_id)
+    agg = reviews.filter(rating__isnull=False).aggregate(avg=Avg("rating"), cnt=Count("id"))
+    if "avg_rating" in REVIEW_AGGREGATE_FIELDS:
+        reviewed_member.avg_rating = float(agg["avg"] or 0.0)
+    if "review_count" in REVIEW_AGGREGATE_FIELDS:
+        reviewed_member.review_count = int(agg["cnt"] or 0)
+    if "last_reviewed_at" in REVIEW_AGGREGATE_FIELDS:
+        reviewed_member.last_reviewed_at = reviews.order_by("-created_at").values_list("created_at", flat=True).first()
+
+    reviewed_member.save(update_fields=REVIEW_AGGREGATE_FIELDS)
+
+
+# --------------------------
+# Candidate pool invalidation
+# --------------------------
+def _open_assignee_id(task):
+    """Assignee whose open load this task counts towards (None when done/unassigned)."""
+    if {"status", "assignee"} & task.get_deferred_fields():
+        return None
+    if task.status == TaskAI.STATUS_DONE:
+        return None
+    return task.assignee_id
+
+
+@receiver(post_init, sender=TaskAI)
+def remember_loaded_assignee(sender, instance, **kwargs):
+    instance._loaded_open_assignee_id = _open_assignee_id(instance) if instance.pk else None
+
+
+@receiver(post_save, sender=TaskAI)
+def track_assignee_change(sender, instance, **kwargs):
+    current = _open_assignee_id(instance)
+    candidate_pool.note_assignment(getattr(instance, "_loaded_open_assignee_id", None), current)
+    instance._loaded_open_assignee_id = current
+
+
+@receiver(post_delete, sender=TaskAI)
+def track_assignee_removal(sender, instance, **kwargs):
+    candidate_pool.note_assignment(_open_assignee_id(instance), None)
+
+
+@receiver([post_save, post_delete], sender=Member)
+def invalidate_pool_on_member_change(sender, instance, **kwargs):
+    candidate_pool.invalidate()
 
-    if hasattr(reviewed_member, "avg_rating"):
-        reviewed_member.avg_rating = float(avg_rating)
-    if hasattr(reviewed_member, "review_count"):
-        reviewed_member.review_count = int(cnt)
-    if hasattr(reviewed_member, "last_reviewed_at"):
-        # set to latest review's created_at if present
-        latest = TaskReview.objects.filter(task__assignee=reviewed_member.user).order_by("-created_at").first()
-        reviewed_member.last_reviewed_at = latest.created_at if latest else None
 
-    reviewed_member.save(update_fields=[f for f in ("avg_rating", "review_count", "last_reviewed_at") if hasattr(reviewed_member, f)])
+@receiver(m2m_changed, sender=Project.members.through)
+def invalidate_pool_on_membership_change(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        candidate_pool.invalidate()
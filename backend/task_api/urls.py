@@ -8,6 +8,7 @@ urlpatterns = [
     path('tasksai/<int:pk>/assign/', TaskAIViewSet.as_view({'post': 'assign'}), name='task-assign'),
     # IMPORTANT: map the action method name 'auto_assign' here
     path('tasksai/auto-assign/', TaskAIViewSet.as_view({'post': 'auto_assign'}), name='taskai-auto-assign'),
+    path('tasksai/bulk/', TaskAIViewSet.as_view({'post': 'bulk_import'}), name='taskai-bulk'),
     path('tasksai/my/', TaskAIViewSet.as_view({'get': 'my'}), name='task-my'),
     # your_app/urls.py (merge with your existing endpoints)
     path('tasksai/stats/', TaskAIViewSet.as_view({'get': 'stats'}), name='taskai-stats'),
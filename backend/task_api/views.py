@@ -8,6 +8,7 @@ from django.apps import apps
 from django.conf import settings
 from django.db import transaction
 from django.db.models import Q
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 from rest_framework import pagination
@@ -17,17 +18,17 @@ from rest_framework.response import Response
 
 logger = logging.getLogger(__name__)
 
-# Try to import openai; if unavailable we'll fall back to deterministic behavior
-try:
-    import openai  # pip install openai
-    OPENAI_AVAILABLE = True
-except Exception:
-    openai = None
-    OPENAI_AVAILABLE = False
-
 User = get_user_model()
 
+from projects.models import Member
+from .assignment_llm import llm_client
+from .bulk import import_rows, iter_rows
+from .candidates import candidate_pool, candidates_fingerprint
+from .jobs import enqueue_auto_assign
+from .llm_cache import llm_cache, make_key as llm_key
 from .models import TaskAI, TaskReview
+from .optimizer import optimal_assignment
+from .scoring import ScoringEngine
 from .serializers import TaskAISerializer, TaskReviewSerializer
 
 
@@ -50,132 +51,9 @@ def _extract_json_from_text(text: str):
     return None
 
 
-def _get_candidate_members(limit=200):
-    """
-    Defensive candidate loader returning compact dicts:
-      { id, user_id (if present), name, email, skills, experience, developer_type, role, raw, current_load }
-
-    Robust skill extraction: checks several potential fields and normalizes.
-    """
-    candidates = []
-    # Try Member model
-    try:
-        MemberModel = apps.get_model("members", "Member")
-    except Exception:
-        MemberModel = None
+def _parses_as_json(raw):
+    return _extract_json_from_text(raw) is not None
 
-    if MemberModel is not None:
-        try:
-            qs = MemberModel.objects.filter(is_active=True).select_related("user")[:limit]
-            for m in qs:
-                user = getattr(m, "user", None)
-                user_id = getattr(user, "id", None) if user else None
-                email = getattr(user, "email", None) if user else None
-                # gather skills from multiple possible fields
-                skills = getattr(m, "skills", None) or getattr(m, "skillset", None) or getattr(m, "expertise", None) or ""
-                if isinstance(skills, (list, tuple)):
-                    skills = ",".join([str(s) for s in skills])
-                experience = getattr(m, "experience", None) or getattr(m, "years_experience", None) or 0
-                devtype = getattr(m, "developer_type", None) or getattr(m, "dev_type", None) or getattr(m, "type", None)
-                name = (
-                    (getattr(user, "get_full_name", None) and user.get_full_name())
-                    or getattr(user, "username", None)
-                    or getattr(m, "username", None)
-                    or getattr(m, "full_name", None)
-                    or str(m)
-                )
-                candidates.append({
-                    "id": getattr(m, "id", None),
-                    "user_id": user_id,
-                    "name": name,
-                    "email": email,
-                    "skills": skills or "",
-                    "experience": experience or 0,
-                    "role": getattr(m, "role", "") or "",
-                    "developer_type": devtype,
-                    "raw": {"member_pk": getattr(m, "pk", None), "source": "members.Member"},
-                })
-        except Exception:
-            logger.exception("Error reading members.Member - falling back to auth.User")
-
-    # Append auth.User fallback
-    try:
-        qs = User.objects.filter(is_active=True)[:limit]
-        for u in qs:
-            profile = getattr(u, "profile", None)
-            skills = None
-            if profile:
-                skills = getattr(profile, "skills", None) or getattr(profile, "skillset", None) or getattr(profile, "expertise", None)
-            if not skills:
-                skills = getattr(u, "skills", None) or getattr(u, "skillset", None) or ""
-            if isinstance(skills, (list, tuple)):
-                skills = ",".join([str(s) for s in skills])
-            experience = getattr(profile, "experience", None) if profile else getattr(u, "experience", None)
-            experience = experience or 0
-            devtype = (getattr(profile, "developer_type", None) if profile else None) or getattr(u, "developer_type", None) or getattr(u, "dev_type", None)
-            name = (getattr(u, "get_full_name", None) and u.get_full_name()) or getattr(u, "username", None) or str(u)
-            email = getattr(u, "email", None)
-            candidates.append({
-                "id": getattr(u, "id", None),
-                "user_id": getattr(u, "id", None),
-                "name": name,
-                "email": email,
-                "skills": skills or "",
-                "experience": experience or 0,
-                "role": getattr(profile, "role", "") if profile else (getattr(u, "role", "") if hasattr(u, "role") else ""),
-                "developer_type": devtype,
-                "raw": {"user_pk": getattr(u, "pk", None), "source": "auth.User"},
-            })
-    except Exception:
-        logger.exception("Error reading auth.User for candidates")
-
-    # Dedupe by user_id or id (prefer higher experience)
-    dedup = {}
-    for c in candidates:
-        key = c.get("user_id") or c.get("id")
-        if key is None:
-            continue
-        key = str(key)
-        existing = dedup.get(key)
-        try:
-            cur_exp = float(c.get("experience") or 0)
-        except Exception:
-            cur_exp = 0.0
-        if not existing:
-            dedup[key] = c
-        else:
-            try:
-                existing_exp = float(existing.get("experience") or 0)
-            except Exception:
-                existing_exp = 0.0
-            if cur_exp > existing_exp:
-                dedup[key] = c
-
-    final = []
-    for key, c in dedup.items():
-        try:
-            uid = int(key)
-            load = TaskAI.objects.filter(assignee_id=uid).count()
-        except Exception:
-            load = 0
-        c["current_load"] = load
-        final.append(c)
-
-    if not final:
-        # fallback: decorate original list if dedupe removed all
-        for c in candidates:
-            key = c.get("user_id") or c.get("id")
-            try:
-                uid = int(key) if key is not None else None
-                load = TaskAI.objects.filter(assignee_id=uid).count() if uid else 0
-            except Exception:
-                load = 0
-            c["current_load"] = load
-        return candidates[:limit]
-
-    # sort by experience desc (heuristic)
-    final.sort(key=lambda x: float(x.get("experience") or 0), reverse=True)
-    return final[:limit]
 
 class TaskAIViewSet(viewsets.ModelViewSet):
     queryset = TaskAI.objects.all()
@@ -240,7 +118,11 @@ class TaskAIViewSet(viewsets.ModelViewSet):
             already_assigned = getattr(task, "assignee", None) is not None
             already_ai_suggested = bool(getattr(task, "ai_suggested", False))
             if not already_assigned and not already_ai_suggested:
-                self._auto_assign_task_instance(task)
+                # queued for the run_taskai_jobs worker so the request never waits on the model
+                if getattr(settings, "TASKAI_AUTO_ASSIGN_ASYNC", True):
+                    enqueue_auto_assign(task)
+                else:
+                    self._auto_assign_task_instance(task)
             else:
                 logger.debug("Skipping auto-assign: assigned=%s ai_suggested=%s", already_assigned, already_ai_suggested)
         except Exception:
@@ -317,21 +199,19 @@ class TaskAIViewSet(viewsets.ModelViewSet):
         if not assignee_id:
             return Response({"detail": "assignee_id required"}, status=status.HTTP_400_BAD_REQUEST)
 
+        # assignee_id is a Member pk (what candidates and the frontend send) unless assignee_type="user"
         assignee = None
         try:
-            assignee = User.objects.get(pk=assignee_id)
+            if request.data.get("assignee_type") == "user":
+                assignee = User.objects.filter(pk=assignee_id).first()
+            else:
+                member = Member.objects.select_related("user").filter(pk=assignee_id).first()
+                if member and getattr(member, "user", None):
+                    assignee = member.user
+        except (ValueError, TypeError):
+            assignee = None
         except Exception:
-            try:
-                MemberModel = apps.get_model("members", "Member")
-            except Exception:
-                MemberModel = None
-            if MemberModel is not None:
-                try:
-                    member = MemberModel.objects.select_related("user").filter(pk=assignee_id).first()
-                    if member and getattr(member, "user", None):
-                        assignee = member.user
-                except Exception:
-                    logger.exception("Failed resolving Member(pk=%s) during assign", assignee_id)
+            logger.exception("Failed resolving assignee %s during assign", assignee_id)
 
         if not assignee:
             return Response({"detail": "assignee not found"}, status=status.HTTP_400_BAD_REQUEST)
@@ -364,6 +244,9 @@ class TaskAIViewSet(viewsets.ModelViewSet):
         try:
             TaskAI.objects.filter(pk=task.pk).update(**update_values)
             logger.info("Assign update: task %s set assignee_id=%s by user %s", task.pk, assignee.pk, getattr(request.user, "pk", None))
+            # .update() skips post_save, so tell the candidate pool directly
+            if task.status != TaskAI.STATUS_DONE:
+                candidate_pool.note_assignment(task.assignee_id, assignee.pk)
         except Exception:
             logger.exception("Assign update failed for task %s", task.pk)
             return Response({"detail": "Failed to persist assignment"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -385,77 +268,76 @@ class TaskAIViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=["get"], permission_classes=[permissions.AllowAny])
     def my(self, request):
+        """Tasks the user created, is assigned to, or was picked for by AI auto-assign."""
         user = request.user
-        qs = self.get_queryset().filter(Q(created_by=user) | Q(assignee=user)).distinct()
+        # every branch is a plain FK match, so no project join / DISTINCT is needed
+        qs = TaskAI.objects.filter(
+            Q(created_by=user) | Q(assignee=user) | Q(ai_suggested_member__user=user)
+        ).select_related("project", "assignee")
 
-        extra_task_pks = []
-        try:
-            MemberModel = apps.get_model("members", "Member")
-        except Exception:
-            MemberModel = None
-
-        if MemberModel is not None:
-            try:
-                user_member = MemberModel.objects.filter(user=user).first()
-            except Exception:
-                user_member = None
-
-            if user_member:
-                candidate_qs = TaskAI.objects.filter(ai_suggested=True).exclude(pk__in=qs.values_list("pk", flat=True))[:1000]
-                for t in candidate_qs:
-                    meta = getattr(t, "ai_meta", None) or {}
-                    chosen = None
-                    if isinstance(meta, dict):
-                        chosen = meta.get("chosen") or meta.get("selection") or None
-                    mid = None
-                    if isinstance(chosen, dict):
-                        mid = chosen.get("memberId") or chosen.get("member_id") or None
-                        if not mid:
-                            raw = chosen.get("meta") or chosen.get("meta_raw") or chosen.get("raw")
-                            if isinstance(raw, dict):
-                                mid = raw.get("member_pk") or raw.get("memberId") or raw.get("id") or None
-                    if not mid and isinstance(meta, dict):
-                        mid = meta.get("member_pk") or meta.get("chosen_member_pk") or None
-                    if mid is not None and str(mid) == str(getattr(user_member, "pk", "")):
-                        extra_task_pks.append(t.pk)
-
-        if extra_task_pks:
-            qs = qs | TaskAI.objects.filter(pk__in=extra_task_pks)
-
-        page = self.paginate_queryset(qs.distinct())
+        page = self.paginate_queryset(qs)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
             return self.get_paginated_response(serializer.data)
-        serializer = self.get_serializer(qs.distinct(), many=True)
+        serializer = self.get_serializer(qs, many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=["post"], permission_classes=[permissions.AllowAny], url_path="bulk")
+    def bulk_import(self, request):
+        """
+        Import many tasks from an NDJSON body (one task object per line, same fields as create)
+        or, with Content-Type text/csv, a CSV with a header row. Rows are validated, created and
+        auto-assigned in chunks; the response streams one NDJSON result per row, then a summary.
+        """
+        rows = iter_rows(request.stream, request.content_type) if request.stream is not None else iter(())
+        results = import_rows(
+            rows, request.user, self.infer_task_dev_type,
+            chunk_size=getattr(settings, "TASKAI_BULK_CHUNK_SIZE", 500),
+        )
+        return StreamingHttpResponse(
+            (json.dumps(result, default=str) + "\n" for result in results),
+            content_type="application/x-ndjson",
+        )
+
     @action(detail=False, methods=["post"], permission_classes=[permissions.AllowAny], url_path="auto-assign")
     def auto_assign(self, request):
         tasks = request.data.get("tasks") or []
         if not isinstance(tasks, list) or len(tasks) == 0:
             return Response({"detail": "Provide non-empty tasks array under 'tasks'."}, status=status.HTTP_400_BAD_REQUEST)
-        if len(tasks) > 25:
-            return Response({"detail": "Too many tasks; limit is 25 per request."}, status=status.HTTP_400_BAD_REQUEST)
-
-        candidates = _get_candidate_members(limit=getattr(settings, "OPENAI_MAX_CANDIDATES", 200))
+        # mode=optimal solves the whole batch at once, so it can take far more tasks
+        optimal = (request.data.get("mode") or request.query_params.get("mode")) == "optimal"
+        max_tasks = getattr(settings, "TASKAI_OPTIMAL_MAX_TASKS", 500) if optimal else 25
+        if len(tasks) > max_tasks:
+            return Response({"detail": f"Too many tasks; limit is {max_tasks} per request."}, status=status.HTTP_400_BAD_REQUEST)
+
+        pool = candidate_pool.get(limit=getattr(settings, "OPENAI_MAX_CANDIDATES", 200))
+        candidates = pool.candidates
         logger.debug("Auto-assign invoked: %d tasks, %d distinct candidates", len(tasks), len(candidates))
 
+        if optimal:
+            try:
+                seed = int(request.data.get("seed") or 0)
+            except (TypeError, ValueError):
+                return Response({"detail": "seed must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+            return Response(self._auto_assign_optimal(tasks, pool, seed), status=status.HTTP_200_OK)
+
         run_assigned_counts = {}
 
-        # fallback deterministic suggestions if OpenAI not configured
-        if not OPENAI_AVAILABLE or not getattr(settings, "OPENAI_API_KEY", None):
+        # fallback deterministic suggestions if no LLM is configured (or its circuit is open)
+        if not llm_client.available:
             out = []
             if not candidates:
                 for t in tasks:
                     out.append({"taskId": t.get("id"), "memberId": None, "memberName": None, "confidence": 0, "reason": "No candidates available on server."})
                 return Response(out, status=status.HTTP_200_OK)
-            for t in tasks:
-                req_dev_type = self.infer_task_dev_type(t)
-                chosen = self._choose_candidate_fallback({
-                    "required_skills": t.get("required_skills") or t.get("skills") or t.get("tags") or [],
-                    "required_developer_type": req_dev_type,
-                    "min_experience": t.get("min_experience") or t.get("minimum_experience")
-                }, candidates, assigned_counts=run_assigned_counts)
+            task_payloads = [{
+                "required_skills": t.get("required_skills") or t.get("skills") or t.get("tags") or [],
+                "required_developer_type": self.infer_task_dev_type(t),
+                "min_experience": t.get("min_experience") or t.get("minimum_experience")
+            } for t in tasks]
+            scores = pool.engine.score(task_payloads)
+            for i, t in enumerate(tasks):
+                chosen = self._choose_candidate_fallback(task_payloads[i], candidates, assigned_counts=run_assigned_counts, scores=scores, row=i)
                 out.append({"taskId": t.get("id"), "memberId": chosen.get("memberId"), "memberName": chosen.get("memberName"), "confidence": chosen.get("confidence"), "reason": chosen.get("reason")})
                 mid = chosen.get("memberId")
                 if mid is not None:
@@ -506,15 +388,11 @@ class TaskAIViewSet(viewsets.ModelViewSet):
         )
 
         try:
-            openai.api_key = getattr(settings, "OPENAI_API_KEY", None)
             model = getattr(settings, "OPENAI_MODEL", "gpt-4o-mini")
-            resp = openai.ChatCompletion.create(
-                model=model,
-                messages=[{"role": "system", "content": system_msg}, {"role": "user", "content": user_msg}],
-                temperature=0.0,
-                max_tokens=getattr(settings, "OPENAI_MAX_TOKENS", 800),
-            )
-            raw = resp["choices"][0]["message"]["content"]
+            max_tokens = getattr(settings, "OPENAI_MAX_TOKENS", 800)
+            messages = [{"role": "system", "content": system_msg}, {"role": "user", "content": user_msg}]
+            cache_key = llm_key(model, payload["tasks"], pool.fingerprint, prompt="auto_assign", max_tokens=max_tokens, candidates=len(payload["candidates"]), backend=llm_client.backend_name)
+            raw = llm_cache.get_or_call(cache_key, lambda: llm_client.complete(messages, model, max_tokens), cacheable=_parses_as_json)
             parsed = _extract_json_from_text(raw)
             if parsed is None:
                 logger.error("Auto-assign: failed to parse model output: %s", raw)
@@ -537,7 +415,7 @@ class TaskAIViewSet(viewsets.ModelViewSet):
                     fallback_choice = self._choose_candidate_fallback({
                         "required_skills": orig_task.get("required_skills") if orig_task else [],
                         "required_developer_type": orig_task.get("required_developer_type") if orig_task else None
-                    }, candidates, assigned_counts=run_assigned_counts)
+                    }, candidates, assigned_counts=run_assigned_counts, engine=pool.engine)
                     fallback_choice.setdefault("meta", {}).update({"raw_openai": raw, "parsed_openai": parsed})
                     output.append({
                         "taskId": taskId,
@@ -562,93 +440,77 @@ class TaskAIViewSet(viewsets.ModelViewSet):
                 for t in tasks:
                     out.append({"taskId": t.get("id"), "memberId": None, "memberName": None, "confidence": 0, "reason": "No candidates available on server."})
                 return Response(out, status=status.HTTP_200_OK)
-            for t in tasks:
-                req_dev_type = self.infer_task_dev_type(t)
-                chosen = self._choose_candidate_fallback({
-                    "required_skills": t.get("required_skills") or t.get("skills") or t.get("tags") or [],
-                    "required_developer_type": req_dev_type,
-                    "min_experience": t.get("min_experience") or t.get("minimum_experience")
-                }, candidates, assigned_counts=run_assigned_counts)
+            task_payloads = [{
+                "required_skills": t.get("required_skills") or t.get("skills") or t.get("tags") or [],
+                "required_developer_type": self.infer_task_dev_type(t),
+                "min_experience": t.get("min_experience") or t.get("minimum_experience")
+            } for t in tasks]
+            scores = pool.engine.score(task_payloads)
+            for i, t in enumerate(tasks):
+                chosen = self._choose_candidate_fallback(task_payloads[i], candidates, assigned_counts=run_assigned_counts, scores=scores, row=i)
                 out.append({"taskId": t.get("id"), "memberId": chosen.get("memberId"), "memberName": chosen.get("memberName"), "confidence": chosen.get("confidence"), "reason": chosen.get("reason")})
                 mid = chosen.get("memberId")
                 if mid is not None:
                     run_assigned_counts[str(mid)] = run_assigned_counts.get(str(mid), 0) + 1
             return Response(out, status=status.HTTP_200_OK)
 
-    # scoring and chooser
-    def _score_candidate(self, task_payload: dict, cand: dict):
-        def toks(x):
-            if not x:
-                return []
-            if isinstance(x, list):
-                return [str(i).lower().strip() for i in x if i]
-            return [s.strip().lower() for s in str(x).split(",") if s.strip()]
-
-        task_skills = toks(task_payload.get("required_skills") or task_payload.get("skills") or task_payload.get("tags") or [])
-        cand_skills = toks(cand.get("skills") or cand.get("skill") or "")
-        needed = max(1, len(task_skills))
-        overlap = 0
-        if task_skills:
-            overlap = sum(1 for s in task_skills if s in cand_skills)
-
-        # skill score (cap)
-        skill_score = min(60, (overlap * 15))
-        try:
-            member_exp = float(cand.get("experience") or 0)
-        except Exception:
-            member_exp = 0.0
-        capped = max(0.0, min(20.0, member_exp))
-        experience_score = (capped / 20.0) * 25.0
-
-        req_dev = (task_payload.get("required_developer_type") or task_payload.get("developer_type") or "") or ""
-        cand_dev = (cand.get("developer_type") or cand.get("dev_type") or "") or ""
-        dev_score = 15 if (str(req_dev).strip() and str(cand_dev).strip() and str(req_dev).lower() == str(cand_dev).lower()) else 0
-
-        exp_bonus = 5 if member_exp >= 8 else (3 if member_exp >= 5 else 0)
-
-        special_case_applied = False
-        if task_skills and overlap == 0:
-            if dev_score > 0 and member_exp >= 5:
-                special_case_applied = True
-                experience_score = max(experience_score, 18.0)
-            else:
-                experience_score = max(0.0, experience_score - 10.0)
-
-        base_total = int(round(max(0, min(100, skill_score + experience_score + dev_score + exp_bonus))))
+    def _auto_assign_optimal(self, tasks: list, pool, seed: int = 0):
+        """
+        mode=optimal: one min-cost assignment over the whole batch (see task_api.optimizer)
+        instead of greedy per-task picks. No OpenAI call; same seed -> same result.
+        """
+        if not pool.candidates:
+            return [{"taskId": t.get("id"), "memberId": None, "memberName": None, "confidence": 0, "reason": "No candidates available on server."} for t in tasks]
+
+        task_payloads = [{
+            "required_skills": t.get("required_skills") or t.get("skills") or t.get("tags") or [],
+            "required_developer_type": self.infer_task_dev_type(t),
+        } for t in tasks]
+        scores = pool.engine.score(task_payloads)
+        picks = optimal_assignment(scores, capacity=getattr(settings, "TASKAI_MEMBER_CAPACITY", 10), seed=seed)
+
+        out = []
+        for i, (t, (j, value, k)) in enumerate(zip(tasks, picks)):
+            if j is None:
+                out.append({"taskId": t.get("id"), "memberId": None, "memberName": None, "confidence": 0, "reason": "No member has capacity left."})
+                continue
+            cand = pool.candidates[j]
+            out.append({
+                "taskId": t.get("id"),
+                "memberId": cand.get("id"),
+                "memberName": cand.get("name") or cand.get("username"),
+                "confidence": int(max(0, min(100, value))),
+                "reason": f"{scores.reason(i, j)}; batch:+{k}",
+            })
+        return out
 
-        try:
-            cur_load = int(cand.get("current_load") or 0)
-        except Exception:
-            cur_load = 0
-        load_penalty = min(20, cur_load * 5)
-        total = max(0, base_total - load_penalty)
-        reason_parts = [f"skills {overlap}/{needed}", f"exp {member_exp}yr", f"devType:{'yes' if dev_score>0 else 'no'}", f"load:{cur_load}(-{load_penalty})"]
-        if special_case_applied:
-            reason_parts.append("special: devType+exp fallback")
-        reason = "; ".join(reason_parts)
-        return total, reason, overlap
-
-    def _choose_candidate_fallback(self, task_payload: dict, candidates: list, assigned_counts: dict = None):
+    # scoring and chooser
+    def _choose_candidate_fallback(self, task_payload: dict, candidates: list, assigned_counts: dict = None, engine: ScoringEngine = None, scores=None, row: int = 0):
         """
         Non-deterministic fallback:
-        - score candidates
+        - score candidates (row `row` of a precomputed batch `scores`, else scored here
+          with `engine`, which must have been built over `candidates`)
         - take top candidates within score window (default 3 points)
         - further prefer candidates with the smallest current_load and smallest assigned_counts
         - randomly pick among the best subset to avoid always picking the same member
         """
         if assigned_counts is None:
             assigned_counts = {}
-
-        scored = []
-        for cand in candidates:
-            score, reason, overlap = self._score_candidate(task_payload, cand)
-            prior = assigned_counts.get(str(cand.get("id")), 0)
-            run_penalty = prior * 8  # stronger penalty so run diversity matters
-            adjusted = max(0, score - run_penalty)
-            scored.append({"candidate": cand, "score": score, "adjusted": adjusted, "reason": reason, "overlap": overlap})
-
-        if not scored:
+        if not candidates:
             return {"memberId": None, "memberName": None, "confidence": 0, "reason": "No candidates"}
+        if scores is None:
+            scores = (engine or ScoringEngine(candidates)).score([task_payload])
+            row = 0
+
+        index_of = scores.engine.index_of
+        run_penalties = {
+            index_of[mid]: prior * 8  # stronger penalty so run diversity matters
+            for mid, prior in assigned_counts.items() if prior and mid in index_of
+        }
+        scored = [
+            {"candidate": candidates[j], "index": j, "adjusted": adjusted, "overlap": scores.overlap(row, j)}
+            for j, adjusted in scores.shortlist(row, run_penalties, window=3)
+        ]
 
         # primary sort by adjusted desc, overlap desc, experience desc
         def keyfn(item):
@@ -657,10 +519,9 @@ class TaskAIViewSet(viewsets.ModelViewSet):
 
         scored.sort(key=keyfn)
         best = scored[0]
-        top_score = best["adjusted"]
 
-        # build top group: within 3 points AND not massively penalized by load
-        top_group = [s for s in scored if (top_score - s["adjusted"]) <= 3]
+        # top group: the shortlist is already every candidate within 3 points of the best
+        top_group = scored
         # further filter by minimal current_load
         if top_group:
             min_load = min(int(s["candidate"].get("current_load") or 0) for s in top_group)
@@ -678,35 +539,35 @@ class TaskAIViewSet(viewsets.ModelViewSet):
         # Ensure cand.id exists
         if cand.get("id") is None:
             # forced pick
-            if candidates:
-                cand = candidates[0]
-                return {"memberId": cand.get("id"), "memberName": cand.get("name") or cand.get("username"), "confidence": 0, "reason": "forced pick due to missing id", "meta": cand}
-            return {"memberId": None, "memberName": None, "confidence": 0, "reason": "No candidates"}
+            cand = candidates[0]
+            return {"memberId": cand.get("id"), "memberName": cand.get("name") or cand.get("username"), "confidence": 0, "reason": "forced pick due to missing id", "meta": dict(cand)}
 
         conf = int(max(0, min(100, chosen_item["adjusted"])))
-        return {"memberId": cand.get("id"), "memberName": cand.get("name") or cand.get("username") or cand.get("user_name"), "confidence": conf, "reason": chosen_item["reason"], "meta": cand}
+        return {"memberId": cand.get("id"), "memberName": cand.get("name") or cand.get("username") or cand.get("user_name"), "confidence": conf, "reason": scores.reason(row, chosen_item["index"]), "meta": dict(cand)}
 
-    def _choose_candidate_openai(self, task_payload: dict, candidates: list):
+    def _choose_candidate_openai(self, task_payload: dict, candidates: list, engine: ScoringEngine = None, pool_version: str = None):
         """
         Same robust OpenAI handling as before; if model returns null/invalid memberId we fall back to the
-        non-deterministic chooser above.
+        non-deterministic chooser above. Responses are cached per (model, task content, `pool_version`).
         """
-        if not OPENAI_AVAILABLE or not getattr(settings, "OPENAI_API_KEY", None):
-            return self._choose_candidate_fallback(task_payload, candidates)
+        if not llm_client.available:
+            return self._choose_candidate_fallback(task_payload, candidates, engine=engine)
 
         try:
-            openai.api_key = getattr(settings, "OPENAI_API_KEY", None)
             model = getattr(settings, "OPENAI_MODEL", "gpt-4o-mini")
             max_tokens = getattr(settings, "OPENAI_MAX_TOKENS", 400)
             payload = {"task": {"taskId": task_payload.get("taskId") or task_payload.get("id"), "title": task_payload.get("title") or "", "desc": task_payload.get("web_desc") or task_payload.get("description") or "", "required_developer_type": task_payload.get("required_developer_type") or task_payload.get("developer_type") or None, "required_skills": task_payload.get("required_skills") or task_payload.get("skills") or task_payload.get("tags") or [], "priority": task_payload.get("priority") or ""}, "candidates": candidates[: getattr(settings, "OPENAI_MAX_CANDIDATES", 200)]}
             system_msg = "You are an assistant that returns ONLY valid JSON. No commentary."
             user_msg = ("Given one task and a list of candidate members (with id, name, skills, experience, developer_type), choose the most suitable member and return JSON: " '{"memberId": <id|null>, "memberName": <string|null>, "confidence": <0-100>, "reason": <short explanation> }' "Important: memberId MUST be exactly one of the ids present in the provided 'candidates' array. Return memberId as a plain integer (not words). If you cannot pick one of the candidate ids, set memberId to null and include an explanation in 'reason'.\n\nExample output (single object):\n" '{"memberId": 5, "memberName": "Alice Doe", "confidence": 78, "reason": "Matches skills X,Y and developer_type web."}\n\n' f"Input:\n{json.dumps(payload)}")
-            resp = openai.ChatCompletion.create(model=model, messages=[{"role": "system", "content": system_msg}, {"role": "user", "content": user_msg}], temperature=0.0, max_tokens=max_tokens)
-            raw = resp["choices"][0]["message"]["content"]
+            messages = [{"role": "system", "content": system_msg}, {"role": "user", "content": user_msg}]
+            # the answer does not depend on the task id, so identical tasks share an entry
+            task_key = {k: v for k, v in payload["task"].items() if k != "taskId"}
+            cache_key = llm_key(model, task_key, pool_version or candidates_fingerprint(candidates), prompt="single", max_tokens=max_tokens, candidates=len(payload["candidates"]), backend=llm_client.backend_name)
+            raw = llm_cache.get_or_call(cache_key, lambda: llm_client.complete(messages, model, max_tokens), cacheable=_parses_as_json)
             parsed = _extract_json_from_text(raw)
         except Exception:
             logger.exception("OpenAI request/parse failed; falling back deterministically")
-            return self._choose_candidate_fallback(task_payload, candidates)
+            return self._choose_candidate_fallback(task_payload, candidates, engine=engine)
 
         meta = {"raw": raw, "parsed": parsed}
         obj = None
@@ -802,7 +663,7 @@ class TaskAIViewSet(viewsets.ModelViewSet):
             return {"memberId": int(memberId), "memberName": memberName or (chosen_candidate and chosen_candidate.get("name")), "confidence": int(confidence) if confidence is not None else 0, "reason": reason or "openai selection", "meta": {"parsed": parsed, "raw": raw, "candidate": chosen_candidate}}
 
         logger.warning("OpenAI returned no valid memberId and resolution failed. Raw model output: %s", raw)
-        fallback = self._choose_candidate_fallback(task_payload, candidates)
+        fallback = self._choose_candidate_fallback(task_payload, candidates, engine=engine)
         fallback["meta"] = fallback.get("meta", {})
         fallback["meta"].update({"raw_openai": raw, "parsed_openai": parsed, "resolution_attempts": resolution_path})
         fallback["reason"] = (fallback.get("reason") or "") + " (fallback after OpenAI no-valid-id)"
@@ -825,25 +686,11 @@ class TaskAIViewSet(viewsets.ModelViewSet):
                 logger.exception("resolve step candidate entry failed")
                 diag["steps"].append("exception in candidate entry step")
 
+        # candidate ids are Member pks, so try Member before a raw User pk
         if chosen_member_id is not None:
-            try:
-                diag["steps"].append(f"trying User(pk={chosen_member_id})")
-                u = User.objects.filter(pk=chosen_member_id).first()
-                if u:
-                    diag["resolved_by"] = "direct_user_pk"
-                    return u, diag
-            except Exception:
-                logger.exception("resolve step direct user pk failed")
-                diag["steps"].append("exception in direct pk step")
-
-        try:
-            MemberModel = apps.get_model("members", "Member")
-        except Exception:
-            MemberModel = None
-        if MemberModel and chosen_member_id is not None:
             try:
                 diag["steps"].append(f"trying Member(pk={chosen_member_id}).user")
-                member = MemberModel.objects.filter(pk=chosen_member_id).select_related("user").first()
+                member = Member.objects.filter(pk=chosen_member_id).select_related("user").first()
                 if member and getattr(member, "user", None):
                     diag["resolved_by"] = "member.user_by_pk"
                     return member.user, diag
@@ -853,6 +700,17 @@ class TaskAIViewSet(viewsets.ModelViewSet):
                 logger.exception("resolve step Member.pk failed")
                 diag["steps"].append("exception in member.pk step")
 
+        if chosen_member_id is not None:
+            try:
+                diag["steps"].append(f"trying User(pk={chosen_member_id})")
+                u = User.objects.filter(pk=chosen_member_id).first()
+                if u:
+                    diag["resolved_by"] = "direct_user_pk"
+                    return u, diag
+            except Exception:
+                logger.exception("resolve step direct user pk failed")
+                diag["steps"].append("exception in direct pk step")
+
         for c in (candidates or []):
             try:
                 uid = c.get("user_id") or (c.get("user") and c.get("user").get("id"))
@@ -915,7 +773,14 @@ class TaskAIViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(qs, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
-    def _auto_assign_task_instance(self, task: TaskAI):
+    def _auto_assign_task_instance(self, task: TaskAI, unassigned_only=False):
+        """
+        Pick a member for `task` and save the AI fields (and the assignee, when one
+        resolves) with update_fields, so nothing else on the row is overwritten.
+        With `unassigned_only` the write is an UPDATE ... WHERE assignee IS NULL and
+        is skipped when someone assigned the task meanwhile. Returns the assigned
+        User or None. Errors loading candidates or saving propagate to the caller.
+        """
         task_payload = {
             "taskId": getattr(task, "id", None),
             "title": getattr(task, "title", "") or "",
@@ -930,7 +795,8 @@ class TaskAIViewSet(viewsets.ModelViewSet):
             "required_skills": getattr(task, "extra", {}).get("required_skills") if isinstance(getattr(task, "extra", None), dict) else [],
         }
 
-        candidates = _get_candidate_members(limit=getattr(settings, "OPENAI_MAX_CANDIDATES", 200))
+        pool = candidate_pool.get(limit=getattr(settings, "OPENAI_MAX_CANDIDATES", 200))
+        candidates = pool.candidates
         if not candidates:
             logger.info("Auto-assign: no candidates found")
             return None
@@ -941,9 +807,9 @@ class TaskAIViewSet(viewsets.ModelViewSet):
         raw_openai = None
         parsed_openai = None
         try:
-            if OPENAI_AVAILABLE and getattr(settings, "OPENAI_API_KEY", None):
+            if llm_client.available:
                 try:
-                    chosen = self._choose_candidate_openai(task_payload, candidates)
+                    chosen = self._choose_candidate_openai(task_payload, candidates, engine=pool.engine, pool_version=pool.fingerprint)
                 except Exception:
                     logger.exception("OpenAI selection failed for single task; falling back to deterministic")
                     chosen = None
@@ -952,16 +818,14 @@ class TaskAIViewSet(viewsets.ModelViewSet):
             chosen = None
 
         if not chosen:
-            try:
-                scored_debug = []
-                for c in candidates:
-                    s, reason, overlap = self._score_candidate(task_payload, c)
-                    scored_debug.append((s, overlap, c.get("id"), c.get("name"), c.get("current_load")))
-                scored_debug.sort(key=lambda t: (-t[0], -t[1]))
-                logger.debug("Auto-assign debug task=%s top_candidates=%s", task_payload.get("taskId"), scored_debug[:6])
-            except Exception:
-                logger.exception("failed to produce debug scoring for task %s", task_payload.get("taskId"))
-            chosen = self._choose_candidate_fallback(task_payload, candidates)
+            scores = pool.engine.score([task_payload])
+            if logger.isEnabledFor(logging.DEBUG):
+                scored_debug = [
+                    (scores.total(0, j), scores.overlap(0, j), candidates[j].get("id"), candidates[j].get("name"), candidates[j].get("current_load"))
+                    for j in scores.ranked(0, limit=6)
+                ]
+                logger.debug("Auto-assign debug task=%s top_candidates=%s", task_payload.get("taskId"), scored_debug)
+            chosen = self._choose_candidate_fallback(task_payload, candidates, scores=scores)
 
         if not isinstance(chosen, dict):
             chosen = {"memberId": None, "memberName": None, "confidence": 0, "reason": "no candidate", "meta": None}
@@ -983,26 +847,27 @@ class TaskAIViewSet(viewsets.ModelViewSet):
             if chosen["meta"].get("parsed_openai"):
                 meta_for_save["parsed_openai"] = chosen["meta"].get("parsed_openai")
         task.ai_meta = meta_for_save
+        # candidate ids are projects.Member pks; stored so /my/ can filter on an indexed column
+        chosen_cand = next((c for c in candidates if c.get("id") is not None and str(c.get("id")) == str(chosen.get("memberId"))), None)
+        task.ai_suggested_member_id = chosen_cand.get("id") if chosen_cand else None
 
+        fields = ["ai_suggested", "ai_confidence", "ai_reason", "ai_meta", "ai_suggested_member"]
         if hasattr(task, "assignment_locked"):
-            try:
-                task.assignment_locked = True
-            except Exception:
-                logger.exception("failed to set assignment_locked flag")
+            task.assignment_locked = True
+            fields.append("assignment_locked")
 
         if user_obj:
             task.assignee = user_obj
-            task.assigned_by = getattr(task, "created_by", None) or None
+            task.assigned_by_id = getattr(task, "created_by_id", None)
             task.assigned_at = timezone.now()
-            try:
-                task.save()
-                logger.info("Auto-assigned Task %s -> User %s (conf=%s)", task.pk, user_obj.pk, task.ai_confidence)
-            except Exception:
-                logger.exception("Failed to save TaskAI after auto-assign")
-                try:
-                    TaskAI.objects.filter(pk=task.pk).update(assignee_id=user_obj.pk, assigned_by_id=(getattr(task, "created_by_id", None) or None), assigned_at=timezone.now(), ai_suggested=True, ai_confidence=task.ai_confidence, ai_reason=task.ai_reason, ai_meta=task.ai_meta, **({"assignment_locked": True} if hasattr(task, "assignment_locked") else {}))
-                except Exception:
-                    logger.exception("Fallback update also failed for auto-assign")
+            fields += ["assignee", "assigned_by", "assigned_at"]
+
+        if not self._save_auto_assignment(task, fields, unassigned_only):
+            logger.info("Auto-assign skipped Task %s: assigned by someone else meanwhile", task.pk)
+            return None
+
+        if user_obj:
+            logger.info("Auto-assigned Task %s -> User %s (conf=%s)", task.pk, user_obj.pk, task.ai_confidence)
             try:
                 Notification = apps.get_model("timesheet", "Notification")
                 Notification.objects.create(recipient_id=user_obj.pk, verb=f"You have been assigned to task: {task.title or task.pk}", task_id=task.pk)
@@ -1010,13 +875,22 @@ class TaskAIViewSet(viewsets.ModelViewSet):
                 logger.exception("Failed to create Notification for auto-assigned task %s", task.pk)
             return user_obj
 
-        try:
-            task.save()
-        except Exception:
-            logger.exception("Failed to save TaskAI with ai_meta when no user resolved")
         logger.info("Auto-assign did not resolve a User for Task %s; diag=%s", task.pk, diag)
         return None
 
+    @staticmethod
+    def _save_auto_assignment(task, fields, unassigned_only):
+        if not unassigned_only:
+            task.save(update_fields=fields)
+            return True
+        values = {f: getattr(task, TaskAI._meta.get_field(f).attname) for f in fields}
+        if not TaskAI.objects.filter(pk=task.pk, assignee__isnull=True).update(**values):
+            return False
+        # .update() skips post_save, so tell the candidate pool directly
+        if task.assignee_id is not None and task.status != TaskAI.STATUS_DONE:
+            candidate_pool.note_assignment(None, task.assignee_id)
+        return True
+
     @action(detail=True, methods=["get"], permission_classes=[permissions.AllowAny], url_path="reviews")
     def reviews(self, request, pk=None):
         try:
@@ -1039,43 +913,8 @@ class TaskAIViewSet(viewsets.ModelViewSet):
             return Response({"detail": "Task not found."}, status=status.HTTP_404_NOT_FOUND)
         serializer = TaskReviewSerializer(data=request.data, context={"request": request, "task": task})
         serializer.is_valid(raise_exception=True)
+        # the assignee's Member review aggregates are kept by task_api.signals
         review = serializer.save()
 
-        reviewed_member = None
-        try:
-            MemberModel = apps.get_model("projects", "Member")
-        except Exception:
-            try:
-                MemberModel = apps.get_model("members", "Member")
-            except Exception:
-                MemberModel = None
-
-        if getattr(task, "assignee", None) and MemberModel:
-            try:
-                reviewed_member = MemberModel.objects.get(user=task.assignee)
-            except Exception:
-                reviewed_member = None
-
-        if reviewed_member:
-            from django.db.models import Avg, Count
-            agg = TaskReview.objects.filter(task__assignee=reviewed_member.user, rating__isnull=False).aggregate(avg=Avg("rating"), cnt=Count("id"))
-            avg_rating = agg["avg"] or 0.0
-            cnt = agg["cnt"] or 0
-            fields_to_update = []
-            if hasattr(reviewed_member, "avg_rating"):
-                reviewed_member.avg_rating = float(avg_rating)
-                fields_to_update.append("avg_rating")
-            if hasattr(reviewed_member, "review_count"):
-                reviewed_member.review_count = int(cnt)
-                fields_to_update.append("review_count")
-            if hasattr(reviewed_member, "last_reviewed_at"):
-                reviewed_member.last_reviewed_at = review.created_at
-                fields_to_update.append("last_reviewed_at")
-            if fields_to_update:
-                try:
-                    reviewed_member.save(update_fields=fields_to_update)
-                except Exception:
-                    logger.exception("Failed updating review aggregates on Member %s", getattr(reviewed_member, "pk", None))
-
         out_ser = TaskReviewSerializer(review, context={"request": request, "task": task})
         return Response(out_ser.data, status=status.HTTP_201_CREATED)
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-18 01:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0011_member_hourly_rate_project_hourly_rate'),
+        ('tasks', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectTaskSequence',
+            fields=[
+                ('project', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='task_sequence', serialize=False, to='projects.project')),
+                ('last_value', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='sequence_id',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Task #'),
+        ),
+        migrations.AddConstraint(
+            model_name='task',
+            constraint=models.UniqueConstraint(fields=('project', 'sequence_id'), name='task_project_sequence_uniq'),
+        ),
+    ]
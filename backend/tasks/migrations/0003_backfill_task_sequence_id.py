@@ -0,0 +1,36 @@
+from django.db import migrations
+
+
+def backfill_sequence_ids(apps, schema_editor):
+    """Number existing tasks per project by (created_at, pk), the order the old COUNT query used."""
+    Task = apps.get_model("tasks", "Task")
+    ProjectTaskSequence = apps.get_model("tasks", "ProjectTaskSequence")
+
+    batch = []
+    counters = {}
+    qs = Task.objects.filter(project__isnull=False).order_by("project_id", "created_at", "pk").only("pk", "project_id")
+    for task in qs.iterator():
+        counters[task.project_id] = counters.get(task.project_id, 0) + 1
+        task.sequence_id = counters[task.project_id]
+        batch.append(task)
+        if len(batch) >= 500:
+            Task.objects.bulk_update(batch, ["sequence_id"])
+            batch = []
+    if batch:
+        Task.objects.bulk_update(batch, ["sequence_id"])
+
+    ProjectTaskSequence.objects.bulk_create(
+        [ProjectTaskSequence(project_id=pid, last_value=n) for pid, n in counters.items()],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0002_task_sequence_id'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_sequence_ids, migrations.RunPython.noop),
+    ]
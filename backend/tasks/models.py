@@ -1,8 +1,32 @@
 # tasks/models.py
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 from projects.models import Project,Member
 
 
+class ProjectTaskSequence(models.Model):
+    """Per-project counter behind Task.sequence_id; one row per project, bumped with F()."""
+    project = models.OneToOneField(
+        Project,
+        related_name='task_sequence',
+        on_delete=models.CASCADE,
+        primary_key=True
+    )
+    last_value = models.PositiveIntegerField(default=0)
+
+    @classmethod
+    def next_value(cls, project_id):
+        """
+        Next sequence number for the project. Call inside a transaction: the
+        UPDATE holds the counter row lock until commit, so concurrent creates
+        in the same project get distinct numbers.
+        """
+        if not cls.objects.filter(project_id=project_id).update(last_value=F('last_value') + 1):
+            cls.objects.get_or_create(project_id=project_id)
+            cls.objects.filter(project_id=project_id).update(last_value=F('last_value') + 1)
+        return cls.objects.filter(project_id=project_id).values_list('last_value', flat=True).get()
+
+
 class Task(models.Model):
     project = models.ForeignKey(
         Project,
@@ -26,6 +50,14 @@ class Task(models.Model):
         help_text="Member who assigned this task"
     )
 
+    # position of the task in its project (1, 2, ...), assigned once on save
+    sequence_id = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Task #'
+    )
+
     title = models.CharField(max_length=255)
     due_date = models.DateField(null=True, blank=True)
 
@@ -58,6 +90,28 @@ class Task(models.Model):
 
     class Meta:
         ordering = ['project', 'created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'sequence_id'], name='task_project_sequence_uniq'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_project_id = instance.__dict__.get('project_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        # a new task, or one moved to another project, takes that project's next number
+        moved = not self._state.adding and self.project_id != getattr(self, '_loaded_project_id', self.project_id)
+        if self.project_id and (self.sequence_id is None or moved):
+            with transaction.atomic():
+                self.sequence_id = ProjectTaskSequence.next_value(self.project_id)
+                if kwargs.get('update_fields') is not None:
+                    kwargs['update_fields'] = {*kwargs['update_fields'], 'sequence_id'}
+                super().save(*args, **kwargs)
+        else:
+            super().save(*args, **kwargs)
+        self._loaded_project_id = self.project_id
 
     def __str__(self):
         return f"{self.project.name} - {self.title}"
\ No newline at end of file
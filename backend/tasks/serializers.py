@@ -1,6 +1,5 @@
 # tasks/serializers.py
 from rest_framework import serializers
-from django.db.models import Q
 
 from .models import Task
 from projects.models import Project, Member
@@ -34,7 +33,7 @@ class TaskSerializer(serializers.ModelSerializer):
     assigned_by_name = serializers.SerializerMethodField(read_only=True)
 
     # Helpers
-    sequence_id = serializers.SerializerMethodField()
+    sequence_id = serializers.IntegerField(read_only=True)
     tasks_count = serializers.IntegerField(read_only=True)
 
     class Meta:
@@ -68,16 +67,6 @@ class TaskSerializer(serializers.ModelSerializer):
         )
 
     # ---------- Helpers ----------
-    def get_sequence_id(self, obj):
-        if not obj.project or not getattr(obj, "created_at", None):
-            return None
-        return Task.objects.filter(
-            project=obj.project
-        ).filter(
-            Q(created_at__lt=obj.created_at) |
-            Q(created_at=obj.created_at, pk__lte=obj.pk)
-        ).count()
-
     def _get_member_name(self, member):
         if not member:
             return None
@@ -1,13 +1,15 @@
 # tracker/views.py
 from datetime import timedelta
+from decimal import Decimal
 from django.utils import timezone
-from django.db.models import Sum, F, Case, When, ExpressionWrapper, fields as ffields
 from rest_framework import viewsets, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from projects.models import Member, Project
 from realtimemonitoring.models import WorkSession
+from realtimemonitoring.utils import tracked_seconds
 from .serializers import WorkSessionSerializer
 
 class WorkSessionViewSet(viewsets.ModelViewSet):
@@ -27,7 +29,9 @@ class WorkSessionViewSet(viewsets.ModelViewSet):
 def tracker_list(request):
     """
     GET /api/tracker/?type=hours|amount&range=day|week|month
-    Returns aggregated total per member+project in the given time window.
+    Returns total time tracked inside the window per member+project.
+    Totals come from one grouped ledger query plus the running sessions;
+    `amount` bills each row at Project.billing_rate_for(member).
     """
     ttype = request.query_params.get('type', 'hours')
     rng   = request.query_params.get('range', 'day')
@@ -41,58 +45,46 @@ def tracker_list(request):
     else:  # day
         since = now - timedelta(days=1)
 
-    # filter sessions that began >= since
-    qs = WorkSession.objects.filter(start__gte=since)
+    totals = {
+        key: secs
+        for key, secs in tracked_seconds(since, now, now=now).items()
+        if secs > 0 and key[1] is not None
+    }
 
-    # Annotate sum of accumulated seconds
-    agg = qs.values(
-        'member__user__username',
-        'member__user__email',
-        'project__name',
-    ).annotate(
-        total_accum=Sum('accumulated'),
-        # count how many are currently running
-        running_count=Sum(
-            Case(
-                When(is_running=True, then=1),
-                default=0,
-                output_field=ffields.IntegerField()
-            )
-        )
-    )
+    member_ids = {mid for mid, _ in totals}
+    project_ids = {pid for _, pid in totals}
+    members = Member.objects.filter(id__in=member_ids).select_related('user').only(
+        'id', 'hourly_rate', 'user__username', 'user__email'
+    ).in_bulk()
+    projects = Project.objects.filter(id__in=project_ids).only(
+        'id', 'name', 'billable', 'hourly_rate'
+    ).in_bulk()
 
     out = []
-    for row in agg:
-        # add live seconds for any running sessions
-        live = WorkSession.objects.filter(
-            member__user__username=row['member__user__username'],
-            project__name=row['project__name'],
-            is_running=True
-        ).aggregate(
-            live=Sum(
-                ExpressionWrapper(
-                    (now - F('start')),
-                    output_field=ffields.DurationField()
-                )
-            )
-        )['live'] or 0
-
-        live_secs = int(live.total_seconds()) if hasattr(live, 'total_seconds') else int(live)
-        total_secs = (row['total_accum'] or 0) + live_secs
+    for (mid, pid), total_secs in totals.items():
+        member = members.get(mid)
+        project = projects.get(pid)
+        if member is None or project is None:
+            continue
 
         if ttype == 'amount':
-            # if you track billing rates elsewhere, multiply here
-            total = f"${(row['total_accum'] or 0) * 0.0:.2f}"
+            rate = project.billing_rate_for(member)
+            amount = (Decimal(total_secs) / 3600 * rate).quantize(Decimal('0.01'))
+            total = f"${amount}"
         else:
             h = total_secs // 3600
             m = (total_secs % 3600) // 60
             total = f"{h}h {m}m"
 
         out.append({
-            'member':  row['member__user__username'],
-            'email':   row['member__user__email'],
-            'project': row['project__name'],
-            'total':   total,
+            'member_id':  mid,
+            'member':     member.user.username,
+            'email':      member.user.email,
+            'project_id': pid,
+            'project':    project.name,
+            'seconds':    total_secs,
+            'total':      total,
         })
 
+    out.sort(key=lambda row: (row['member'].lower(), row['project'].lower()))
     return Response(out, status=status.HTTP_200_OK)